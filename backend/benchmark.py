@@ -0,0 +1,253 @@
+# Reproducible API and WebSocket benchmarks, e.g.
+#   python benchmark.py --sizes 1000,10000,100000 --output results.json
+#   python benchmark.py --sizes 1000 --compare results.json
+# Boots server.app in-process under uvicorn against a local MongoDB (--mongo URL)
+# or an in-memory stand-in (--mongo memory, via mongomock-motor). The mock
+# cannot build the startup indexes, so in memory mode the app's startup hooks
+# are skipped. Each dataset size is reseeded deterministically in-process with
+# server.seed_sample_data, since /api/init-sample-data caps synthetic volume per
+# request. A run where any request failed exits non-zero without writing
+# results, so a broken scenario never ends up in a baseline.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'eduplay_bench')
+
+LIST_ENDPOINTS = ["/api/users", "/api/games", "/api/builds", "/api/updates", "/api/revenue", "/api/admins"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the EduPlay API and WebSocket tier")
+    parser.add_argument("--mongo", default=os.environ['MONGO_URL'], help="MongoDB URL, or 'memory' for mongomock-motor")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated user counts to seed")
+    parser.add_argument("--requests", type=int, default=200, help="requests per HTTP scenario")
+    parser.add_argument("--login-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ws-clients", type=int, default=200)
+    parser.add_argument("--fanout-rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative p99/throughput change counted as a regression")
+    return parser.parse_args()
+
+def use_memory_mongo():
+    from mongomock_motor import AsyncMongoMockClient
+    import server
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[os.environ['DB_NAME']]
+    server.live_effect_history.collection = server.db.live_effects
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    if not latencies:
+        return {"count": 0, "errors": errors}
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return round(1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": round(1000 * statistics.fmean(ordered), 3),
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": round(1000 * ordered[-1], 3),
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else None,
+    }
+
+async def run_http(http, method: str, path: str, total: int, concurrency: int, bust_cache: bool = False, **kwargs) -> dict:
+    # bust_cache gives every request a unique query string, so endpoints behind
+    # the response cache are measured on the query path rather than on hits.
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            params = {"_bench": next(counter)} if bust_cache else None
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, path, params=params, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+                    return
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+async def run_fanout(http, ws_base: str, user_ids, rounds: int) -> dict:
+    import websockets
+
+    sockets = await asyncio.gather(*[websockets.connect(f"{ws_base}/ws/{uid}") for uid in user_ids])
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    try:
+        for i in range(rounds):
+            sent_at = time.perf_counter()
+
+            async def receive(ws):
+                await asyncio.wait_for(ws.recv(), 10)
+                return time.perf_counter() - sent_at
+
+            receivers = [asyncio.create_task(receive(ws)) for ws in sockets]
+            response = await http.post("/api/live-effects/broadcast", json={
+                "all_connected": True, "effect_type": "notification", "content": f"bench {i}",
+            })
+            if response.status_code >= 400:
+                errors += len(sockets)
+            for result in await asyncio.gather(*receivers, return_exceptions=True):
+                if isinstance(result, Exception):
+                    errors += 1
+                else:
+                    latencies.append(result)
+    finally:
+        await asyncio.gather(*[ws.close() for ws in sockets], return_exceptions=True)
+    summary = summarize(latencies, errors, time.perf_counter() - started)
+    summary["clients"] = len(sockets)
+    return summary
+
+async def bench_size(http, ws_base: str, size: int, args) -> dict:
+    params = {"users": size, "games": max(10, size // 1000), "builds": max(10, size // 100), "revenue": size * 2, "seed": args.seed}
+    import server
+
+    results = {"dataset": params}
+    seeded_at = time.perf_counter()
+    await server.seed_sample_data(**params)
+    results["seed_seconds"] = round(time.perf_counter() - seeded_at, 2)
+
+    login = {"username": "admin", "password": "admin123"}
+    results["login"] = await run_http(http, "POST", "/api/admin/login", args.login_requests, args.concurrency, json=login)
+    token = (await http.post("/api/admin/login", json=login)).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for path in LIST_ENDPOINTS:
+        results[f"GET {path}"] = await run_http(
+            http, "GET", path, args.requests, args.concurrency, bust_cache=True, headers=headers
+        )
+    results["GET /api/stats/dashboard"] = await run_http(
+        http, "GET", "/api/stats/dashboard", args.requests, args.concurrency, bust_cache=True, headers=headers
+    )
+
+    users = (await http.get("/api/users", params={"limit": min(args.ws_clients, 1000)}, headers=headers)).json()
+    http.headers.update(headers)
+    results["ws fanout"] = await run_fanout(http, ws_base, [u["id"] for u in users], args.fanout_rounds)
+    return results
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def failed_scenarios(output: dict) -> list:
+    return [
+        f"{size} {name}: {stats['errors']} errors, {stats['count']} ok"
+        for size, scenarios in output["results"].items()
+        for name, stats in scenarios.items()
+        if isinstance(stats, dict) and stats.get("errors")
+    ]
+
+def compare(previous: dict, current: dict, threshold: float) -> int:
+    regressions = 0
+    for size, scenarios in previous.get("results", {}).items():
+        for name, before in scenarios.items():
+            if isinstance(before, dict) and "p99_ms" in before and name not in current["results"].get(size, {}):
+                print(f"{size:>8} {name:<28} missing from this run  REGRESSION")
+                regressions += 1
+    for size, scenarios in current["results"].items():
+        for name, stats in scenarios.items():
+            before = previous.get("results", {}).get(size, {}).get(name)
+            if not isinstance(stats, dict) or not isinstance(before, dict) or "p99_ms" not in stats or "p99_ms" not in before:
+                continue
+            p99_change = (stats["p99_ms"] - before["p99_ms"]) / before["p99_ms"] if before["p99_ms"] else 0.0
+            rps_change = (
+                (stats["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"]
+                if before.get("throughput_rps") else 0.0
+            )
+            flag = ""
+            if p99_change > threshold or rps_change < -threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{size:>8} {name:<28} p99 {before['p99_ms']:>9.2f} -> {stats['p99_ms']:>9.2f} ms ({p99_change:+.1%})"
+                  f"  rps {rps_change:+.1%}{flag}")
+    return regressions
+
+async def main(args) -> int:
+    import httpx
+    import uvicorn
+
+    if args.mongo == "memory":
+        use_memory_mongo()
+    else:
+        os.environ['MONGO_URL'] = args.mongo
+    import server
+
+    port = free_port()
+    # The mock cannot run the startup index builds and backfills
+    lifespan = "off" if args.mongo == "memory" else "on"
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning", lifespan=lifespan)
+    uvicorn_server = uvicorn.Server(config)
+    serving = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+
+    output = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "mongo": "memory" if args.mongo == "memory" else "mongodb",
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": {},
+    }
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as http:
+            for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+                print(f"Benchmarking {size} users...", file=sys.stderr)
+                output["results"][str(size)] = await bench_size(http, f"ws://127.0.0.1:{port}", size, args)
+    finally:
+        uvicorn_server.should_exit = True
+        await serving
+
+    failures = failed_scenarios(output)
+    if failures:
+        print("Not writing results, requests failed in:", *failures, sep="\n  ", file=sys.stderr)
+        return 2
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(json.load(f), output, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,43 @@
+# Seed MongoDB with the fixed sample data plus synthetic volume, e.g.
+#   python seed.py --users 1000000 --games 500 --builds 20000 --revenue 2000000 --seed 7
+# --append skips the reset and only adds generated documents.
+import argparse
+import asyncio
+import time
+
+from server import (
+    client,
+    create_indexes,
+    generate_synthetic_data,
+    rebuild_leaderboards,
+    rebuild_revenue_rollups,
+    reconcile_dashboard_stats,
+    seed_sample_data,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic EduPlay data")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--builds", type=int, default=1000)
+    parser.add_argument("--revenue", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--append", action="store_true", help="keep existing data and only add generated documents")
+    return parser.parse_args()
+
+async def main(args):
+    started = time.perf_counter()
+    await create_indexes()
+    counts = dict(users=args.users, games=args.games, builds=args.builds, revenue=args.revenue, seed=args.seed)
+    if args.append:
+        generated = await generate_synthetic_data(**counts)
+        await reconcile_dashboard_stats()
+        await rebuild_revenue_rollups()
+        await rebuild_leaderboards()
+    else:
+        generated = (await seed_sample_data(**counts))["generated"]
+    print(f"Inserted {generated} in {time.perf_counter() - started:.1f}s")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
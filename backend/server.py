@@ -1,59 +1,887 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, WebSocket, WebSocketDisconnect, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne, CursorType, ReturnDocument
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo import monitoring
+import asyncio
 import os
+import socket
+import time
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError, TypeAdapter
+from typing import List, Optional, Dict, Any, Literal, Union, get_args, get_origin
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, date
+from collections import OrderedDict
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 import json
+import base64
+import random
+import re
+import hashlib
+import csv
+import io
+import zlib
+import threading
+import fcntl
+from abc import ABC, abstractmethod
+import shlex
+import itertools
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Metrics
+# A deliberately small Prometheus text-format registry: each observation is a
+# lock plus a short bucket walk, cheap enough to leave on in production.
+# Pymongo listeners fire from Motor's worker threads, hence the locks.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name, self.help_text, self.labels = name, help_text, labels
+        self.values: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+    
+    def inc(self, *label_values, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in self.values.items():
+                lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+        return lines
+
+class Gauge:
+    # Either set explicitly or computed at scrape time from a callback
+    def __init__(self, name: str, help_text: str, labels: tuple = (), fn=None):
+        self.name, self.help_text, self.labels, self.fn = name, help_text, labels, fn
+        self.values: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+    
+    def inc(self, *label_values, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+    
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        if self.fn is not None:
+            lines.append(f"{self.name} {self.fn()}")
+            return lines
+        with self.lock:
+            for label_values, value in self.values.items():
+                lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help_text, self.labels, self.buckets = name, help_text, labels, buckets
+        self.series: Dict[tuple, list] = {}
+        self.lock = threading.Lock()
+    
+    def observe(self, value: float, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_values, (counts, total, count) in self.series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = format_labels(self.labels, label_values, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {count}")
+                lines.append(f"{self.name}_sum{format_labels(self.labels, label_values)} {total}")
+                lines.append(f"{self.name}_count{format_labels(self.labels, label_values)} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+    
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+http_requests_total = metrics.register(Counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status")))
+http_request_duration = metrics.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")))
+mongo_command_duration = metrics.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command", ("collection", "command")))
+mongo_command_failures = metrics.register(Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands by collection and command", ("collection", "command")))
+mongo_pool_connections = metrics.register(Gauge(
+    "mongo_pool_connections", "Open MongoDB pool connections per server", ("address",)))
+mongo_pool_checked_out = metrics.register(Gauge(
+    "mongo_pool_checked_out", "MongoDB connections currently checked out per server", ("address",)))
+password_hash_wait = metrics.register(Histogram(
+    "password_hash_wait_seconds", "Time bcrypt jobs spend queued before a worker picks them up"))
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self.inflight: Dict[tuple, tuple] = {}
+        self.lock = threading.Lock()
+    
+    def started(self, event):
+        # Most commands name their collection as the value of the command key
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        with self.lock:
+            self.inflight[(event.connection_id, event.request_id)] = (collection, event.command_name)
+    
+    def _finish(self, event):
+        with self.lock:
+            return self.inflight.pop((event.connection_id, event.request_id), ("-", event.command_name))
+    
+    def succeeded(self, event):
+        collection, command = self._finish(event)
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, command)
+    
+    def failed(self, event):
+        collection, command = self._finish(event)
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, command)
+        mongo_command_failures.inc(collection, command)
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+    def connection_ready(self, event): pass
+    
+    def connection_created(self, event):
+        mongo_pool_connections.inc(f"{event.address[0]}:{event.address[1]}")
+    
+    def connection_closed(self, event):
+        mongo_pool_connections.dec(f"{event.address[0]}:{event.address[1]}")
+    
+    def connection_checked_out(self, event):
+        mongo_pool_checked_out.inc(f"{event.address[0]}:{event.address[1]}")
+    
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec(f"{event.address[0]}:{event.address[1]}")
+
+class MetricsMiddleware:
+    # Plain ASGI middleware (not BaseHTTPMiddleware) so streaming responses and
+    # WebSockets pass straight through. Routes are labelled by template, e.g.
+    # /api/users/{user_id}, to keep label cardinality bounded.
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status_code = [500]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], template)
+            http_requests_total.inc(scope["method"], template, str(status_code[0]))
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[MongoCommandMetrics(), MongoPoolMetrics()] if METRICS_ENABLED else [],
+)
 db = client[os.environ['DB_NAME']]
 
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 256))
+PASSWORD_REHASH_ON_LOGIN = os.environ.get('PASSWORD_REHASH_ON_LOGIN', 'false').lower() == 'true'
+# min/max rounds make needs_update() flag hashes whose cost differs from BCRYPT_ROUNDS
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+ADMIN_CACHE_TTL_SECONDS = float(os.environ.get('ADMIN_CACHE_TTL_SECONDS', 30))
+ADMIN_CACHE_MAX_ENTRIES = int(os.environ.get('ADMIN_CACHE_MAX_ENTRIES', 1024))
+
+# WebSocket delivery
+WS_SEND_QUEUE_SIZE = int(os.environ.get('WS_SEND_QUEUE_SIZE', 64))
+WS_SEND_TIMEOUT_SECONDS = float(os.environ.get('WS_SEND_TIMEOUT_SECONDS', 5))
+WS_SLOW_CONSUMER_POLICY = os.environ.get('WS_SLOW_CONSUMER_POLICY', 'drop_oldest')  # drop_oldest, drop_newest, disconnect
+WS_PROFILE_FIELDS = ("plan", "school", "grade")
+
+# Cross-worker backplane
+WS_BACKPLANE = os.environ.get('WS_BACKPLANE', 'inprocess')  # inprocess, local, mongo
+WS_BACKPLANE_SOCKET = os.environ.get('WS_BACKPLANE_SOCKET', '/tmp/eduplay-backplane.sock')
+WS_BACKPLANE_CAPPED_BYTES = int(os.environ.get('WS_BACKPLANE_CAPPED_BYTES', 16 * 1024 * 1024))
+WS_PRESENCE_TTL_SECONDS = int(os.environ.get('WS_PRESENCE_TTL_SECONDS', 90))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Offline delivery and live-effect history
+OFFLINE_QUEUE_SIZE = int(os.environ.get('OFFLINE_QUEUE_SIZE', 50))
+OFFLINE_EFFECT_TTL_SECONDS = int(os.environ.get('OFFLINE_EFFECT_TTL_SECONDS', 3600))
+LIVE_EFFECT_HISTORY_TTL_DAYS = int(os.environ.get('LIVE_EFFECT_HISTORY_TTL_DAYS', 90))
+HISTORY_FLUSH_BATCH_SIZE = int(os.environ.get('HISTORY_FLUSH_BATCH_SIZE', 500))
+HISTORY_FLUSH_INTERVAL_SECONDS = float(os.environ.get('HISTORY_FLUSH_INTERVAL_SECONDS', 1))
+
+# Serialization
+# Routes listed here (or "*") skip response_model re-validation and encode the
+# projected Mongo documents directly; e.g. "users,revenue,games".
+FAST_SERIALIZATION_ROUTES = {r.strip() for r in os.environ.get('FAST_SERIALIZATION_ROUTES', '').split(',') if r.strip()}
+
+# Response cache
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 60))
+
+# Pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Dashboard stats
+STATS_DOC_ID = "dashboard"
+
+# Change feed
+CHANGE_FEED_ID = "change_feed"
+CHANGE_SETTLE_SECONDS = float(os.environ.get('CHANGE_SETTLE_SECONDS', 5))
+CHANGE_TOMBSTONE_TTL_DAYS = int(os.environ.get('CHANGE_TOMBSTONE_TTL_DAYS', 30))
+CHANGE_PRUNE_INTERVAL_SECONDS = int(os.environ.get('CHANGE_PRUNE_INTERVAL_SECONDS', 3600))
+STATS_RECONCILE_SECONDS = int(os.environ.get('STATS_RECONCILE_SECONDS', 300))
+
+# Revenue rollups
+REVENUE_DIMENSIONS = ("total", "type", "source")
+
+# Exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 2000))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Leaderboards
+LEADERBOARD_BUCKET_WIDTH = int(os.environ.get('LEADERBOARD_BUCKET_WIDTH', 100))
+LEADERBOARD_RECONCILE_SECONDS = int(os.environ.get('LEADERBOARD_RECONCILE_SECONDS', 3600))
+
+# Search
+USER_PREFIX_FIELDS = ("username", "email", "full_name")
+GAME_PREFIX_FIELDS = ("name",)
+MAX_SEARCH_WINDOW = 1000
+
+# Bulk imports
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
+
+# Build scheduler
+BUILD_SCHEDULER_ENABLED = os.environ.get('BUILD_SCHEDULER_ENABLED', 'true').lower() == 'true'
+BUILD_WORKERS = int(os.environ.get('BUILD_WORKERS', 4))
+BUILD_PER_GAME_CONCURRENCY = int(os.environ.get('BUILD_PER_GAME_CONCURRENCY', 1))
+# Shell-style command run once per build, with BUILD_ID, GAME_ID and
+# BUILD_VERSION in its environment. The scheduler only runs when one is set;
+# without it builds stay pending rather than being reported as built.
+BUILD_COMMAND = os.environ.get('BUILD_COMMAND', '')
+BUILD_TIMEOUT_SECONDS = float(os.environ.get('BUILD_TIMEOUT_SECONDS', 1800))
+BUILD_MAX_ATTEMPTS = int(os.environ.get('BUILD_MAX_ATTEMPTS', 3))
+BUILD_RETRY_BACKOFF_SECONDS = float(os.environ.get('BUILD_RETRY_BACKOFF_SECONDS', 30))
+BUILD_LEASE_SECONDS = float(os.environ.get('BUILD_LEASE_SECONDS', 60))
+BUILD_POLL_INTERVAL_SECONDS = float(os.environ.get('BUILD_POLL_INTERVAL_SECONDS', 5))
+BUILD_LOG_TAIL_BYTES = 2000
 
 # Create the main app
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # WebSocket connection manager
+class ClientConnection:
+    # Each socket gets its own bounded outbound queue drained by a writer task,
+    # so a slow client only ever backs up its own queue.
+    def __init__(self, manager: "ConnectionManager", user_id: str, websocket: WebSocket, profile: Optional[dict] = None):
+        self.manager = manager
+        self.user_id = user_id
+        self.websocket = websocket
+        self.profile = profile or {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+    
+    def start(self):
+        self.writer = asyncio.create_task(self._write_loop())
+    
+    async def _write_loop(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_json(message), WS_SEND_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.manager.disconnect(self.user_id, self)
+            await self.close()
+    
+    def enqueue(self, message: dict) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+        if WS_SLOW_CONSUMER_POLICY == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+            return True
+        if WS_SLOW_CONSUMER_POLICY == "disconnect":
+            self.manager.disconnect(self.user_id, self)
+            asyncio.create_task(self.close())
+        return False
+    
+    async def close(self):
+        try:
+            await self.websocket.close()
+        except:
+            pass
+    
+    def stop(self):
+        if self.writer and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
+        self.active_connections: Dict[str, ClientConnection] = {}
     
-    async def connect(self, user_id: str, websocket: WebSocket):
+    async def connect(self, user_id: str, websocket: WebSocket, profile: Optional[dict] = None) -> ClientConnection:
         await websocket.accept()
-        self.active_connections[user_id] = websocket
+        connection = ClientConnection(self, user_id, websocket, profile)
+        previous = self.active_connections.get(user_id)
+        self.active_connections[user_id] = connection
+        if previous:
+            previous.stop()
+            await previous.close()
+        connection.start()
+        return connection
     
-    def disconnect(self, user_id: str):
-        if user_id in self.active_connections:
+    def disconnect(self, user_id: str, connection: Optional[ClientConnection] = None):
+        current = self.active_connections.get(user_id)
+        if current and (connection is None or current is connection):
             del self.active_connections[user_id]
+            current.stop()
     
-    async def send_personal_message(self, message: dict, user_id: str):
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_json(message)
-            except:
-                self.disconnect(user_id)
+    def update_profile(self, user_id: str, fields: dict):
+        connection = self.active_connections.get(user_id)
+        if connection:
+            connection.profile.update(fields)
+    
+    async def send_personal_message(self, message: dict, user_id: str) -> bool:
+        connection = self.active_connections.get(user_id)
+        if connection:
+            return connection.enqueue(message)
+        return False
+    
+    def select(self, user_ids: Optional[List[str]] = None, **profile_filter) -> List[ClientConnection]:
+        if user_ids is not None:
+            connections = [self.active_connections[uid] for uid in set(user_ids) if uid in self.active_connections]
+        else:
+            connections = list(self.active_connections.values())
+        profile_filter = {k: v for k, v in profile_filter.items() if v is not None}
+        if profile_filter:
+            connections = [
+                c for c in connections
+                if all(c.profile.get(k) == v for k, v in profile_filter.items())
+            ]
+        return connections
+    
+    async def broadcast(self, message: dict, connections: List[ClientConnection]) -> int:
+        # Enqueueing never awaits the network, so fan-out cost is O(recipients)
+        # and the per-connection writers deliver concurrently.
+        return sum(connection.enqueue(message) for connection in connections)
 
 manager = ConnectionManager()
+# Admin dashboards get their own manager so user broadcasts never reach them
+admin_manager = ConnectionManager()
+
+metrics.register(Gauge(
+    "websocket_connections", "WebSocket connections owned by this worker",
+    fn=lambda: len(manager.active_connections)))
+metrics.register(Gauge(
+    "websocket_send_queue_depth", "Messages waiting in all per-connection send queues",
+    fn=lambda: sum(c.queue.qsize() for c in manager.active_connections.values())))
+metrics.register(Gauge(
+    "websocket_send_queue_max_depth", "Deepest per-connection send queue",
+    fn=lambda: max((c.queue.qsize() for c in manager.active_connections.values()), default=0)))
+
+# Backplanes fan every published envelope out to all workers; each worker then
+# delivers to the sockets it owns. Envelopes look like
+# {"kind": "direct", "user_id": ..., "message": ...} or
+# {"kind": "broadcast", "target": {...}, "message": ...}; {"kind": "admin",
+# "message": ...} goes to every connected admin dashboard and {"kind":
+# "changes", "invalidate": [...], "announce": [...]} carries write notices.
+async def deliver_envelope(envelope: dict):
+    if envelope.get("kind") == "direct":
+        await manager.send_personal_message(envelope["message"], envelope["user_id"])
+    elif envelope.get("kind") == "broadcast":
+        await manager.broadcast(envelope["message"], manager.select(**envelope.get("target", {})))
+    elif envelope.get("kind") == "replay" and envelope["user_id"] in manager.active_connections:
+        await replay_pending_effects(envelope["user_id"])
+    elif envelope.get("kind") == "changes":
+        for collection in envelope.get("invalidate", []):
+            response_cache.bump(collection)
+        if envelope.get("announce"):
+            # Admin dashboards listening on /ws/admin pull /changes when told
+            message = {"type": "changes", "collections": envelope["announce"]}
+            await admin_manager.broadcast(message, admin_manager.select())
+    elif envelope.get("kind") == "admin":
+        await admin_manager.broadcast(envelope["message"], admin_manager.select())
+
+class Backplane(ABC):
+    # Presence defaults to the shared ws_presence collection so every worker
+    # sees the same online set; a heartbeat keeps this worker's rows alive and
+    # the TTL index removes rows left behind by a crashed worker.
+    async def start(self):
+        await db.ws_presence.create_indexes([
+            IndexModel([("user_id", ASCENDING)]),
+            IndexModel([("worker_id", ASCENDING)]),
+            IndexModel([("heartbeat", ASCENDING)], expireAfterSeconds=WS_PRESENCE_TTL_SECONDS),
+        ])
+        self.heartbeat_task = asyncio.create_task(self._heartbeat())
+    
+    async def stop(self):
+        self.heartbeat_task.cancel()
+        await asyncio.gather(self.heartbeat_task, return_exceptions=True)
+        await db.ws_presence.delete_many({"worker_id": WORKER_ID})
+    
+    @abstractmethod
+    async def publish(self, envelope: dict):
+        ...
+    
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(WS_PRESENCE_TTL_SECONDS / 3)
+            try:
+                await db.ws_presence.update_many(
+                    {"worker_id": WORKER_ID}, {"$set": {"heartbeat": datetime.now(timezone.utc)}}
+                )
+            except Exception:
+                logger.exception("Presence heartbeat failed")
+    
+    async def mark_online(self, user_id: str):
+        await db.ws_presence.replace_one(
+            {"_id": f"{WORKER_ID}:{user_id}"},
+            {"user_id": user_id, "worker_id": WORKER_ID, "heartbeat": datetime.now(timezone.utc)},
+            upsert=True,
+        )
+    
+    async def mark_offline(self, user_id: str):
+        await db.ws_presence.delete_one({"_id": f"{WORKER_ID}:{user_id}"})
+    
+    async def is_online(self, user_id: str) -> bool:
+        return await db.ws_presence.find_one({"user_id": user_id}, {"_id": 1}) is not None
+    
+    async def online_users(self, limit: int) -> List[str]:
+        pipeline = [{"$group": {"_id": "$user_id"}}, {"$limit": limit}]
+        return [doc["_id"] async for doc in db.ws_presence.aggregate(pipeline)]
+
+class InProcessBackplane(Backplane):
+    # Single-process deployments and tests: publish is a direct local delivery.
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    async def publish(self, envelope: dict):
+        await deliver_envelope(envelope)
+    
+    async def mark_online(self, user_id: str):
+        pass
+    
+    async def mark_offline(self, user_id: str):
+        pass
+    
+    async def is_online(self, user_id: str) -> bool:
+        return user_id in manager.active_connections
+    
+    async def online_users(self, limit: int) -> List[str]:
+        return list(manager.active_connections)[:limit]
+
+class LocalSocketBackplane(Backplane):
+    # Single-host multi-worker: the worker holding an exclusive flock on
+    # <path>.lock is the hub; it binds the Unix socket and relays every NDJSON
+    # line to all workers (itself included). Binding alone can't elect a hub,
+    # since a second bind just replaces the socket file. The OS drops the lock
+    # when the hub dies, and the remaining workers re-elect by retrying it.
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_fd: Optional[int] = None
+        self.server = None
+        self.peers: List[asyncio.StreamWriter] = []
+        self.hub_writer: Optional[asyncio.StreamWriter] = None
+        self.connected = asyncio.Event()
+    
+    async def start(self):
+        await super().start()
+        self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        if self.server:
+            self.server.close()
+            # Closing the server keeps accepted connections open; drop them so
+            # the peers see EOF and re-elect now rather than at process exit.
+            for peer in list(self.peers):
+                peer.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+        await super().stop()
+    
+    async def _run(self):
+        while True:
+            try:
+                reader, self.hub_writer = await asyncio.open_unix_connection(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                if await self._become_hub():
+                    return
+                await asyncio.sleep(0.1)
+                continue
+            self.connected.set()
+            try:
+                while line := await reader.readline():
+                    await deliver_envelope(json.loads(line))
+            except (ConnectionError, ValueError):
+                pass
+            finally:
+                self.connected.clear()
+                self.hub_writer = None
+    
+    async def _become_hub(self) -> bool:
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # Another worker is (or is about to be) the hub
+            os.close(fd)
+            return False
+        # Only the lock holder may touch the socket path
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        try:
+            self.server = await asyncio.start_unix_server(self._serve_peer, path=self.path)
+        except OSError:
+            os.close(fd)
+            return False
+        self.lock_fd = fd
+        self.connected.set()
+        return True
+    
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.peers.append(writer)
+        try:
+            while line := await reader.readline():
+                await self._relay(line)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.peers.remove(writer)
+    
+    async def _relay(self, line: bytes):
+        for peer in list(self.peers):
+            try:
+                peer.write(line)
+            except ConnectionError:
+                pass
+        await deliver_envelope(json.loads(line))
+    
+    async def publish(self, envelope: dict):
+        line = (json.dumps(envelope) + "\n").encode()
+        await asyncio.wait_for(self.connected.wait(), WS_SEND_TIMEOUT_SECONDS)
+        if self.server:
+            await self._relay(line)
+        else:
+            self.hub_writer.write(line)
+            await self.hub_writer.drain()
+
+class MongoBackplane(Backplane):
+    # Multi-host: envelopes are appended to a capped collection and every
+    # worker follows it with a tailable, awaitData cursor.
+    async def start(self):
+        await super().start()
+        try:
+            await db.create_collection("ws_backplane", capped=True, size=WS_BACKPLANE_CAPPED_BYTES)
+            # A tailable cursor on an empty capped collection dies immediately
+            await db.ws_backplane.insert_one({"kind": "noop"})
+        except CollectionInvalid:
+            pass
+        except OperationFailure as exc:
+            # NamespaceExists: another worker created it between our checks
+            if exc.code != 48:
+                raise
+        self.task = asyncio.create_task(self._tail())
+    
+    async def stop(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        await super().stop()
+    
+    async def publish(self, envelope: dict):
+        await db.ws_backplane.insert_one({**envelope, "origin": WORKER_ID})
+    
+    async def _tail(self):
+        # Insertion ($natural) order is the only order every worker agrees on:
+        # ObjectIds are generated by each client, so a host whose clock lags
+        # writes ids below ones already delivered. Each (re)opened cursor reads
+        # from the start of the collection and skips up to the last envelope
+        # seen; if that one has already been overwritten, everything still in
+        # the collection is newer.
+        last = await db.ws_backplane.find_one({}, sort=[("$natural", -1)])
+        last_id = last["_id"] if last else None
+        while True:
+            if last_id is not None and not await db.ws_backplane.find_one({"_id": last_id}, {"_id": 1}):
+                last_id = None
+            skipping = last_id is not None
+            cursor = db.ws_backplane.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                while cursor.alive:
+                    async for doc in cursor:
+                        if skipping:
+                            skipping = doc["_id"] != last_id
+                            continue
+                        last_id = doc["_id"]
+                        await deliver_envelope(doc)
+            except Exception:
+                logger.exception("Backplane tail failed, restarting")
+            await asyncio.sleep(1)
+
+def create_backplane() -> Backplane:
+    if WS_BACKPLANE == "mongo":
+        return MongoBackplane()
+    if WS_BACKPLANE == "local":
+        return LocalSocketBackplane(WS_BACKPLANE_SOCKET)
+    return InProcessBackplane()
+
+backplane = create_backplane()
+
+# Offline users get a single pending_effects document holding a bounded,
+# ordered array ($push with $slice keeps the newest OFFLINE_QUEUE_SIZE); it is
+# drained atomically with find_one_and_delete when the user reconnects, and the
+# TTL index drops it once its latest message has expired.
+async def queue_pending_effect(user_id: str, message: dict, expires_at: datetime):
+    await db.pending_effects.update_one(
+        {"_id": user_id},
+        {
+            "$push": {"messages": {"$each": [{"message": message, "expires_at": expires_at}], "$slice": -OFFLINE_QUEUE_SIZE}},
+            "$max": {"expires_at": expires_at},
+        },
+        upsert=True,
+    )
+
+async def replay_pending_effects(user_id: str) -> int:
+    pending = await db.pending_effects.find_one_and_delete({"_id": user_id})
+    if not pending:
+        return 0
+    now = datetime.now(timezone.utc)
+    replayed = 0
+    for item in pending.get("messages", []):
+        expires_at = item["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at > now:
+            replayed += await manager.send_personal_message(item["message"], user_id)
+    return replayed
+
+class WriteBehindBuffer:
+    # Collects documents in memory and writes them with insert_many, either when
+    # a batch fills up or every flush interval, instead of one insert per event.
+    def __init__(self, collection, batch_size: int, flush_interval: float):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: List[dict] = []
+    
+    async def add(self, doc: dict):
+        self.pending.append(doc)
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+    
+    async def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except Exception:
+            logger.exception("Write-behind flush of %d documents failed", len(batch))
+    
+    async def run(self):
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+live_effect_history = WriteBehindBuffer(db.live_effects, HISTORY_FLUSH_BATCH_SIZE, HISTORY_FLUSH_INTERVAL_SECONDS)
+
+class ResponseCache:
+    # Encoded response bodies keyed by route and query, tagged with the version
+    # of every collection they were built from. Write paths bump the version,
+    # so a stale entry is simply never matched again and ages out of the LRU.
+    # The TTL is a backstop for writes that bypass the API.
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.versions: Dict[str, int] = {}
+        self.entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+    
+    def version(self, collections: tuple) -> tuple:
+        return tuple(self.versions.get(c, 0) for c in collections)
+    
+    def bump(self, collection: str):
+        self.versions[collection] = self.versions.get(collection, 0) + 1
+    
+    def get(self, key: tuple, version: tuple) -> Optional[tuple]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry_version, expires_at, etag, body, headers = entry
+        if entry_version != version or expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return etag, body, headers
+    
+    def put(self, key: tuple, version: tuple, etag: str, body: bytes, headers: dict):
+        self.entries[key] = (version, time.monotonic() + self.ttl_seconds, etag, body, headers)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def clear(self):
+        self.entries.clear()
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+# Write notices are best-effort and leave the request path: the write has
+# already committed, so a slow or failing backplane must not turn it into an
+# error. Notices queued before the flush task runs share one envelope.
+pending_invalidations: Dict[str, None] = {}
+pending_announcements: Dict[str, None] = {}
+notification_task: Optional[asyncio.Task] = None
+
+async def publish_quietly(envelope: dict):
+    try:
+        await backplane.publish(envelope)
+    except Exception:
+        logger.exception("Backplane publish of %s envelope failed", envelope.get("kind"))
+
+async def flush_notifications():
+    while pending_invalidations or pending_announcements:
+        envelope = {
+            "kind": "changes",
+            "invalidate": list(pending_invalidations),
+            "announce": list(pending_announcements),
+        }
+        pending_invalidations.clear()
+        pending_announcements.clear()
+        await publish_quietly(envelope)
+
+def queue_notification(invalidate=(), announce=()):
+    global notification_task
+    pending_invalidations.update(dict.fromkeys(invalidate))
+    pending_announcements.update(dict.fromkeys(announce))
+    if notification_task is None or notification_task.done():
+        notification_task = asyncio.create_task(flush_notifications())
+
+def invalidate_responses(*collections: str):
+    # Bump locally right away so this worker never serves its own stale write,
+    # then let the backplane tell the other workers.
+    for collection in collections:
+        response_cache.bump(collection)
+    queue_notification(invalidate=collections)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+async def cached_response(request: Request, collections: tuple, encode, loader) -> Response:
+    # The version is read before loading so a write that lands mid-load leaves
+    # the new entry already stale rather than caching pre-write data as current.
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    version = response_cache.version(collections)
+    cached = response_cache.get(key, version)
+    if cached is None:
+        scratch = Response()
+        content = await loader(scratch)
+        body = encode(content)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = {k: v for k, v in scratch.headers.items() if k.lower() == "x-next-cursor"}
+        response_cache.put(key, version, etag, body, headers)
+    else:
+        etag, body, headers = cached
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, **headers})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, **headers})
 
 # Models
 class Admin(BaseModel):
@@ -66,6 +894,7 @@ class Admin(BaseModel):
     status: str = "active"
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     last_login: Optional[str] = None
+    revision: int = 0
 
 class AdminCreate(BaseModel):
     email: EmailStr
@@ -100,6 +929,7 @@ class User(BaseModel):
     joined_date: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     last_login: Optional[str] = None
     subscription_expires: Optional[str] = None
+    revision: int = 0
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -113,6 +943,7 @@ class UserCreate(BaseModel):
     grade: Optional[str] = None
 
 class UserUpdate(BaseModel):
+    # total_games_played and total_score are maintained by session ingestion only
     email: Optional[EmailStr] = None
     username: Optional[str] = None
     full_name: Optional[str] = None
@@ -123,8 +954,6 @@ class UserUpdate(BaseModel):
     age: Optional[int] = None
     school: Optional[str] = None
     grade: Optional[str] = None
-    total_games_played: Optional[int] = None
-    total_score: Optional[int] = None
     subscription_expires: Optional[str] = None
     credit_card_last4: Optional[str] = None
     credit_card_type: Optional[str] = None
@@ -143,6 +972,26 @@ class Game(BaseModel):
     rating: float = 0.0
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    revision: int = 0
+
+class GameUpdate(BaseModel):
+    # play_count and rating are maintained by session ingestion only
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    difficulty: Optional[str] = None
+    status: Optional[str] = None
+    version: Optional[str] = None
+
+class GameSession(BaseModel):
+    user_id: str
+    game_id: str
+    score: int = Field(0, ge=0)
+    rating: Optional[float] = Field(None, ge=1, le=5)
+    played_at: Optional[datetime] = None  # defaults to when the batch is received
+
+class GameSessionBatch(BaseModel):
+    sessions: List[GameSession] = Field(..., min_length=1, max_length=10000)
 
 class Build(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -150,9 +999,13 @@ class Build(BaseModel):
     game_id: str
     game_name: str
     version: str
-    status: str = "pending"
+    status: str = "pending"  # pending, running, completed, failed
     build_date: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     notes: Optional[str] = None
+    attempts: int = 0
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
 
 class Update(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -174,6 +1027,22 @@ class Revenue(BaseModel):
     description: str
     type: str  # subscription, purchase, donation
 
+class LiveEffectBroadcast(BaseModel):
+    user_ids: Optional[List[str]] = None
+    plan: Optional[str] = None
+    school: Optional[str] = None
+    grade: Optional[str] = None
+    all_connected: bool = False
+    effect_type: str
+    content: str
+    duration: Optional[int] = 5000
+
+class AdminPrincipal(BaseModel):
+    id: str
+    username: str
+    role: str
+    status: str
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -187,13 +1056,179 @@ class LiveEffect(BaseModel):
     effect_type: str  # text, image, notification
     content: str
     duration: Optional[int] = 5000  # milliseconds
+    ttl_seconds: Optional[int] = None  # how long to hold for an offline user
+
+class RevenueSummaryRow(BaseModel):
+    period: str
+    group: Optional[str] = None
+    amount: float
+    count: int
+
+class RevenueSummary(BaseModel):
+    granularity: str
+    group_by: str
+    rows: List[RevenueSummaryRow]
+
+def dumps_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode()
+
+def scalar_type(annotation) -> Optional[type]:
+    # str, int or float, unwrapping Optional[...]; None for anything else
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    return annotation if annotation in (str, int, float) else None
+
+class ListSerializer:
+    # Two ways to turn a page of Mongo documents into the response_model schema:
+    # the validated path runs every document through pydantic (what FastAPI's
+    # response_model does), while the fast path trusts documents that were
+    # projected to exactly the model's fields and only fills in plain defaults
+    # for missing keys before a single orjson encode. A document missing a
+    # required or generated (default_factory) field takes the validated path,
+    # so it is filled in or rejected exactly as FastAPI would, never nulled.
+    # Scalars are brought to their annotated type (an int stored in a float
+    # field encodes as 4.0, as pydantic would); a value that pydantic would
+    # have to parse or reject sends the document down the validated path.
+    def __init__(self, route: str, model):
+        self.route = route
+        self.adapter = TypeAdapter(List[model])
+        self.item_adapter = TypeAdapter(model)
+        self.fields = [
+            (name, None if field.is_required() or field.default_factory else field.default, scalar_type(field.annotation))
+            for name, field in model.model_fields.items()
+        ]
+        self.required = tuple(
+            name for name, field in model.model_fields.items() if field.is_required() or field.default_factory
+        )
+        self.projection = {"_id": 0, **{name: 1 for name, _, _ in self.fields}}
+    
+    @property
+    def fast(self) -> bool:
+        return self.route in FAST_SERIALIZATION_ROUTES or "*" in FAST_SERIALIZATION_ROUTES
+    
+    def encode(self, docs: List[dict]) -> bytes:
+        if self.fast:
+            return dumps_json([self._fast_doc(doc) for doc in docs])
+        return self.adapter.dump_json(self.adapter.validate_python(docs))
+    
+    def _fast_doc(self, doc: dict) -> dict:
+        if any(name not in doc for name in self.required):
+            return self._validated_doc(doc)
+        out = {}
+        for name, default, kind in self.fields:
+            value = doc.get(name, default)
+            if kind is not None and value is not None and type(value) is not kind:
+                if kind is float and type(value) is int:
+                    value = float(value)
+                elif kind is int and type(value) is float and value.is_integer():
+                    value = int(value)
+                else:
+                    return self._validated_doc(doc)
+            out[name] = value
+        return out
+    
+    def _validated_doc(self, doc: dict) -> dict:
+        return self.item_adapter.dump_python(self.item_adapter.validate_python(doc), mode="json")
+    
+    def respond(self, docs: List[dict], response: Response):
+        # On the validated path the docs go back to FastAPI untouched
+        if not self.fast:
+            return docs
+        headers = {k: v for k, v in response.headers.items() if k.lower() == "x-next-cursor"}
+        return Response(content=self.encode(docs), media_type="application/json", headers=headers)
+
+admin_serializer = ListSerializer("admins", Admin)
+user_serializer = ListSerializer("users", User)
+game_serializer = ListSerializer("games", Game)
+build_serializer = ListSerializer("builds", Build)
+update_serializer = ListSerializer("updates", Update)
+revenue_serializer = ListSerializer("revenue", Revenue)
+
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[Dict[str, Any]]
+
+class BulkImportResult(BaseModel):
+    received: int
+    inserted: int
+    failed: List[BulkRowError]
+
+# Password hashing
+class PasswordHasher:
+    # bcrypt releases the GIL, so a small thread pool keeps the event loop free
+    # while capping how many hashes run at once. Callers beyond max_pending are
+    # shed with a 503 instead of queueing without bound.
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+    
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Password hashing is overloaded, retry shortly")
+        self.pending += 1
+        queued_at = time.perf_counter()
+        started = {}
+        
+        def timed():
+            started["at"] = time.perf_counter()
+            return fn(*args)
+        
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            finished_at = time.perf_counter()
+            started_at = started.get("at", finished_at)
+            wait = started_at - queued_at
+            password_hash_wait.observe(wait)
+            self.pending -= 1
+            self.completed += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.total_run_seconds += finished_at - started_at
+    
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(pwd_context.verify, plain_password, hashed_password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple:
+        return await self.run(pwd_context.verify_and_update, plain_password, hashed_password)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / self.completed, 3) if self.completed else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 3),
+            "avg_run_ms": round(1000 * self.total_run_seconds / self.completed, 3) if self.completed else 0.0,
+        }
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
 
 # Helper functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -201,16 +1236,366 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def encode_cursor(doc: dict, sort_field: str) -> str:
+    raw = json.dumps([doc.get(sort_field), doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        return value, last_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_filter(**fields) -> dict:
+    return {k: v for k, v in fields.items() if v is not None}
+
+async def paginate(collection, query: dict, sort_field: str, limit: int, after: Optional[str], response: Response, projection: Optional[dict] = None):
+    # Keyset pagination over (sort_field, id) descending; the next cursor is returned
+    # in the X-Next-Cursor header so list responses keep their plain-array shape.
+    # A response holds at most `limit` rows; the dashboard tabs fetch one page
+    # and follow the header only when asked to load more (hooks/use-paged-list.js).
+    if after:
+        value, last_id = decode_cursor(after)
+        query = {"$and": [query, {"$or": [
+            {sort_field: {"$lt": value}},
+            {sort_field: value, "id": {"$lt": last_id}},
+        ]}]}
+    cursor = collection.find(query, projection or {"_id": 0})
+    cursor = cursor.sort([(sort_field, DESCENDING), ("id", DESCENDING)]).limit(limit + 1)
+    docs = await cursor.to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(docs[-1], sort_field)
+    return docs
+
+async def compute_dashboard_stats() -> dict:
+    # One aggregation round trip: users are grouped in place and the games and
+    # revenue totals are appended with $unionWith, each tagged by collection.
+    groupings = {
+        "users": {"$group": {
+            "_id": "users",
+            "total": {"$sum": 1},
+            "upgraded": {"$sum": {"$cond": [{"$eq": ["$plan", "Upgraded"]}, 1, 0]}},
+        }},
+        "games": {"$group": {"_id": "games", "total": {"$sum": 1}}},
+        "revenue": {"$group": {"_id": "revenue", "total": {"$sum": "$amount"}}},
+    }
+    pipeline = [groupings["users"]] + [
+        {"$unionWith": {"coll": name, "pipeline": [groupings[name]]}} for name in ("games", "revenue")
+    ]
+    try:
+        groups = {doc["_id"]: doc async for doc in db.users.aggregate(pipeline)}
+    except (OperationFailure, NotImplementedError):
+        # No $unionWith before MongoDB 4.4, nor in the in-memory stand-in that
+        # benchmark.py can run against: one aggregation per collection instead.
+        results = await asyncio.gather(*(
+            db[name].aggregate([grouping]).to_list(None) for name, grouping in groupings.items()
+        ))
+        groups = {doc["_id"]: doc for docs in results for doc in docs}
+    users = groups.get("users", {})
+    return {
+        "total_users": users.get("total", 0),
+        "upgraded_users": users.get("upgraded", 0),
+        "total_games": groups.get("games", {}).get("total", 0),
+        "total_revenue": groups.get("revenue", {}).get("total", 0),
+    }
+
+async def reconcile_dashboard_stats() -> dict:
+    stats = await compute_dashboard_stats()
+    await db.stats.replace_one({"_id": STATS_DOC_ID}, stats, upsert=True)
+    invalidate_responses("stats")
+    return stats
+
+async def bump_stats(**deltas):
+    # Counters are only bumped once the cache document exists; until then the
+    # next dashboard read (or the reconcile job) computes them from scratch.
+    deltas = {k: v for k, v in deltas.items() if v}
+    if deltas:
+        await db.stats.update_one({"_id": STATS_DOC_ID}, {"$inc": deltas})
+        invalidate_responses("stats")
+
+def revenue_buckets(date_str: str) -> Dict[str, str]:
+    day = date.fromisoformat(date_str[:10])
+    week_start = day - timedelta(days=day.weekday())
+    return {"day": day.isoformat(), "week": week_start.isoformat(), "month": day.isoformat()[:7]}
+
+def revenue_rollup_ops(buckets: Dict[str, str], type_: str, source: str, amount: float, count: int = 1) -> List[UpdateOne]:
+    keys = {"total": None, "type": type_, "source": source}
+    return [
+        UpdateOne(
+            {"granularity": granularity, "dimension": dimension, "key": keys[dimension], "bucket": bucket},
+            {"$inc": {"amount": amount, "count": count}},
+            upsert=True,
+        )
+        for granularity, bucket in buckets.items()
+        for dimension in REVENUE_DIMENSIONS
+    ]
+
+def accumulate_revenue_rollup(totals: Dict[tuple, List[float]], doc: dict):
+    buckets = revenue_buckets(doc["date"])
+    keys = {"total": None, "type": doc.get("type"), "source": doc.get("source")}
+    for granularity, bucket in buckets.items():
+        for dimension in REVENUE_DIMENSIONS:
+            entry = totals.setdefault((granularity, dimension, keys[dimension], bucket), [0.0, 0])
+            entry[0] += doc.get("amount", 0)
+            entry[1] += 1
+
+async def rebuild_revenue_rollups():
+    # One pass over the raw ledger for backfills only; day to day the rollups
+    # are maintained incrementally by create_revenue.
+    totals: Dict[tuple, List[float]] = {}
+    async for doc in db.revenue.find({}, {"_id": 0, "date": 1, "amount": 1, "type": 1, "source": 1}).batch_size(1000):
+        try:
+            accumulate_revenue_rollup(totals, doc)
+        except (KeyError, ValueError):
+            continue
+    await db.revenue_rollups.delete_many({})
+    ops = [
+        UpdateOne(
+            {"granularity": g, "dimension": d, "key": k, "bucket": b},
+            {"$set": {"amount": amount, "count": count}},
+            upsert=True,
+        )
+        for (g, d, k, b), (amount, count) in totals.items()
+    ]
+    for i in range(0, len(ops), 1000):
+        await db.revenue_rollups.bulk_write(ops[i:i + 1000], ordered=False)
+
+async def run_periodically(interval: float, job, name: str):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception:
+            logger.exception("%s failed", name)
+
+# Change feed
+# Every write to a synced collection stamps the document with change_seq, a
+# number drawn from one counter shared by all collections, and deletes leave a
+# tombstone carrying its own sequence number. /changes then only needs a range
+# scan on change_seq per collection. Tokens are "<epoch>:<seq>": the epoch is
+# replaced when the data is reset so clients know to reload from scratch.
+class ChangeEntry(BaseModel):
+    seq: int
+    collection: str
+    op: Literal["upsert", "delete"]
+    id: str
+    doc: Optional[Dict[str, Any]] = None
+
+class ChangeFeed(BaseModel):
+    token: str
+    reset: bool = False
+    has_more: bool = False
+    changes: List[ChangeEntry]
+
+CHANGE_SERIALIZERS = {
+    "admins": admin_serializer,
+    "users": user_serializer,
+    "games": game_serializer,
+    "builds": build_serializer,
+    "updates": update_serializer,
+    "revenue": revenue_serializer,
+}
+
+async def change_feed_state() -> dict:
+    return await db.stats.find_one_and_update(
+        {"_id": CHANGE_FEED_ID},
+        {"$setOnInsert": {"seq": 0, "epoch": uuid.uuid4().hex, "pruned_through": 0}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def reserve_changes(count: int = 1) -> int:
+    # Returns the first of `count` consecutive sequence numbers
+    feed = await db.stats.find_one_and_update(
+        {"_id": CHANGE_FEED_ID},
+        {"$inc": {"seq": count}, "$setOnInsert": {"epoch": uuid.uuid4().hex, "pruned_through": 0}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return feed["seq"] - count + 1
+
+def change_fields(seq: int) -> dict:
+    return {"change_seq": seq, "change_at": datetime.now(timezone.utc)}
+
+def announce_changes(*collections: str):
+    queue_notification(announce=collections)
+
+async def record_tombstone(collection: str, doc_id: str):
+    seq = await reserve_changes()
+    await db.change_tombstones.insert_one({"collection": collection, "id": doc_id, **change_fields(seq)})
+    announce_changes(collection)
+
+async def reset_change_feed():
+    await db.change_tombstones.delete_many({})
+    await db.stats.update_one(
+        {"_id": CHANGE_FEED_ID},
+        {"$set": {"epoch": uuid.uuid4().hex}, "$setOnInsert": {"seq": 0, "pruned_through": 0}},
+        upsert=True,
+    )
+
+async def prune_change_tombstones():
+    # Tokens older than the newest pruned tombstone could miss a delete, so
+    # the feed answers them with reset instead.
+    cutoff = datetime.now(timezone.utc) - timedelta(days=CHANGE_TOMBSTONE_TTL_DAYS)
+    newest = await db.change_tombstones.find_one(
+        {"change_at": {"$lt": cutoff}}, {"_id": 0, "change_seq": 1}, sort=[("change_seq", DESCENDING)]
+    )
+    if newest is None:
+        return
+    await db.stats.update_one({"_id": CHANGE_FEED_ID}, {"$max": {"pruned_through": newest["change_seq"]}})
+    await db.change_tombstones.delete_many({"change_seq": {"$lte": newest["change_seq"]}})
+
+def parse_change_token(token: str) -> tuple:
+    epoch, _, seq = token.partition(":")
+    try:
+        return epoch, int(seq)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid change token")
+
+class PrincipalCache:
+    # TTL + LRU cache of admin principals. update_admin/delete_admin invalidate
+    # entries in this process; the TTL bounds how long other workers can keep
+    # honouring a revoked or demoted admin.
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def get(self, admin_id: str) -> Optional[AdminPrincipal]:
+        entry = self.entries.get(admin_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self.entries[admin_id]
+            return None
+        self.entries.move_to_end(admin_id)
+        return principal
+    
+    def put(self, principal: AdminPrincipal):
+        self.entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+        self.entries.move_to_end(principal.id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def invalidate(self, admin_id: str):
+        self.entries.pop(admin_id, None)
+    
+    def clear(self):
+        self.entries.clear()
+
+principal_cache = PrincipalCache(ADMIN_CACHE_TTL_SECONDS, ADMIN_CACHE_MAX_ENTRIES)
+
+def create_admin_token(admin: dict) -> str:
+    return create_access_token({
+        "sub": admin["id"],
+        "username": admin["username"],
+        "role": admin.get("role", "admin"),
+        "status": admin.get("status", "active"),
+    })
+
+def with_search_fields(doc: dict, fields: tuple) -> dict:
+    # Lowercased copies back case-insensitive prefix search with plain
+    # anchored-regex index scans; they are never part of API responses.
+    for field in fields:
+        if isinstance(doc.get(field), str):
+            doc[f"{field}_lc"] = doc[field].lower()
+    return doc
+
+async def ranked_search(collection, q: str, prefix_fields: tuple, base_query: dict, limit: int, offset: int) -> List[dict]:
+    # Prefix hits on the normalized fields always outrank full-text hits; an
+    # exact match on the first prefix field ranks highest of all. Each source
+    # is read in a fixed order on an indexed key ((field_lc, id) per prefix
+    # field, (textScore, id) for text) and the merge is a total order, so the
+    # first `window` results are the same on every call and offset pages
+    # neither overlap nor skip.
+    window = offset + limit
+    needle = q.strip().lower()
+    prefix = {"$regex": "^" + re.escape(needle)}
+    text_query = {**base_query, "$text": {"$search": q}}
+    
+    *prefix_hits, text_hits = await asyncio.gather(
+        *(
+            collection.find({**base_query, f"{field}_lc": prefix}, {"_id": 0})
+                .sort([(f"{field}_lc", ASCENDING), ("id", ASCENDING)]).limit(window).to_list(window)
+            for field in prefix_fields
+        ),
+        collection.find(text_query, {"_id": 0, "score": {"$meta": "textScore"}})
+            .sort([("score", {"$meta": "textScore"}), ("id", ASCENDING)]).limit(window).to_list(window),
+    )
+    
+    # A document matching several fields ranks by its best (smallest) value;
+    # the top `window` of this order is always within the per-field windows.
+    ranked: Dict[str, tuple] = {}
+    for field, hits in zip(prefix_fields, prefix_hits):
+        for doc in hits:
+            exact = doc.get(f"{prefix_fields[0]}_lc") == needle
+            key = (0 if exact else 1, doc[f"{field}_lc"], doc["id"])
+            if doc["id"] not in ranked or key < ranked[doc["id"]][0]:
+                ranked[doc["id"]] = (key, doc)
+    ordered = [doc for _, doc in sorted(ranked.values(), key=lambda item: item[0])][:window]
+    for doc in text_hits:
+        doc.pop("score", None)
+        if doc["id"] not in ranked:
+            ordered.append(doc)
+    return ordered[offset:window]
+
+def parse_if_match(request: Request) -> Optional[int]:
+    value = request.headers.get("if-match")
+    if value is None or value.strip() == "*":
+        return None
+    try:
+        return int(value.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a revision number")
+
+def revision_query(doc_id: str, expected: Optional[int]) -> dict:
+    query = {"id": doc_id}
+    if expected is not None:
+        # Documents written before revisions existed count as revision 0
+        query["revision"] = expected if expected else {"$in": [0, None]}
+    return query
+
+async def raise_update_miss(collection, doc_id: str, expected: Optional[int], label: str):
+    if expected is not None and await collection.find_one({"id": doc_id}, {"_id": 1}):
+        raise HTTPException(status_code=409, detail=f"{label} was modified by someone else")
+    raise HTTPException(status_code=404, detail=f"{label} not found")
+
+def set_revision_etag(response: Response, doc: dict):
+    response.headers["ETag"] = f'"{doc.get("revision", 0)}"'
+
+async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AdminPrincipal:
+    return await authenticate_admin(credentials.credentials)
+
+async def authenticate_admin(token: str) -> AdminPrincipal:
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        admin_id: str = payload.get("sub")
-        if admin_id is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication")
-        return admin_id
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication")
+    admin_id: str = payload.get("sub")
+    if admin_id is None or payload.get("status", "active") != "active":
+        raise HTTPException(status_code=401, detail="Invalid authentication")
+    
+    principal = principal_cache.get(admin_id)
+    if principal is None:
+        # Cache miss: confirm the admin still exists and is active, so the
+        # role in use is never older than ADMIN_CACHE_TTL_SECONDS.
+        admin = await db.admins.find_one({"id": admin_id}, {"_id": 0, "id": 1, "username": 1, "role": 1, "status": 1})
+        if not admin:
+            raise HTTPException(status_code=401, detail="Invalid authentication")
+        principal = AdminPrincipal(
+            id=admin["id"],
+            username=admin["username"],
+            role=admin.get("role", "admin"),
+            status=admin.get("status", "active"),
+        )
+        principal_cache.put(principal)
+    if principal.status != "active":
+        raise HTTPException(status_code=401, detail="Invalid authentication")
+    return principal
 
 # Routes
 @api_router.post("/admin/register", response_model=Admin)
@@ -221,87 +1606,160 @@ async def register_admin(admin: AdminCreate):
         raise HTTPException(status_code=400, detail="Admin already exists")
     
     # Hash password and create admin
-    hashed_password = hash_password(admin.password)
+    hashed_password = await hash_password(admin.password)
     admin_dict = admin.model_dump()
     admin_dict.pop("password")
     admin_obj = Admin(**admin_dict)
     
     doc = admin_obj.model_dump()
     doc["hashed_password"] = hashed_password
+    doc.update(change_fields(await reserve_changes()))
     
     await db.admins.insert_one(doc)
+    announce_changes("admins")
     return admin_obj
 
 @api_router.post("/admin/login", response_model=Token)
 async def login_admin(login: LoginRequest):
     admin = await db.admins.find_one({"username": login.username}, {"_id": 0})
-    if not admin or not verify_password(login.password, admin["hashed_password"]):
+    if not admin:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
+    # verify_and_update re-hashes whenever the stored cost differs from
+    # BCRYPT_ROUNDS, so only pay for that second hash when it will be stored.
+    new_hash = None
+    if PASSWORD_REHASH_ON_LOGIN:
+        valid, new_hash = await password_hasher.verify_and_update(login.password, admin["hashed_password"])
+    else:
+        valid = await password_hasher.verify(login.password, admin["hashed_password"])
+    if not valid:
+        raise HTTPException(status_code=401, detail="Incorrect username or password")
+    if admin.get("status", "active") != "active":
+        raise HTTPException(status_code=403, detail="Admin account is disabled")
     
-    # Update last login
-    await db.admins.update_one(
-        {"id": admin["id"]},
-        {"$set": {"last_login": datetime.now(timezone.utc).isoformat()}}
-    )
+    # Update last login, upgrading the stored hash to the current cost if enabled
+    login_update = {"last_login": datetime.now(timezone.utc).isoformat()}
+    if new_hash:
+        login_update["hashed_password"] = new_hash
+    login_update.update(change_fields(await reserve_changes()))
+    await db.admins.update_one({"id": admin["id"]}, {"$set": login_update})
+    announce_changes("admins")
     
-    access_token = create_access_token({"sub": admin["id"]})
+    access_token = create_admin_token(admin)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @api_router.get("/admin/me", response_model=Admin)
-async def get_current_admin_info(admin_id: str = Depends(get_current_admin)):
-    admin = await db.admins.find_one({"id": admin_id}, {"_id": 0, "hashed_password": 0})
+async def get_current_admin_info(principal: AdminPrincipal = Depends(get_current_admin)):
+    admin = await db.admins.find_one({"id": principal.id}, {"_id": 0, "hashed_password": 0})
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     return admin
 
 @api_router.get("/admins", response_model=List[Admin])
-async def get_admins(admin_id: str = Depends(get_current_admin)):
-    admins = await db.admins.find({}, {"_id": 0, "hashed_password": 0}).to_list(1000)
-    return admins
+async def get_admins(
+    response: Response,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(role=role, status=status)
+    docs = await paginate(db.admins, query, "created_at", limit, after, response, admin_serializer.projection)
+    return admin_serializer.respond(docs, response)
 
 @api_router.put("/admins/{admin_id}", response_model=Admin)
-async def update_admin(admin_id: str, update_data: AdminUpdate, _: str = Depends(get_current_admin)):
-    update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+@api_router.patch("/admins/{admin_id}", response_model=Admin)
+async def update_admin(
+    admin_id: str,
+    update_data: AdminUpdate,
+    request: Request,
+    response: Response,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    expected = parse_if_match(request)
+    update_dict = {k: v for k, v in update_data.model_dump(exclude_unset=True).items() if v is not None}
     
     if "password" in update_dict:
-        update_dict["hashed_password"] = hash_password(update_dict["password"])
+        update_dict["hashed_password"] = await hash_password(update_dict["password"])
         del update_dict["password"]
     
+    projection = {"_id": 0, "hashed_password": 0}
     if update_dict:
-        await db.admins.update_one({"id": admin_id}, {"$set": update_dict})
-    
-    admin = await db.admins.find_one({"id": admin_id}, {"_id": 0, "hashed_password": 0})
+        seq = await reserve_changes()
+        admin = await db.admins.find_one_and_update(
+            revision_query(admin_id, expected),
+            {"$set": {**update_dict, **change_fields(seq)}, "$inc": {"revision": 1}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
+        )
+        principal_cache.invalidate(admin_id)
+        if admin:
+            announce_changes("admins")
+    else:
+        admin = await db.admins.find_one(revision_query(admin_id, expected), projection)
+    if not admin:
+        await raise_update_miss(db.admins, admin_id, expected, "Admin")
+    set_revision_etag(response, admin)
     return admin
 
 @api_router.delete("/admins/{admin_id}")
-async def delete_admin(admin_id: str, _: str = Depends(get_current_admin)):
+async def delete_admin(admin_id: str, _: AdminPrincipal = Depends(get_current_admin)):
     result = await db.admins.delete_one({"id": admin_id})
+    principal_cache.invalidate(admin_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Admin not found")
+    await record_tombstone("admins", admin_id)
     return {"message": "Admin deleted"}
 
 # Users
 @api_router.get("/users", response_model=List[User])
-async def get_users(_: str = Depends(get_current_admin)):
-    users = await db.users.find({}, {"_id": 0}).to_list(1000)
-    return users
+async def get_users(
+    response: Response,
+    plan: Optional[str] = None,
+    status: Optional[str] = None,
+    school: Optional[str] = None,
+    grade: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(plan=plan, status=status, school=school, grade=grade)
+    docs = await paginate(db.users, query, "joined_date", limit, after, response, user_serializer.projection)
+    return user_serializer.respond(docs, response)
+
+@api_router.get("/users/search", response_model=List[User])
+async def search_users(
+    q: str = Query(..., min_length=1),
+    plan: Optional[str] = None,
+    status: Optional[str] = None,
+    school: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_WINDOW),
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    base_query = build_filter(plan=plan, status=status, school=school)
+    return await ranked_search(db.users, q, USER_PREFIX_FIELDS, base_query, limit, offset)
 
 @api_router.post("/users", response_model=User)
-async def create_user(user: UserCreate, _: str = Depends(get_current_admin)):
+async def create_user(user: UserCreate, _: AdminPrincipal = Depends(get_current_admin)):
     user_obj = User(**user.model_dump())
-    doc = user_obj.model_dump()
+    doc = with_leaderboard_bucket(with_search_fields(user_obj.model_dump(), USER_PREFIX_FIELDS), "total_score")
+    doc.update(change_fields(await reserve_changes()))
     await db.users.insert_one(doc)
+    await bump_stats(total_users=1, upgraded_users=int(user_obj.plan == "Upgraded"))
+    await apply_bucket_moves([(user_scopes(doc), doc["lb_bucket"], 1)])
+    announce_changes("users")
     return user_obj
 
 @api_router.get("/users/{user_id}", response_model=User)
-async def get_user(user_id: str, admin_id: str = Depends(get_current_admin)):
+async def get_user(user_id: str, response: Response, principal: AdminPrincipal = Depends(get_current_admin)):
     user = await db.users.find_one({"id": user_id}, {"_id": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    set_revision_etag(response, user)
     
     # Check if admin is super admin to include credit card info
-    admin = await db.admins.find_one({"id": admin_id}, {"_id": 0})
-    if admin and admin.get("role") != "super_admin":
+    if principal.role != "super_admin":
         # Remove credit card info for non-super admins
         user.pop("credit_card_last4", None)
         user.pop("credit_card_type", None)
@@ -310,144 +1768,1414 @@ async def get_user(user_id: str, admin_id: str = Depends(get_current_admin)):
     return user
 
 @api_router.put("/users/{user_id}", response_model=User)
-async def update_user(user_id: str, update_data: UserUpdate, _: str = Depends(get_current_admin)):
-    update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+@api_router.patch("/users/{user_id}", response_model=User)
+async def update_user(
+    user_id: str,
+    update_data: UserUpdate,
+    request: Request,
+    response: Response,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    expected = parse_if_match(request)
+    update_dict = {k: v for k, v in update_data.model_dump(exclude_unset=True).items() if v is not None}
+    with_search_fields(update_dict, USER_PREFIX_FIELDS)
     
-    if update_dict:
-        await db.users.update_one({"id": user_id}, {"$set": update_dict})
+    if not update_dict:
+        user = await db.users.find_one(revision_query(user_id, expected), {"_id": 0})
+        if not user:
+            await raise_update_miss(db.users, user_id, expected, "User")
+        set_revision_etag(response, user)
+        return user
     
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    # The stats and leaderboard counters need the pre-image, so this returns the
+    # document as it was; the post-image is exactly that plus the $set fields
+    # and the bumped revision, since the update is applied atomically.
+    seq = await reserve_changes()
+    previous = await db.users.find_one_and_update(
+        revision_query(user_id, expected),
+        {"$set": {**update_dict, **change_fields(seq)}, "$inc": {"revision": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not previous:
+        await raise_update_miss(db.users, user_id, expected, "User")
+    user = {**previous, **update_dict, "revision": previous.get("revision", 0) + 1}
+    
+    if "plan" in update_dict:
+        was_upgraded = previous.get("plan") == "Upgraded"
+        is_upgraded = update_dict["plan"] == "Upgraded"
+        await bump_stats(upgraded_users=int(is_upgraded) - int(was_upgraded))
+    if {"school", "grade"} & update_dict.keys():
+        # The score is untouched here, so the user keeps its bucket but may
+        # move between school and grade scopes.
+        await apply_bucket_moves([
+            (user_scopes(previous), previous.get("lb_bucket"), -1),
+            (user_scopes(user), previous.get("lb_bucket"), 1),
+        ])
+    manager.update_profile(user_id, {k: v for k, v in update_dict.items() if k in WS_PROFILE_FIELDS})
+    announce_changes("users")
+    
+    set_revision_etag(response, user)
     return user
 
 @api_router.delete("/users/{user_id}")
-async def delete_user(user_id: str, _: str = Depends(get_current_admin)):
-    result = await db.users.delete_one({"id": user_id})
-    if result.deleted_count == 0:
+async def delete_user(user_id: str, _: AdminPrincipal = Depends(get_current_admin)):
+    deleted = await db.users.find_one_and_delete(
+        {"id": user_id}, projection={"_id": 0, "plan": 1, "school": 1, "grade": 1, "lb_bucket": 1}
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
+    await bump_stats(total_users=-1, upgraded_users=-int(deleted.get("plan") == "Upgraded"))
+    await apply_bucket_moves([(user_scopes(deleted), deleted.get("lb_bucket"), -1)])
+    await remove_game_scores({"user_id": user_id})
+    await record_tombstone("users", user_id)
     return {"message": "User deleted"}
 
 # Games
 @api_router.get("/games", response_model=List[Game])
-async def get_games(_: str = Depends(get_current_admin)):
-    games = await db.games.find({}, {"_id": 0}).to_list(1000)
-    return games
+async def get_games(
+    request: Request,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(category=category, status=status, difficulty=difficulty)
+    return await cached_response(
+        request, ("games",), game_serializer.encode,
+        lambda response: paginate(db.games, query, "created_at", limit, after, response, game_serializer.projection),
+    )
+
+@api_router.get("/games/search", response_model=List[Game])
+async def search_games(
+    q: str = Query(..., min_length=1),
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_WINDOW),
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    base_query = build_filter(category=category)
+    return await ranked_search(db.games, q, GAME_PREFIX_FIELDS, base_query, limit, offset)
 
 @api_router.post("/games", response_model=Game)
-async def create_game(game: Game, _: str = Depends(get_current_admin)):
-    doc = game.model_dump()
+async def create_game(game: Game, _: AdminPrincipal = Depends(get_current_admin)):
+    doc = with_search_fields(game.model_dump(), GAME_PREFIX_FIELDS)
+    doc.update(change_fields(await reserve_changes()))
     await db.games.insert_one(doc)
+    await bump_stats(total_games=1)
+    invalidate_responses("games")
+    announce_changes("games")
     return game
 
 @api_router.put("/games/{game_id}", response_model=Game)
-async def update_game(game_id: str, game_data: Game, _: str = Depends(get_current_admin)):
-    game_dict = game_data.model_dump()
+@api_router.patch("/games/{game_id}", response_model=Game)
+async def update_game(
+    game_id: str,
+    game_data: GameUpdate,
+    request: Request,
+    response: Response,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    expected = parse_if_match(request)
+    game_dict = {k: v for k, v in game_data.model_dump(exclude_unset=True).items() if v is not None}
+    with_search_fields(game_dict, GAME_PREFIX_FIELDS)
     game_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.games.update_one({"id": game_id}, {"$set": game_dict})
-    game = await db.games.find_one({"id": game_id}, {"_id": 0})
+    seq = await reserve_changes()
+    game = await db.games.find_one_and_update(
+        revision_query(game_id, expected),
+        {"$set": {**game_dict, **change_fields(seq)}, "$inc": {"revision": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not game:
+        await raise_update_miss(db.games, game_id, expected, "Game")
+    invalidate_responses("games")
+    announce_changes("games")
+    set_revision_etag(response, game)
     return game
 
 @api_router.delete("/games/{game_id}")
-async def delete_game(game_id: str, _: str = Depends(get_current_admin)):
+async def delete_game(game_id: str, _: AdminPrincipal = Depends(get_current_admin)):
     result = await db.games.delete_one({"id": game_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Game not found")
+    await bump_stats(total_games=-1)
+    await remove_game_scores({"game_id": game_id})
+    invalidate_responses("games")
+    await record_tombstone("games", game_id)
     return {"message": "Game deleted"}
 
+# Game sessions
+def game_rating_update(plays: int, rating_sum: float, rating_count: int) -> list:
+    # Pipeline update so the running mean is recomputed atomically from the
+    # stored sum and count. A game without a count yet treats its current
+    # rating (if any) as a single prior sample.
+    prior_sum = {"$ifNull": ["$rating_sum", {"$cond": [{"$gt": ["$rating", 0]}, "$rating", 0]}]}
+    prior_count = {"$ifNull": ["$rating_count", {"$cond": [{"$gt": ["$rating", 0]}, 1, 0]}]}
+    return [
+        {"$set": {
+            "play_count": {"$add": [{"$ifNull": ["$play_count", 0]}, plays]},
+            "rating_sum": {"$add": [prior_sum, rating_sum]},
+            "rating_count": {"$add": [prior_count, rating_count]},
+        }},
+        {"$set": {
+            "rating": {"$cond": [
+                {"$gt": ["$rating_count", 0]},
+                {"$round": [{"$divide": ["$rating_sum", "$rating_count"]}, 2]},
+                {"$ifNull": ["$rating", 0.0]},
+            ]},
+        }},
+    ]
+
+@api_router.post("/sessions")
+async def ingest_game_sessions(batch: GameSessionBatch, _: AdminPrincipal = Depends(get_current_admin)):
+    # Sessions are folded per user and per game first, so a batch costs one
+    # update per distinct document rather than one per session.
+    user_totals: Dict[str, List[int]] = {}
+    game_totals: Dict[str, List[float]] = {}
+    player_totals: Dict[tuple, list] = {}
+    received_at = datetime.now(timezone.utc)
+    for session in batch.sessions:
+        played_at = session.played_at or received_at
+        if played_at.tzinfo is None:
+            played_at = played_at.replace(tzinfo=timezone.utc)
+        player_entry = player_totals.setdefault((session.game_id, session.user_id), [0, 0, played_at])
+        player_entry[0] += 1
+        player_entry[1] += session.score
+        player_entry[2] = max(player_entry[2], played_at)
+        user_entry = user_totals.setdefault(session.user_id, [0, 0])
+        user_entry[0] += 1
+        user_entry[1] += session.score
+        game_entry = game_totals.setdefault(session.game_id, [0, 0.0, 0])
+        game_entry[0] += 1
+        if session.rating is not None:
+            game_entry[1] += session.rating
+            game_entry[2] += 1
+    
+    # Unknown ids are dropped up front so game_scores never gains rows (and
+    # per-game leaderboard entries) for users or games that do not exist.
+    known_users, known_games = await asyncio.gather(
+        db.users.distinct("id", {"id": {"$in": list(user_totals)}}),
+        db.games.distinct("id", {"id": {"$in": list(game_totals)}}),
+    )
+    known_users, known_games = set(known_users), set(known_games)
+    unknown_users = len(user_totals) - len(known_users)
+    unknown_games = len(game_totals) - len(known_games)
+    user_totals = {k: v for k, v in user_totals.items() if k in known_users}
+    game_totals = {k: v for k, v in game_totals.items() if k in known_games}
+    player_totals = {
+        (game_id, user_id): v for (game_id, user_id), v in player_totals.items()
+        if game_id in known_games and user_id in known_users
+    }
+    if not user_totals and not game_totals:
+        return {
+            "accepted": len(batch.sessions),
+            "users_updated": 0,
+            "games_updated": 0,
+            "unknown_users": unknown_users,
+            "unknown_games": unknown_games,
+        }
+    
+    player_ops = [
+        UpdateOne(
+            {"game_id": game_id, "user_id": user_id},
+            {"$inc": {"plays": plays, "score": score}, "$max": {"last_played_at": last_played_at}},
+            upsert=True,
+        )
+        for (game_id, user_id), (plays, score, last_played_at) in player_totals.items()
+    ]
+    async def write(collection, ops):
+        return await collection.bulk_write(ops, ordered=False) if ops else None
+    
+    async def write_stamped(collection, totals: dict, make_update):
+        # Sequence numbers are reserved right before the write that carries
+        # them, so change_at never runs ahead of the commit by more than one
+        # round trip (see the settle window in get_changes).
+        if not totals:
+            return None
+        first_seq = await reserve_changes(len(totals))
+        return await write(collection, [
+            UpdateOne({"id": doc_id}, make_update(value, change_fields(first_seq + i)))
+            for i, (doc_id, value) in enumerate(totals.items())
+        ])
+    
+    user_result, game_result, _ = await asyncio.gather(
+        write_stamped(db.users, user_totals, lambda totals, stamp: {
+            "$inc": {"total_games_played": totals[0], "total_score": totals[1]},
+            "$set": stamp,
+        }),
+        write_stamped(db.games, game_totals, lambda totals, stamp: game_rating_update(*totals) + [{"$set": stamp}]),
+        write(db.game_scores, player_ops),
+    )
+    rebuckets = [rebucket(db.users, {"id": {"$in": list(user_totals)}}, "total_score", user_scopes)]
+    if player_totals:
+        rebuckets.append(rebucket(db.game_scores, {"$or": [
+            {"game_id": game_id, "user_id": user_id} for game_id, user_id in player_totals
+        ]}, "score", game_score_scopes))
+    await asyncio.gather(*rebuckets)
+    invalidate_responses("games")
+    announce_changes("users", "games")
+    
+    return {
+        "accepted": len(batch.sessions),
+        "users_updated": user_result.matched_count if user_result else 0,
+        "games_updated": game_result.matched_count if game_result else 0,
+        "unknown_users": unknown_users,
+        "unknown_games": unknown_games,
+    }
+
+# Leaderboards
+# Ranks come from a score histogram per scope (global, school:<name>,
+# grade:<grade>, game:<id>) kept in leaderboard_buckets. Every ranked document
+# records the bucket it is currently counted in (lb_bucket); moving it to a
+# new bucket is a compare-and-set on that field, so each move is counted once
+# even under concurrent ingestion. A rank is then the sum of the counts of
+# higher buckets plus an indexed count inside the document's own bucket.
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: str
+    username: Optional[str] = None
+    full_name: Optional[str] = None
+    school: Optional[str] = None
+    grade: Optional[str] = None
+    score: int
+
+class LeaderboardRank(BaseModel):
+    user_id: str
+    scope: str
+    score: int
+    rank: int
+
+def score_bucket(score) -> int:
+    return int(score or 0) // LEADERBOARD_BUCKET_WIDTH
+
+def with_leaderboard_bucket(doc: dict, score_field: str) -> dict:
+    doc["lb_bucket"] = score_bucket(doc.get(score_field))
+    return doc
+
+def user_scopes(doc: dict) -> List[str]:
+    scopes = ["global"]
+    if doc.get("school"):
+        scopes.append(f"school:{doc['school']}")
+    if doc.get("grade"):
+        scopes.append(f"grade:{doc['grade']}")
+    return scopes
+
+def game_score_scopes(doc: dict) -> List[str]:
+    return [f"game:{doc['game_id']}"]
+
+async def apply_bucket_moves(moves):
+    # moves: iterable of (scopes, bucket, delta); a None bucket means "not counted"
+    totals: Dict[tuple, int] = {}
+    for scopes, bucket, delta in moves:
+        if bucket is None:
+            continue
+        for scope in scopes:
+            totals[(scope, bucket)] = totals.get((scope, bucket), 0) + delta
+    ops = [
+        UpdateOne({"scope": scope, "bucket": bucket}, {"$inc": {"count": delta}}, upsert=True)
+        for (scope, bucket), delta in totals.items() if delta
+    ]
+    if ops:
+        await db.leaderboard_buckets.bulk_write(ops, ordered=False)
+
+async def rebucket(collection, query: dict, score_field: str, scopes_of):
+    projection = {score_field: 1, "lb_bucket": 1, "school": 1, "grade": 1, "game_id": 1}
+    docs = await collection.find(query, projection).to_list(None)
+    candidates = []
+    for doc in docs:
+        new_bucket = score_bucket(doc.get(score_field))
+        if doc.get("lb_bucket") != new_bucket:
+            candidates.append((doc, new_bucket))
+    if not candidates:
+        return
+    # One unordered bulk of compare-and-set updates. Each write also stamps a
+    # per-call token; when some CAS lost a race, the token tells which moves
+    # were ours to count (a doc re-moved again since then is left to the
+    # periodic rebuild).
+    token = uuid.uuid4().hex
+    result = await collection.bulk_write([
+        UpdateOne(
+            {"_id": doc["_id"], "lb_bucket": doc.get("lb_bucket")},
+            {"$set": {"lb_bucket": new_bucket, "lb_move": token}},
+        )
+        for doc, new_bucket in candidates
+    ], ordered=False)
+    if result.modified_count < len(candidates):
+        ours = set(await collection.distinct("_id", {"_id": {"$in": [doc["_id"] for doc, _ in candidates]}, "lb_move": token}))
+        candidates = [(doc, new_bucket) for doc, new_bucket in candidates if doc["_id"] in ours]
+    moves = []
+    for doc, new_bucket in candidates:
+        moves.append((scopes_of(doc), doc.get("lb_bucket"), -1))
+        moves.append((scopes_of(doc), new_bucket, 1))
+    await apply_bucket_moves(moves)
+
+async def remove_game_scores(query: dict):
+    # Drops the per-game leaderboard rows of a deleted user or game, along
+    # with their bucket counts.
+    rows = await db.game_scores.find(query, {"_id": 1, "game_id": 1, "lb_bucket": 1}).to_list(None)
+    if not rows:
+        return
+    await db.game_scores.delete_many({"_id": {"$in": [row["_id"] for row in rows]}})
+    await apply_bucket_moves((game_score_scopes(row), row.get("lb_bucket"), -1) for row in rows)
+
+async def bucket_counts(query: Optional[dict] = None) -> Dict[tuple, int]:
+    cursor = db.leaderboard_buckets.find(query or {}, {"_id": 0, "scope": 1, "bucket": 1, "count": 1})
+    return {(doc["scope"], doc["bucket"]): doc["count"] async for doc in cursor}
+
+async def rebuild_leaderboards():
+    # Full recount for backfills, bucket-width changes and drift repair.
+    width = LEADERBOARD_BUCKET_WIDTH
+    for collection, score_field in ((db.users, "total_score"), (db.game_scores, "score")):
+        target = {"$toInt": {"$floor": {"$divide": [{"$ifNull": [f"${score_field}", 0]}, width]}}}
+        # Documents never bucketed, or bucketed under another width
+        await collection.update_many(
+            {"$or": [{"lb_bucket": {"$exists": False}}, {"$expr": {"$ne": ["$lb_bucket", target]}}]},
+            [{"$set": {"lb_bucket": target}}],
+        )
+    
+    counts: Dict[tuple, int] = {}
+    seen: Dict[tuple, int] = {}
+    groupings = (
+        (db.users, None, "global"),
+        (db.users, "school", "school"),
+        (db.users, "grade", "grade"),
+        (db.game_scores, "game_id", "game"),
+    )
+    for collection, field, prefix in groupings:
+        # Live counts of this grouping's scopes as of just before the recount;
+        # whatever the live histogram gains on top of them later is carried
+        # over into the rebuilt one.
+        seen.update(await bucket_counts({"scope": {"$regex": f"^{prefix}:"}} if field else {"scope": prefix}))
+        pipeline = [
+            {"$match": {field: {"$nin": [None, ""]}} if field else {}},
+            {"$group": {"_id": {"key": f"${field}" if field else None, "bucket": "$lb_bucket"}, "count": {"$sum": 1}}},
+        ]
+        async for doc in collection.aggregate(pipeline):
+            scope = f"{prefix}:{doc['_id']['key']}" if field else prefix
+            counts[(scope, doc["_id"]["bucket"])] = doc["count"]
+    
+    # Built off to the side and swapped in with one rename, so rank queries
+    # never see a half-empty histogram. Moves applied to the live collection
+    # since its counts were read are replayed into the new one first: one pass
+    # for everything that landed during the recount, a second for what landed
+    # during the first pass. Only moves racing the last pass or a grouping's
+    # own aggregation can still be off, until the next rebuild.
+    staging = db[f"leaderboard_buckets_rebuild_{uuid.uuid4().hex[:8]}"]
+    await staging.create_indexes([
+        IndexModel([("scope", ASCENDING), ("bucket", ASCENDING)], unique=True),
+    ])
+    docs = [{"scope": scope, "bucket": bucket, "count": count} for (scope, bucket), count in counts.items()]
+    try:
+        for start in range(0, len(docs), BULK_CHUNK_SIZE):
+            await staging.insert_many(docs[start:start + BULK_CHUNK_SIZE], ordered=False)
+        for _ in range(2):
+            live = await bucket_counts()
+            ops = [
+                UpdateOne({"scope": scope, "bucket": bucket}, {"$inc": {"count": delta}}, upsert=True)
+                for (scope, bucket) in live.keys() | seen.keys()
+                if (delta := live.get((scope, bucket), 0) - seen.get((scope, bucket), 0))
+            ]
+            if ops:
+                await staging.bulk_write(ops, ordered=False)
+            seen = live
+        await staging.rename("leaderboard_buckets", dropTarget=True)
+    except Exception:
+        await staging.drop()
+        raise
+    await db.stats.replace_one({"_id": "leaderboard_meta"}, {"bucket_width": width}, upsert=True)
+
+async def claim_job_lease(name: str, seconds: float) -> bool:
+    # The upsert only inserts when no unexpired lease matches; an existing,
+    # unexpired lease makes it collide on _id instead.
+    now = datetime.now(timezone.utc)
+    try:
+        await db.stats.update_one(
+            {"_id": f"lease:{name}", "expires_at": {"$lt": now}},
+            {"$set": {"expires_at": now + timedelta(seconds=seconds), "worker_id": WORKER_ID}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def periodic_leaderboard_rebuild():
+    if await claim_job_lease("leaderboard_rebuild", LEADERBOARD_RECONCILE_SECONDS / 2):
+        await rebuild_leaderboards()
+
+async def leaderboard_rank(collection, scope: str, scope_filter: dict, score_field: str, score: int, bucket: int) -> int:
+    higher_buckets = db.leaderboard_buckets.aggregate([
+        {"$match": {"scope": scope, "bucket": {"$gt": bucket}}},
+        {"$group": {"_id": None, "count": {"$sum": "$count"}}},
+    ])
+    above = [doc["count"] async for doc in higher_buckets]
+    same_bucket = await collection.count_documents({**scope_filter, "lb_bucket": bucket, score_field: {"$gt": score}})
+    return (above[0] if above else 0) + same_bucket + 1
+
+def ranked_entries(docs: List[dict], score_field: str) -> List[dict]:
+    # Standard competition ranking: ties share a rank
+    entries = []
+    for position, doc in enumerate(docs, start=1):
+        score = doc.get(score_field, 0)
+        rank = entries[-1]["rank"] if entries and entries[-1]["score"] == score else position
+        entries.append({**doc, "rank": rank, "score": score, "user_id": doc.get("user_id", doc.get("id"))})
+    return entries
+
+@api_router.get("/leaderboards/users", response_model=List[LeaderboardEntry])
+async def get_user_leaderboard(
+    school: Optional[str] = None,
+    grade: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(school=school, grade=grade)
+    projection = {"_id": 0, "id": 1, "username": 1, "full_name": 1, "school": 1, "grade": 1, "total_score": 1}
+    docs = await db.users.find(query, projection).sort([("total_score", DESCENDING), ("id", ASCENDING)]).limit(limit).to_list(limit)
+    return ranked_entries(docs, "total_score")
+
+@api_router.get("/leaderboards/users/{user_id}", response_model=LeaderboardRank)
+async def get_user_rank(
+    user_id: str,
+    scope: Literal["global", "school", "grade"] = "global",
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "total_score": 1, "lb_bucket": 1, "school": 1, "grade": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    scope_filter, scope_name = {}, "global"
+    if scope != "global":
+        if not user.get(scope):
+            raise HTTPException(status_code=400, detail=f"User has no {scope}")
+        scope_filter, scope_name = {scope: user[scope]}, f"{scope}:{user[scope]}"
+    score = user.get("total_score", 0)
+    bucket = user.get("lb_bucket", score_bucket(score))
+    rank = await leaderboard_rank(db.users, scope_name, scope_filter, "total_score", score, bucket)
+    return {"user_id": user_id, "scope": scope_name, "score": score, "rank": rank}
+
+@api_router.get("/leaderboards/games/{game_id}", response_model=List[LeaderboardEntry])
+async def get_game_leaderboard(
+    game_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    docs = await db.game_scores.find({"game_id": game_id}, {"_id": 0, "user_id": 1, "score": 1}) \
+        .sort([("score", DESCENDING), ("user_id", ASCENDING)]).limit(limit).to_list(limit)
+    users = {
+        doc["id"]: doc
+        async for doc in db.users.find(
+            {"id": {"$in": [d["user_id"] for d in docs]}},
+            {"_id": 0, "id": 1, "username": 1, "full_name": 1, "school": 1, "grade": 1},
+        )
+    }
+    return ranked_entries([{**users.get(doc["user_id"], {}), **doc} for doc in docs], "score")
+
+@api_router.get("/leaderboards/games/{game_id}/users/{user_id}", response_model=LeaderboardRank)
+async def get_game_rank(game_id: str, user_id: str, _: AdminPrincipal = Depends(get_current_admin)):
+    entry = await db.game_scores.find_one({"game_id": game_id, "user_id": user_id}, {"_id": 0, "score": 1, "lb_bucket": 1})
+    if not entry:
+        raise HTTPException(status_code=404, detail="No sessions for this user and game")
+    score = entry.get("score", 0)
+    bucket = entry.get("lb_bucket", score_bucket(score))
+    rank = await leaderboard_rank(db.game_scores, f"game:{game_id}", {"game_id": game_id}, "score", score, bucket)
+    return {"user_id": user_id, "scope": f"game:{game_id}", "score": score, "rank": rank}
+
 # Builds
 @api_router.get("/builds", response_model=List[Build])
-async def get_builds(_: str = Depends(get_current_admin)):
-    builds = await db.builds.find({}, {"_id": 0}).to_list(1000)
-    return builds
+async def get_builds(
+    request: Request,
+    game_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(game_id=game_id, status=status)
+    return await cached_response(
+        request, ("builds",), build_serializer.encode,
+        lambda response: paginate(db.builds, query, "build_date", limit, after, response, build_serializer.projection),
+    )
 
 @api_router.post("/builds", response_model=Build)
-async def create_build(build: Build, _: str = Depends(get_current_admin)):
+async def create_build(build: Build, _: AdminPrincipal = Depends(get_current_admin)):
     doc = build.model_dump()
+    doc.update(change_fields(await reserve_changes()))
     await db.builds.insert_one(doc)
+    invalidate_responses("builds")
+    announce_changes("builds")
+    if build.status == "pending":
+        build_scheduler.notify()
     return build
 
+# Build scheduler
+# Pending builds are claimed straight from Mongo: a worker first takes one of
+# the game's slots in build_slots (a holders array capped at
+# BUILD_PER_GAME_CONCURRENCY), then flips the build pending -> running with a
+# conditional update, so two workers can never run the same build and a game
+# never exceeds its limit across the whole deployment. Running builds hold a
+# lease that the worker keeps extending; the reaper requeues builds whose
+# worker died and frees their slots.
+def build_status_message(doc: dict) -> dict:
+    return {
+        "type": "build_status",
+        "build": {name: doc.get(name) for name in Build.model_fields},
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+async def run_build_job(build: dict) -> Optional[str]:
+    if not BUILD_COMMAND:
+        raise RuntimeError("No BUILD_COMMAND configured; nothing was built")
+    env = {**os.environ, "BUILD_ID": build["id"], "GAME_ID": build["game_id"], "BUILD_VERSION": build["version"]}
+    process = await asyncio.create_subprocess_exec(
+        *shlex.split(BUILD_COMMAND), env=env,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), BUILD_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+        process.kill()
+        await process.wait()
+        if isinstance(exc, asyncio.CancelledError):
+            raise
+        raise RuntimeError(f"Build timed out after {BUILD_TIMEOUT_SECONDS}s")
+    tail = output.decode(errors="replace")[-BUILD_LOG_TAIL_BYTES:].strip()
+    if process.returncode:
+        raise RuntimeError(f"Build exited with {process.returncode}: {tail}")
+    return tail or None
+
+class BuildScheduler:
+    def __init__(self, workers: int, per_game: int):
+        self.workers = workers
+        self.per_game = per_game
+        self.wakeup = asyncio.Event()
+        self.tasks: List[asyncio.Task] = []
+    
+    async def start(self):
+        for i in range(self.workers):
+            self.tasks.append(asyncio.create_task(self._worker(i)))
+        self.tasks.append(asyncio.create_task(
+            run_periodically(BUILD_LEASE_SECONDS, self.reap_expired, "Build lease reaper")
+        ))
+    
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+    
+    def notify(self):
+        self.wakeup.set()
+    
+    async def _worker(self, index: int):
+        while True:
+            try:
+                build = await self.claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Build claim failed")
+                build = None
+            if build is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), BUILD_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.execute(build)
+    
+    async def acquire_slot(self, game_id: str, build_id: str) -> bool:
+        try:
+            await db.build_slots.update_one(
+                {"_id": game_id, f"holders.{self.per_game - 1}": {"$exists": False}},
+                {"$addToSet": {"holders": build_id}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # The slot doc exists but is full, so the upsert collided with it
+            return False
+    
+    async def release_slot(self, game_id: str, build_id: str):
+        await db.build_slots.update_one({"_id": game_id}, {"$pull": {"holders": build_id}})
+    
+    async def claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        saturated: List[str] = []
+        while True:
+            candidate = await db.builds.find_one(
+                {
+                    "status": "pending",
+                    "game_id": {"$nin": saturated},
+                    "$or": [{"next_attempt_at": None}, {"next_attempt_at": {"$lte": now}}],
+                },
+                {"_id": 0, "id": 1, "game_id": 1},
+                sort=[("build_date", ASCENDING), ("id", ASCENDING)],
+            )
+            if candidate is None:
+                return None
+            if not await self.acquire_slot(candidate["game_id"], candidate["id"]):
+                saturated.append(candidate["game_id"])
+                continue
+            seq = await reserve_changes()
+            build = await db.builds.find_one_and_update(
+                {"id": candidate["id"], "status": "pending"},
+                {
+                    "$set": {
+                        **change_fields(seq),
+                        "status": "running",
+                        "started_at": now.isoformat(),
+                        "finished_at": None,
+                        "worker_id": WORKER_ID,
+                        "lease_expires_at": now + timedelta(seconds=BUILD_LEASE_SECONDS),
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER,
+            )
+            if build is None:
+                # Another worker claimed it between the read and the update
+                await self.release_slot(candidate["game_id"], candidate["id"])
+                continue
+            await self.publish(build)
+            return build
+    
+    async def _renew_lease(self, build_id: str):
+        while True:
+            await asyncio.sleep(BUILD_LEASE_SECONDS / 3)
+            await db.builds.update_one(
+                {"id": build_id, "status": "running", "worker_id": WORKER_ID},
+                {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=BUILD_LEASE_SECONDS)}},
+            )
+    
+    async def execute(self, build: dict):
+        renewer = asyncio.create_task(self._renew_lease(build["id"]))
+        try:
+            notes = await run_build_job(build)
+        except asyncio.CancelledError:
+            # Shutting down: hand the build back without charging an attempt
+            await asyncio.shield(self.finish(build, {"status": "pending", "started_at": None}, attempts=-1))
+            raise
+        except Exception as exc:
+            logger.warning("Build %s attempt %s failed: %s", build["id"], build["attempts"], exc)
+            await self.finish(build, self.failure_update(build["attempts"], str(exc)))
+        else:
+            update = {"status": "completed", "finished_at": datetime.now(timezone.utc).isoformat(), "error": None}
+            if notes:
+                update["notes"] = notes
+            await self.finish(build, update)
+        finally:
+            renewer.cancel()
+    
+    def failure_update(self, attempts: int, error: str) -> dict:
+        now = datetime.now(timezone.utc)
+        if attempts < BUILD_MAX_ATTEMPTS:
+            delay = BUILD_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+            return {"status": "pending", "error": error, "next_attempt_at": now + timedelta(seconds=delay)}
+        return {"status": "failed", "error": error, "finished_at": now.isoformat()}
+    
+    async def finish(self, build: dict, update: dict, attempts: int = 0):
+        seq = await reserve_changes()
+        changes = {"$set": {**update, **change_fields(seq), "worker_id": None, "lease_expires_at": None}}
+        if attempts:
+            changes["$inc"] = {"attempts": attempts}
+        # Only the worker holding the build may settle it; after a lost lease
+        # the reaper has already requeued it and this result is discarded.
+        doc = await db.builds.find_one_and_update(
+            {"id": build["id"], "status": "running", "worker_id": WORKER_ID},
+            changes,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        await self.release_slot(build["game_id"], build["id"])
+        if doc is not None:
+            await self.publish(doc)
+            if doc["status"] == "pending":
+                self.notify()
+    
+    async def reap_expired(self):
+        now = datetime.now(timezone.utc)
+        async for build in db.builds.find(
+            {"status": "running", "lease_expires_at": {"$lt": now}}, {"_id": 0}
+        ):
+            update = self.failure_update(build.get("attempts", 1), "Build worker stopped responding")
+            seq = await reserve_changes()
+            doc = await db.builds.find_one_and_update(
+                {"id": build["id"], "status": "running", "lease_expires_at": build["lease_expires_at"]},
+                {"$set": {**update, **change_fields(seq), "worker_id": None, "lease_expires_at": None}},
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is not None:
+                await self.release_slot(build["game_id"], build["id"])
+                await self.publish(doc)
+        # Slots can also leak if a worker died between taking a slot and
+        # claiming the build; drop holders that are not running anymore.
+        async for slot in db.build_slots.find({"holders.0": {"$exists": True}}):
+            running = await db.builds.distinct("id", {"id": {"$in": slot["holders"]}, "status": "running"})
+            stale = [h for h in slot["holders"] if h not in running]
+            if stale:
+                await db.build_slots.update_one({"_id": slot["_id"]}, {"$pull": {"holders": {"$in": stale}}})
+    
+    async def publish(self, doc: dict):
+        invalidate_responses("builds")
+        announce_changes("builds")
+        await publish_quietly({"kind": "admin", "message": build_status_message(doc)})
+
+build_scheduler = BuildScheduler(BUILD_WORKERS, BUILD_PER_GAME_CONCURRENCY)
+
 # Updates
 @api_router.get("/updates", response_model=List[Update])
-async def get_updates(_: str = Depends(get_current_admin)):
-    updates = await db.updates.find({}, {"_id": 0}).to_list(1000)
-    return updates
+async def get_updates(
+    request: Request,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(type=type, status=status)
+    return await cached_response(
+        request, ("updates",), update_serializer.encode,
+        lambda response: paginate(db.updates, query, "created_at", limit, after, response, update_serializer.projection),
+    )
 
 @api_router.post("/updates", response_model=Update)
-async def create_update(update: Update, _: str = Depends(get_current_admin)):
+async def create_update(update: Update, _: AdminPrincipal = Depends(get_current_admin)):
     doc = update.model_dump()
+    doc.update(change_fields(await reserve_changes()))
     await db.updates.insert_one(doc)
+    invalidate_responses("updates")
+    announce_changes("updates")
     return update
 
 # Revenue
 @api_router.get("/revenue", response_model=List[Revenue])
-async def get_revenue(_: str = Depends(get_current_admin)):
-    revenue = await db.revenue.find({}, {"_id": 0}).to_list(1000)
-    return revenue
+async def get_revenue(
+    response: Response,
+    type: Optional[str] = None,
+    source: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = build_filter(type=type, source=source)
+    docs = await paginate(db.revenue, query, "date", limit, after, response, revenue_serializer.projection)
+    return revenue_serializer.respond(docs, response)
 
 @api_router.post("/revenue", response_model=Revenue)
-async def create_revenue(revenue: Revenue, _: str = Depends(get_current_admin)):
+async def create_revenue(revenue: Revenue, _: AdminPrincipal = Depends(get_current_admin)):
+    try:
+        buckets = revenue_buckets(revenue.date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid revenue date")
+    
     doc = revenue.model_dump()
+    doc.update(change_fields(await reserve_changes()))
     await db.revenue.insert_one(doc)
+    await db.revenue_rollups.bulk_write(
+        revenue_rollup_ops(buckets, revenue.type, revenue.source, revenue.amount), ordered=False
+    )
+    await bump_stats(total_revenue=revenue.amount)
+    announce_changes("revenue")
     return revenue
 
+@api_router.get("/revenue/summary", response_model=RevenueSummary)
+async def get_revenue_summary(
+    granularity: Literal["day", "week", "month"] = "month",
+    group_by: Literal["total", "type", "source"] = "total",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    query = {"granularity": granularity, "dimension": group_by}
+    bucket_range = {}
+    try:
+        if start:
+            bucket_range["$gte"] = revenue_buckets(start)[granularity]
+        if end:
+            bucket_range["$lte"] = revenue_buckets(end)[granularity]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    if bucket_range:
+        query["bucket"] = bucket_range
+    
+    rollups = db.revenue_rollups.find(query, {"_id": 0}).sort([("bucket", ASCENDING), ("key", ASCENDING)])
+    rows = [
+        {"period": doc["bucket"], "group": doc["key"], "amount": round(doc["amount"], 2), "count": doc["count"]}
+        async for doc in rollups
+    ]
+    return {"granularity": granularity, "group_by": group_by, "rows": rows}
+
 # Live Effects
 @api_router.post("/live-effects/send")
-async def send_live_effect(effect: LiveEffect, _: str = Depends(get_current_admin)):
+async def send_live_effect(effect: LiveEffect, _: AdminPrincipal = Depends(get_current_admin)):
     message = {
         "type": effect.effect_type,
         "content": effect.content,
         "duration": effect.duration,
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
-    await manager.send_personal_message(message, effect.user_id)
+    now = datetime.now(timezone.utc)
+    if await backplane.is_online(effect.user_id):
+        delivery = "sent"
+        await backplane.publish({"kind": "direct", "user_id": effect.user_id, "message": message})
+    else:
+        delivery = "queued"
+        expires_at = now + timedelta(seconds=effect.ttl_seconds or OFFLINE_EFFECT_TTL_SECONDS)
+        await queue_pending_effect(effect.user_id, message, expires_at)
+        # Covers a reconnect that raced the presence check above
+        if await backplane.is_online(effect.user_id):
+            await backplane.publish({"kind": "replay", "user_id": effect.user_id})
     
     # Save to database
-    await db.live_effects.insert_one({
+    await live_effect_history.add({
         "user_id": effect.user_id,
         "effect_type": effect.effect_type,
         "content": effect.content,
-        "sent_at": datetime.now(timezone.utc).isoformat()
+        "delivery": delivery,
+        "sent_at": now.isoformat(),
+        "recorded_at": now
+    })
+    
+    return {"message": "Effect sent" if delivery == "sent" else "Effect queued", "user_id": effect.user_id}
+
+@api_router.post("/live-effects/broadcast")
+async def broadcast_live_effect(effect: LiveEffectBroadcast, _: AdminPrincipal = Depends(get_current_admin)):
+    target = {
+        "user_ids": effect.user_ids,
+        "plan": effect.plan,
+        "school": effect.school,
+        "grade": effect.grade,
+    }
+    if not effect.all_connected and all(v is None for v in target.values()):
+        raise HTTPException(status_code=400, detail="Specify user_ids, plan, school, grade or all_connected")
+    
+    message = {
+        "type": effect.effect_type,
+        "content": effect.content,
+        "duration": effect.duration,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+    await backplane.publish({"kind": "broadcast", "target": target, "message": message})
+    
+    # One history record per broadcast rather than one per recipient
+    now = datetime.now(timezone.utc)
+    await live_effect_history.add({
+        "user_id": None,
+        "target": {k: v for k, v in target.items() if v is not None} or {"all_connected": True},
+        "effect_type": effect.effect_type,
+        "content": effect.content,
+        "sent_at": now.isoformat(),
+        "recorded_at": now
     })
     
-    return {"message": "Effect sent", "user_id": effect.user_id}
+    return {"message": "Effect broadcast"}
+
+@api_router.get("/live-effects/presence")
+async def get_presence(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    return {"user_ids": await backplane.online_users(limit)}
+
+@api_router.get("/live-effects/presence/{user_id}")
+async def get_user_presence(user_id: str, _: AdminPrincipal = Depends(get_current_admin)):
+    return {"user_id": user_id, "online": await backplane.is_online(user_id)}
+
+# Bulk imports
+async def read_bulk_rows(request: Request) -> List[Any]:
+    # Accepts either a JSON array or NDJSON. Unparseable NDJSON lines are kept
+    # as exceptions so they are reported against their row number.
+    body = (await request.body()).decode("utf-8").strip()
+    if body.startswith("["):
+        try:
+            rows = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e}")
+        return rows
+    rows = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError as e:
+            rows.append(e)
+    return rows
+
+def validate_bulk_rows(rows: List[Any], build_doc) -> tuple:
+    docs, row_numbers, failed = [], [], []
+    for row_number, row in enumerate(rows):
+        if isinstance(row, Exception):
+            failed.append({"row": row_number, "errors": [{"field": None, "message": f"Invalid JSON: {row}"}]})
+            continue
+        if not isinstance(row, dict):
+            failed.append({"row": row_number, "errors": [{"field": None, "message": "Row must be a JSON object"}]})
+            continue
+        try:
+            docs.append(build_doc(row))
+            row_numbers.append(row_number)
+        except ValidationError as e:
+            failed.append({"row": row_number, "errors": [
+                {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+                for err in e.errors()
+            ]})
+        except ValueError as e:
+            failed.append({"row": row_number, "errors": [{"field": None, "message": str(e)}]})
+    return docs, row_numbers, failed
+
+async def insert_bulk_docs(collection, docs: List[dict], row_numbers: List[int], failed: List[dict]) -> List[dict]:
+    # Unordered chunks so one bad row (e.g. a duplicate id) never stops the rest.
+    # Each chunk is stamped just before its insert: stamping the whole import
+    # up front would let later chunks land after their seqs had settled.
+    inserted = []
+    for start in range(0, len(docs), BULK_CHUNK_SIZE):
+        chunk = docs[start:start + BULK_CHUNK_SIZE]
+        first_seq = await reserve_changes(len(chunk))
+        for i, doc in enumerate(chunk):
+            doc.update(change_fields(first_seq + i))
+        rejected = set()
+        try:
+            await collection.insert_many([dict(doc) for doc in chunk], ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                rejected.add(err["index"])
+                failed.append({"row": row_numbers[start + err["index"]], "errors": [{"field": None, "message": err.get("errmsg", "Write failed")}]})
+        inserted.extend(doc for i, doc in enumerate(chunk) if i not in rejected)
+    failed.sort(key=lambda f: f["row"])
+    if inserted:
+        announce_changes(collection.name)
+    return inserted
+
+@api_router.post("/users/bulk", response_model=BulkImportResult)
+async def bulk_create_users(request: Request, _: AdminPrincipal = Depends(get_current_admin)):
+    rows = await read_bulk_rows(request)
+    docs, row_numbers, failed = validate_bulk_rows(
+        rows, lambda row: with_leaderboard_bucket(
+            with_search_fields(User(**UserCreate(**row).model_dump()).model_dump(), USER_PREFIX_FIELDS), "total_score"
+        )
+    )
+    inserted = await insert_bulk_docs(db.users, docs, row_numbers, failed)
+    await bump_stats(total_users=len(inserted), upgraded_users=sum(doc["plan"] == "Upgraded" for doc in inserted))
+    await apply_bucket_moves((user_scopes(doc), doc["lb_bucket"], 1) for doc in inserted)
+    return {"received": len(rows), "inserted": len(inserted), "failed": failed}
+
+@api_router.post("/games/bulk", response_model=BulkImportResult)
+async def bulk_create_games(request: Request, _: AdminPrincipal = Depends(get_current_admin)):
+    rows = await read_bulk_rows(request)
+    docs, row_numbers, failed = validate_bulk_rows(
+        rows, lambda row: with_search_fields(Game(**row).model_dump(), GAME_PREFIX_FIELDS)
+    )
+    inserted = await insert_bulk_docs(db.games, docs, row_numbers, failed)
+    await bump_stats(total_games=len(inserted))
+    if inserted:
+        invalidate_responses("games")
+    return {"received": len(rows), "inserted": len(inserted), "failed": failed}
+
+@api_router.post("/revenue/bulk", response_model=BulkImportResult)
+async def bulk_create_revenue(request: Request, _: AdminPrincipal = Depends(get_current_admin)):
+    def build_revenue(row):
+        doc = Revenue(**row).model_dump()
+        try:
+            revenue_buckets(doc["date"])
+        except ValueError:
+            raise ValueError("Invalid revenue date")
+        return doc
+    
+    rows = await read_bulk_rows(request)
+    docs, row_numbers, failed = validate_bulk_rows(rows, build_revenue)
+    inserted = await insert_bulk_docs(db.revenue, docs, row_numbers, failed)
+    
+    totals: Dict[tuple, List[float]] = {}
+    for doc in inserted:
+        accumulate_revenue_rollup(totals, doc)
+    ops = [
+        UpdateOne(
+            {"granularity": g, "dimension": d, "key": k, "bucket": b},
+            {"$inc": {"amount": amount, "count": count}},
+            upsert=True,
+        )
+        for (g, d, k, b), (amount, count) in totals.items()
+    ]
+    for start in range(0, len(ops), BULK_CHUNK_SIZE):
+        await db.revenue_rollups.bulk_write(ops[start:start + BULK_CHUNK_SIZE], ordered=False)
+    await bump_stats(total_revenue=sum(doc["amount"] for doc in inserted))
+    return {"received": len(rows), "inserted": len(inserted), "failed": failed}
+
+# Exports
+EXPORT_FIELDS = {
+    "users": list(User.model_fields),
+    "revenue": list(Revenue.model_fields),
+    "live_effects": ["user_id", "effect_type", "content", "sent_at"],
+}
+
+async def export_rows(collection, fields: List[str], fmt: str):
+    cursor = collection.find({}, {"_id": 0, **{f: 1 for f in fields}}).batch_size(EXPORT_BATCH_SIZE)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore") if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+    async for doc in cursor:
+        if writer:
+            writer.writerow(doc)
+        else:
+            buffer.write(json.dumps(doc, default=str))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@api_router.get("/export/{collection}")
+async def export_collection(
+    collection: Literal["users", "revenue", "live_effects"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    fields: Optional[str] = None,
+    _: AdminPrincipal = Depends(get_current_admin),
+):
+    allowed = EXPORT_FIELDS[collection]
+    selected = allowed
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in allowed]
+        if unknown or not selected:
+            raise HTTPException(status_code=400, detail=f"Unknown export fields: {', '.join(unknown)}")
+    
+    stream = export_rows(db[collection], selected, format)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{collection}.{format}"
+    headers = {}
+    if gzip:
+        stream = gzip_stream(stream)
+        headers["Content-Encoding"] = "gzip"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(stream, media_type=media_type, headers=headers)
 
 # Dashboard stats
 @api_router.get("/stats/dashboard")
-async def get_dashboard_stats(_: str = Depends(get_current_admin)):
-    total_users = await db.users.count_documents({})
-    upgraded_users = await db.users.count_documents({"plan": "Upgraded"})
-    total_games = await db.games.count_documents({})
-    total_revenue_docs = await db.revenue.find({}, {"_id": 0}).to_list(1000)
-    total_revenue_amount = sum(doc["amount"] for doc in total_revenue_docs)
+async def get_dashboard_stats(request: Request, _: AdminPrincipal = Depends(get_current_admin)):
+    async def load(response: Response):
+        stats = await db.stats.find_one({"_id": STATS_DOC_ID}, {"_id": 0})
+        if not stats:
+            stats = await reconcile_dashboard_stats()
+        
+        return {
+            "total_users": stats["total_users"],
+            "upgraded_users": stats["upgraded_users"],
+            "standard_users": stats["total_users"] - stats["upgraded_users"],
+            "total_games": stats["total_games"],
+            "total_revenue": stats["total_revenue"]
+        }
+    
+    return await cached_response(request, ("stats",), dumps_json, load)
+
+@api_router.get("/stats/password-hashing")
+async def get_password_hashing_stats(_: AdminPrincipal = Depends(get_current_admin)):
+    return password_hasher.stats()
+
+# Change feed
+@api_router.get("/changes", response_model=ChangeFeed)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    principal: AdminPrincipal = Depends(get_current_admin),
+):
+    feed = await change_feed_state()
+    current = f"{feed['epoch']}:{feed['seq']}"
+    if since is None:
+        return {"token": current, "reset": True, "changes": []}
+    epoch, after = parse_change_token(since)
+    if epoch != feed["epoch"] or after < feed.get("pruned_through", 0):
+        return {"token": current, "reset": True, "changes": []}
+    
+    # Each source reads at most limit + 1 entries off its change_seq index, so
+    # a call costs the same whatever the size of the collections.
+    window = limit + 1
+    query = {"change_seq": {"$gt": after}}
+    
+    async def upserts(name: str, serializer: ListSerializer) -> List[tuple]:
+        projection = {**serializer.projection, "change_seq": 1, "change_at": 1}
+        docs = await db[name].find(query, projection).sort("change_seq", ASCENDING).limit(window).to_list(window)
+        entries = []
+        for doc in docs:
+            seq, at = doc.pop("change_seq"), doc.pop("change_at")
+            if name == "users" and principal.role != "super_admin":
+                doc.pop("credit_card_last4", None)
+                doc.pop("credit_card_type", None)
+                doc.pop("billing_address", None)
+            entries.append((seq, at, {"seq": seq, "collection": name, "op": "upsert", "id": doc["id"], "doc": doc}))
+        return entries
     
+    async def deletes() -> List[tuple]:
+        docs = await db.change_tombstones.find(query, {"_id": 0}).sort("change_seq", ASCENDING).limit(window).to_list(window)
+        return [
+            (doc["change_seq"], doc["change_at"], {"seq": doc["change_seq"], "collection": doc["collection"], "op": "delete", "id": doc["id"]})
+            for doc in docs
+        ]
+    
+    results = await asyncio.gather(*(upserts(name, serializer) for name, serializer in CHANGE_SERIALIZERS.items()), deletes())
+    entries = sorted((entry for result in results for entry in result), key=lambda entry: entry[0])
+    page = entries[:limit]
+    
+    # Sequence numbers are reserved just before the write lands, so a slow
+    # writer can commit seq N after N + 1 is already visible. The token only
+    # moves past entries older than CHANGE_SETTLE_SECONDS; newer ones are sent
+    # now and again on the next call, and clients apply them idempotently.
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=CHANGE_SETTLE_SECONDS)
+    token_seq = after
+    for seq, at, _ in page:
+        if (at if at.tzinfo else at.replace(tzinfo=timezone.utc)) > settled_before:
+            break
+        token_seq = seq
     return {
-        "total_users": total_users,
-        "upgraded_users": upgraded_users,
-        "standard_users": total_users - upgraded_users,
-        "total_games": total_games,
-        "total_revenue": total_revenue_amount
+        "token": f"{feed['epoch']}:{token_seq}",
+        "has_more": len(entries) > limit,
+        "changes": [entry for _, _, entry in page],
     }
 
-# WebSocket endpoint
+# WebSocket endpoints
+# Declared before /ws/{user_id} so "admin" is never taken for a user id
+@app.websocket("/ws/admin")
+async def admin_websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
+    try:
+        principal = await authenticate_admin(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    # One entry per socket so an admin can keep several dashboards open
+    key = f"{principal.id}:{uuid.uuid4().hex[:8]}"
+    connection = await admin_manager.connect(key, websocket, {"role": principal.role})
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        admin_manager.disconnect(key, connection)
+
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
-    await manager.connect(user_id, websocket)
+    # Segment fields are cached on the connection so broadcasts filter in memory
+    profile = await db.users.find_one({"id": user_id}, {"_id": 0, **{f: 1 for f in WS_PROFILE_FIELDS}})
+    connection = await manager.connect(user_id, websocket, profile)
+    await backplane.mark_online(user_id)
+    await replay_pending_effects(user_id)
     try:
         while True:
             data = await websocket.receive_text()
             # Keep connection alive
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        pass
+    finally:
+        manager.disconnect(user_id, connection)
+        if user_id not in manager.active_connections:
+            await backplane.mark_offline(user_id)
+
+# Synthetic data
+# Deterministic generators for load testing: the same seed always yields the
+# same documents. Docs are built as plain dicts in the models' shape (plus the
+# search and leaderboard fields) since running a million rows through pydantic
+# would dominate the seeding time.
+SYNTHETIC_FIRST_NAMES = ["Emma", "Oliver", "Sophia", "Lucas", "Ava", "Noah", "Mia", "Liam", "Isabella", "Ethan", "Amelia", "Mason", "Harper", "Logan", "Evelyn", "James", "Aria", "Elijah", "Chloe", "Aiden"]
+SYNTHETIC_LAST_NAMES = ["Wilson", "Brown", "Davis", "Miller", "Garcia", "Martinez", "Lopez", "Clark", "Lewis", "Walker", "Hall", "Young", "King", "Wright", "Scott", "Green", "Baker", "Adams", "Nelson", "Hill"]
+SYNTHETIC_SCHOOL_SUFFIXES = ["Elementary", "Middle", "Academy", "Primary"]
+SYNTHETIC_SCHOOL_NAMES = ["Lincoln", "Washington", "Roosevelt", "Jefferson", "Madison", "Franklin", "Hamilton", "Kennedy", "Adams", "Monroe", "Jackson", "Grant"]
+SYNTHETIC_CATEGORIES = ["Math", "Language", "Science", "Geography", "Logic", "History", "Art", "Music"]
+SYNTHETIC_DIFFICULTIES = ["Easy", "Medium", "Hard"]
+SYNTHETIC_CHUNK_SIZE = int(os.environ.get('SYNTHETIC_CHUNK_SIZE', 5000))
+SYNTHETIC_CONCURRENCY = int(os.environ.get('SYNTHETIC_CONCURRENCY', 4))
+# Timestamps are drawn backwards from a fixed anchor so a seed is reproducible
+SYNTHETIC_ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# Per-collection ceiling for synthetic rows requested over HTTP; seed.py has none
+SYNTHETIC_HTTP_MAX_ROWS = int(os.environ.get('SYNTHETIC_HTTP_MAX_ROWS', 100_000))
+
+def synthetic_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def synthetic_timestamp(rng: random.Random, now: datetime, max_days: int) -> datetime:
+    return now - timedelta(seconds=rng.randrange(max_days * 86400))
+
+def synthetic_schools(rng: random.Random, count: int) -> List[str]:
+    return [
+        f"{rng.choice(SYNTHETIC_SCHOOL_NAMES)} {rng.choice(SYNTHETIC_SCHOOL_SUFFIXES)} #{i + 1}"
+        for i in range(count)
+    ]
+
+def synthetic_users(rng: random.Random, count: int, now: datetime):
+    # Schools follow a Zipf-like size distribution, about 20% of users are on the
+    # Upgraded plan, and activity is log-normal so a few users play a lot.
+    schools = synthetic_schools(rng, max(10, count // 400))
+    # Cumulative once up front; choices(weights=...) would rebuild it per user
+    school_cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(schools))))
+    for i in range(count):
+        first, last = rng.choice(SYNTHETIC_FIRST_NAMES), rng.choice(SYNTHETIC_LAST_NAMES)
+        username = f"{first.lower()}_{last[0].lower()}{i}"
+        age = min(14, max(6, int(rng.gauss(10.5, 2))))
+        games_played = int(rng.lognormvariate(3, 1))
+        score = int(games_played * max(20, rng.gauss(180, 45)))
+        doc = {
+            "id": synthetic_id(rng),
+            "email": f"{username}@school.edu",
+            "username": username,
+            "full_name": f"{first} {last}",
+            "plan": "Upgraded" if rng.random() < 0.2 else "Standard",
+            "status": "active" if rng.random() < 0.97 else "suspended",
+            "avatar": None,
+            "bio": rng.choice([None, None, "Love playing math games!", "Puzzle fan", "Science explorer"]),
+            "age": age,
+            "school": rng.choices(schools, cum_weights=school_cum_weights)[0],
+            "grade": f"{age - 5}th" if age - 5 > 3 else ["1st", "2nd", "3rd"][max(0, age - 6)],
+            "total_games_played": games_played,
+            "total_score": score,
+            "joined_date": synthetic_timestamp(rng, now, 730).isoformat(),
+            "last_login": synthetic_timestamp(rng, now, 30).isoformat(),
+            "subscription_expires": None,
+            "revision": 0,
+        }
+        yield with_leaderboard_bucket(with_search_fields(doc, USER_PREFIX_FIELDS), "total_score")
+
+def synthetic_games(rng: random.Random, count: int, now: datetime):
+    for i in range(count):
+        category = rng.choice(SYNTHETIC_CATEGORIES)
+        created = synthetic_timestamp(rng, now, 1095)
+        doc = {
+            "id": synthetic_id(rng),
+            "name": f"{category} {rng.choice(['Blast', 'Quest', 'Lab', 'Master', 'Puzzles', 'Rush'])} {i + 1}",
+            "description": f"{rng.choice(SYNTHETIC_DIFFICULTIES)} {category.lower()} challenges for young learners",
+            "category": category,
+            "difficulty": rng.choice(SYNTHETIC_DIFFICULTIES),
+            "status": rng.choices(["live", "beta", "development"], weights=[70, 20, 10])[0],
+            "version": f"{rng.randint(0, 4)}.{rng.randint(0, 9)}.{rng.randint(0, 9)}",
+            "play_count": int(rng.lognormvariate(6, 1.5)),
+            "rating": round(min(5.0, max(1.0, rng.gauss(4.2, 0.4))), 1),
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+            "revision": 0,
+        }
+        yield with_search_fields(doc, GAME_PREFIX_FIELDS)
+
+def synthetic_builds(rng: random.Random, count: int, games: List[dict], now: datetime):
+    for _ in range(count):
+        game = rng.choice(games)
+        yield {
+            "id": synthetic_id(rng),
+            "game_id": game["id"],
+            "game_name": game["name"],
+            "version": game["version"],
+            "status": rng.choices(["completed", "failed", "pending"], weights=[85, 10, 5])[0],
+            "build_date": synthetic_timestamp(rng, now, 365).isoformat(),
+            "notes": None,
+        }
+
+def synthetic_revenue(rng: random.Random, count: int, sources: List[str], now: datetime):
+    for _ in range(count):
+        kind = rng.choices(["subscription", "purchase", "donation"], weights=[60, 30, 10])[0]
+        if kind == "subscription":
+            amount, description = 5.99, "Monthly subscription upgrade"
+        elif kind == "purchase":
+            amount, description = rng.choice([0.99, 2.99, 4.99, 9.99]), "In-game purchase"
+        else:
+            amount, description = round(rng.choice([5, 10, 20, 50]) * 1.0, 2), "Platform support"
+        yield {
+            "id": synthetic_id(rng),
+            "date": synthetic_timestamp(rng, now, 365).date().isoformat(),
+            "amount": amount,
+            "source": rng.choice(sources) if sources and kind != "donation" else "anonymous",
+            "description": description,
+            "type": kind,
+        }
+
+async def insert_stamped(collection, chunk: List[dict]):
+    first_seq = await reserve_changes(len(chunk))
+    for i, doc in enumerate(chunk):
+        doc.update(change_fields(first_seq + i))
+    await collection.insert_many(chunk, ordered=False)
+
+async def insert_chunked(collection, docs) -> int:
+    # Unordered insert_many per chunk, with up to SYNTHETIC_CONCURRENCY chunks in
+    # flight so generating the next chunk overlaps with writing the previous ones.
+    in_flight = set()
+    inserted = 0
+    chunk = []
+    for doc in docs:
+        chunk.append(doc)
+        if len(chunk) < SYNTHETIC_CHUNK_SIZE:
+            continue
+        if len(in_flight) >= SYNTHETIC_CONCURRENCY:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        in_flight.add(asyncio.create_task(insert_stamped(collection, chunk)))
+        inserted += len(chunk)
+        chunk = []
+    if chunk:
+        in_flight.add(asyncio.create_task(insert_stamped(collection, chunk)))
+        inserted += len(chunk)
+    await asyncio.gather(*in_flight)
+    if inserted:
+        announce_changes(collection.name)
+    return inserted
+
+async def generate_synthetic_data(users: int = 0, games: int = 0, builds: int = 0, revenue: int = 0, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    now = SYNTHETIC_ANCHOR
+    counts = {}
+    # Builds reference the games generated in this run, in generation order, so
+    # the same seed always yields the same builds; only when no games are
+    # generated do they fall back to the existing catalog, ordered by id.
+    game_refs: List[dict] = []
+    
+    def games_with_refs():
+        for doc in synthetic_games(rng, games, now):
+            if len(game_refs) < 10000:
+                game_refs.append({"id": doc["id"], "name": doc["name"], "version": doc["version"]})
+            yield doc
+    
+    counts["games"] = await insert_chunked(db.games, games_with_refs())
+    if not game_refs and builds:
+        game_refs = await db.games.find({}, {"_id": 0, "id": 1, "name": 1, "version": 1}) \
+            .sort("id", ASCENDING).limit(10000).to_list(10000)
+    counts["builds"] = await insert_chunked(db.builds, synthetic_builds(rng, builds, game_refs, now)) if game_refs else 0
+    
+    # Revenue sources reuse a sample of generated usernames, so keep a bounded reservoir
+    sources: List[str] = []
+    
+    def users_with_sources():
+        for doc in synthetic_users(rng, users, now):
+            if len(sources) < 10000:
+                sources.append(doc["username"])
+            yield doc
+    
+    counts["users"] = await insert_chunked(db.users, users_with_sources())
+    counts["revenue"] = await insert_chunked(db.revenue, synthetic_revenue(rng, revenue, sources, now))
+    return counts
 
 # Initialize sample data
-@api_router.post("/init-sample-data")
-async def init_sample_data():
+async def seed_sample_data(users: int = 0, games: int = 0, builds: int = 0, revenue: int = 0, seed: int = 42) -> dict:
     # Clear existing data
     await db.admins.delete_many({})
+    principal_cache.clear()
     await db.users.delete_many({})
     await db.games.delete_many({})
     await db.builds.delete_many({})
     await db.updates.delete_many({})
     await db.revenue.delete_many({})
+    await db.game_scores.delete_many({})
+    await db.build_slots.delete_many({})
     
     # Create default admin
     default_admin = {
@@ -458,7 +3186,7 @@ async def init_sample_data():
         "role": "super_admin",
         "status": "active",
         "created_at": datetime.now(timezone.utc).isoformat(),
-        "hashed_password": hash_password("admin123")
+        "hashed_password": await hash_password("admin123")
     }
     await db.admins.insert_one(default_admin)
     
@@ -474,7 +3202,7 @@ async def init_sample_data():
     
     for user_data in sample_users:
         user = User(**user_data)
-        await db.users.insert_one(user.model_dump())
+        await db.users.insert_one(with_leaderboard_bucket(with_search_fields(user.model_dump(), USER_PREFIX_FIELDS), "total_score"))
     
     # Create sample games
     sample_games = [
@@ -487,7 +3215,7 @@ async def init_sample_data():
     
     for game_data in sample_games:
         game = Game(**game_data)
-        await db.games.insert_one(game.model_dump())
+        await db.games.insert_one(with_search_fields(game.model_dump(), GAME_PREFIX_FIELDS))
     
     # Create sample builds
     games_list = await db.games.find({}, {"_id": 0}).to_list(100)
@@ -522,19 +3250,60 @@ async def init_sample_data():
     ]
     
     for revenue_data in sample_revenue:
-        revenue = Revenue(**revenue_data)
-        await db.revenue.insert_one(revenue.model_dump())
+        revenue_obj = Revenue(**revenue_data)
+        await db.revenue.insert_one(revenue_obj.model_dump())
     
-    return {"message": "Sample data initialized", "admin_credentials": {"username": "admin", "password": "admin123"}}
+    # Optional synthetic volume on top of the fixed samples
+    generated = {}
+    if users or games or builds or revenue:
+        generated = await generate_synthetic_data(users=users, games=games, builds=builds, revenue=revenue, seed=seed)
+    
+    await reconcile_dashboard_stats()
+    await rebuild_revenue_rollups()
+    await rebuild_leaderboards()
+    # A new epoch sends every client back to a full reload of the fresh data
+    await reset_change_feed()
+    invalidate_responses("games", "builds", "updates")
+    announce_changes(*CHANGE_SERIALIZERS)
+    
+    return {"message": "Sample data initialized", "generated": generated, "admin_credentials": {"username": "admin", "password": "admin123"}}
+
+@api_router.post("/init-sample-data")
+async def init_sample_data(
+    users: int = Query(0, ge=0, le=SYNTHETIC_HTTP_MAX_ROWS),
+    games: int = Query(0, ge=0, le=SYNTHETIC_HTTP_MAX_ROWS),
+    builds: int = Query(0, ge=0, le=SYNTHETIC_HTTP_MAX_ROWS),
+    revenue: int = Query(0, ge=0, le=SYNTHETIC_HTTP_MAX_ROWS),
+    seed: int = 42,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    # Resetting to the fixed samples stays open since the login page uses it to
+    # bootstrap; synthetic volume needs an admin token (checked before the
+    # reset wipes the admins) and larger datasets go through seed.py.
+    if users or games or builds or revenue:
+        if credentials is None:
+            raise HTTPException(status_code=401, detail="Synthetic data requires an admin token")
+        await authenticate_admin(credentials.credentials)
+    return await seed_sample_data(users=users, games=games, builds=builds, revenue=revenue, seed=seed)
 
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 logging.basicConfig(
@@ -543,6 +3312,137 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    # Every collection is addressed by its application-level "id"; the compound
+    # indexes back the keyset sort and the server-side filters on the list routes.
+    await db.admins.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("username", ASCENDING)]),
+        IndexModel([("email", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+    ])
+    await db.users.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("joined_date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("plan", ASCENDING), ("joined_date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("joined_date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("school", ASCENDING), ("joined_date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("username_lc", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("email_lc", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("full_name_lc", ASCENDING), ("id", ASCENDING)]),
+        IndexModel(
+            [("full_name", "text"), ("school", "text"), ("bio", "text")],
+            weights={"full_name": 5, "school": 3, "bio": 1},
+            name="users_text",
+        ),
+    ])
+    await db.games.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("category", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("name_lc", ASCENDING), ("id", ASCENDING)]),
+        IndexModel(
+            [("name", "text"), ("description", "text"), ("category", "text")],
+            weights={"name": 5, "category": 2, "description": 1},
+            name="games_text",
+        ),
+    ])
+    # Backfill normalized search fields on documents written before they existed
+    for collection, fields in ((db.users, USER_PREFIX_FIELDS), (db.games, GAME_PREFIX_FIELDS)):
+        await collection.update_many(
+            {f"{fields[0]}_lc": {"$exists": False}},
+            [{"$set": {f"{field}_lc": {"$toLower": f"${field}"} for field in fields}}],
+        )
+    await db.builds.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("build_date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("game_id", ASCENDING), ("build_date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("build_date", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+    ])
+    for collection in CHANGE_SERIALIZERS:
+        await db[collection].create_indexes([IndexModel([("change_seq", ASCENDING)])])
+    await db.change_tombstones.create_indexes([
+        IndexModel([("change_seq", ASCENDING)]),
+        IndexModel([("change_at", ASCENDING)]),
+    ])
+    await db.updates.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    ])
+    await db.revenue.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("type", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("source", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)]),
+    ])
+    await db.live_effects.create_indexes([
+        IndexModel([("user_id", ASCENDING), ("recorded_at", DESCENDING)]),
+        IndexModel([("recorded_at", ASCENDING)], expireAfterSeconds=LIVE_EFFECT_HISTORY_TTL_DAYS * 86400),
+    ])
+    await db.pending_effects.create_indexes([
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ])
+    await db.revenue_rollups.create_indexes([
+        IndexModel([("granularity", ASCENDING), ("dimension", ASCENDING), ("bucket", ASCENDING), ("key", ASCENDING)], unique=True),
+    ])
+    if not await db.revenue_rollups.find_one({}) and await db.revenue.find_one({}):
+        await rebuild_revenue_rollups()
+    await db.users.create_indexes([
+        IndexModel([("total_score", DESCENDING), ("id", ASCENDING)]),
+        IndexModel([("school", ASCENDING), ("total_score", DESCENDING), ("id", ASCENDING)]),
+        IndexModel([("grade", ASCENDING), ("total_score", DESCENDING), ("id", ASCENDING)]),
+        IndexModel([("lb_bucket", ASCENDING), ("total_score", DESCENDING)]),
+        IndexModel([("school", ASCENDING), ("lb_bucket", ASCENDING), ("total_score", DESCENDING)]),
+        IndexModel([("grade", ASCENDING), ("lb_bucket", ASCENDING), ("total_score", DESCENDING)]),
+    ])
+    await db.game_scores.create_indexes([
+        IndexModel([("game_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("game_id", ASCENDING), ("score", DESCENDING), ("user_id", ASCENDING)]),
+        IndexModel([("game_id", ASCENDING), ("lb_bucket", ASCENDING), ("score", DESCENDING)]),
+    ])
+    await db.leaderboard_buckets.create_indexes([
+        IndexModel([("scope", ASCENDING), ("bucket", ASCENDING)], unique=True),
+    ])
+    meta = await db.stats.find_one({"_id": "leaderboard_meta"})
+    if not meta or meta.get("bucket_width") != LEADERBOARD_BUCKET_WIDTH:
+        await rebuild_leaderboards()
+
+background_tasks: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    background_tasks.append(asyncio.create_task(
+        run_periodically(STATS_RECONCILE_SECONDS, reconcile_dashboard_stats, "Dashboard stats reconcile")
+    ))
+    background_tasks.append(asyncio.create_task(
+        run_periodically(LEADERBOARD_RECONCILE_SECONDS, periodic_leaderboard_rebuild, "Leaderboard rebuild")
+    ))
+    background_tasks.append(asyncio.create_task(
+        run_periodically(CHANGE_PRUNE_INTERVAL_SECONDS, prune_change_tombstones, "Change tombstone prune")
+    ))
+    background_tasks.append(asyncio.create_task(live_effect_history.run()))
+    await backplane.start()
+    if BUILD_SCHEDULER_ENABLED and BUILD_COMMAND:
+        await build_scheduler.start()
+    elif BUILD_SCHEDULER_ENABLED:
+        logger.warning("BUILD_COMMAND is not set; build scheduler disabled and builds stay pending")
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await build_scheduler.stop()
+    if notification_task is not None:
+        # Let the last write notices go out before the backplane closes
+        await notification_task
+    await backplane.stop()
+    password_hasher.shutdown()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
\ No newline at end of file
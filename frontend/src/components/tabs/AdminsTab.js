@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import axios from 'axios';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
@@ -7,13 +7,19 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { Card } from '@/components/ui/card';
 import { toast } from 'sonner';
+import { useChangeFeed } from '@/hooks/use-change-feed';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Edit2, Trash2, Plus, Shield, ShieldCheck } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 export default function AdminsTab() {
-  const [admins, setAdmins] = useState([]);
+  const { items: admins, setItems: setAdmins, reload: fetchAdmins, loadMore, hasMore, loading: loadingPage } = usePagedList(
+    `${API}/admins`,
+    {},
+    { loadOnMount: false, errorMessage: 'Failed to fetch admins' }
+  );
   const [loading, setLoading] = useState(false);
   const [editDialogOpen, setEditDialogOpen] = useState(false);
   const [addDialogOpen, setAddDialogOpen] = useState(false);
@@ -27,21 +33,8 @@ export default function AdminsTab() {
     role: 'admin'
   });
 
-  useEffect(() => {
-    fetchAdmins();
-  }, []);
-
-  const fetchAdmins = async () => {
-    try {
-      const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/admins`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setAdmins(response.data);
-    } catch (error) {
-      toast.error('Failed to fetch admins');
-    }
-  };
+  // Edits, additions and deletions arrive through the change feed
+  useChangeFeed('admins', setAdmins, fetchAdmins);
 
   const handleEdit = (admin) => {
     setSelectedAdmin(admin);
@@ -58,7 +51,6 @@ export default function AdminsTab() {
       });
       toast.success('Admin updated successfully');
       setEditDialogOpen(false);
-      fetchAdmins();
     } catch (error) {
       toast.error('Failed to update admin');
     } finally {
@@ -82,7 +74,6 @@ export default function AdminsTab() {
         password: '',
         role: 'admin'
       });
-      fetchAdmins();
     } catch (error) {
       toast.error(error.response?.data?.detail || 'Failed to create admin');
     } finally {
@@ -99,7 +90,6 @@ export default function AdminsTab() {
         headers: { Authorization: `Bearer ${token}` }
       });
       toast.success('Admin deleted successfully');
-      fetchAdmins();
     } catch (error) {
       toast.error('Failed to delete admin');
     }
@@ -258,6 +248,20 @@ export default function AdminsTab() {
         ))}
       </div>
 
+      {hasMore && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            data-testid="load-more-admins"
+            onClick={loadMore}
+            disabled={loadingPage}
+            className="border-zinc-700 text-zinc-300 hover:bg-zinc-800"
+          >
+            {loadingPage ? 'Loading...' : 'Load more'}
+          </Button>
+        </div>
+      )}
+
       {/* Edit Dialog */}
       <Dialog open={editDialogOpen} onOpenChange={setEditDialogOpen}>
         <DialogContent className="bg-zinc-900 border-zinc-800 text-white">
@@ -1,36 +1,27 @@
-import { useState, useEffect } from 'react';
-import axios from 'axios';
+import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
-import { toast } from 'sonner';
-import { Package, CheckCircle, Clock, XCircle } from 'lucide-react';
+import { useChangeFeed } from '@/hooks/use-change-feed';
+import { usePagedList } from '@/hooks/use-paged-list';
+import { Package, CheckCircle, Clock, XCircle, Loader2 } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 export default function BuildsTab() {
-  const [builds, setBuilds] = useState([]);
-
-  useEffect(() => {
-    fetchBuilds();
-  }, []);
+  const { items: builds, setItems: setBuilds, reload: fetchBuilds, loadMore, hasMore, loading: loadingPage } = usePagedList(
+    `${API}/builds`,
+    {},
+    { loadOnMount: false, errorMessage: 'Failed to fetch builds' }
+  );
 
-  const fetchBuilds = async () => {
-    try {
-      const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/builds`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setBuilds(response.data);
-    } catch (error) {
-      toast.error('Failed to fetch builds');
-    }
-  };
+  useChangeFeed('builds', setBuilds, fetchBuilds);
 
   const getStatusIcon = (status) => {
     switch(status) {
       case 'completed': return <CheckCircle className="w-5 h-5 text-green-400" />;
       case 'pending': return <Clock className="w-5 h-5 text-yellow-400" />;
+      case 'running': return <Loader2 className="w-5 h-5 text-blue-400 animate-spin" />;
       case 'failed': return <XCircle className="w-5 h-5 text-red-400" />;
       default: return <Package className="w-5 h-5 text-zinc-400" />;
     }
@@ -40,6 +31,7 @@ export default function BuildsTab() {
     switch(status) {
       case 'completed': return 'bg-green-500/20 text-green-400 border-green-500/30';
       case 'pending': return 'bg-yellow-500/20 text-yellow-400 border-yellow-500/30';
+      case 'running': return 'bg-blue-500/20 text-blue-400 border-blue-500/30';
       case 'failed': return 'bg-red-500/20 text-red-400 border-red-500/30';
       default: return 'bg-zinc-500/20 text-zinc-400 border-zinc-500/30';
     }
@@ -111,6 +103,20 @@ export default function BuildsTab() {
           </Card>
         ))}
       </div>
+
+      {hasMore && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            data-testid="load-more-builds"
+            onClick={loadMore}
+            disabled={loadingPage}
+            className="border-zinc-700 text-zinc-300 hover:bg-zinc-800"
+          >
+            {loadingPage ? 'Loading...' : 'Load more'}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
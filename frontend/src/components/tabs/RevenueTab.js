@@ -1,35 +1,52 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { toast } from 'sonner';
+import { useChangeFeed } from '@/hooks/use-change-feed';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { DollarSign, TrendingUp, CreditCard, Gift } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 export default function RevenueTab() {
-  const [revenue, setRevenue] = useState([]);
-
-  useEffect(() => {
-    fetchRevenue();
-  }, []);
+  const { items: revenue, setItems: setRevenue, reload: fetchRevenue, loadMore, hasMore, loading: loadingPage } = usePagedList(
+    `${API}/revenue`,
+    {},
+    { loadOnMount: false, errorMessage: 'Failed to fetch revenue data' }
+  );
+  const [totals, setTotals] = useState({});
 
-  const fetchRevenue = async () => {
+  // Totals come from the server-side rollups so they cover every row, not
+  // just what this tab has loaded; refreshed whenever the list changes.
+  const fetchTotals = async () => {
     try {
       const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/revenue`, {
-        headers: { Authorization: `Bearer ${token}` }
+      const response = await axios.get(`${API}/revenue/summary`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { granularity: 'month', group_by: 'type' }
+      });
+      const byType = {};
+      response.data.rows.forEach((row) => {
+        byType[row.group] = (byType[row.group] || 0) + row.amount;
       });
-      setRevenue(response.data);
+      setTotals(byType);
     } catch (error) {
-      toast.error('Failed to fetch revenue data');
+      toast.error('Failed to fetch revenue totals');
     }
   };
 
-  const totalRevenue = revenue.reduce((sum, r) => sum + r.amount, 0);
-  const subscriptionRevenue = revenue.filter(r => r.type === 'subscription').reduce((sum, r) => sum + r.amount, 0);
-  const purchaseRevenue = revenue.filter(r => r.type === 'purchase').reduce((sum, r) => sum + r.amount, 0);
-  const donationRevenue = revenue.filter(r => r.type === 'donation').reduce((sum, r) => sum + r.amount, 0);
+  useChangeFeed('revenue', setRevenue, fetchRevenue);
+
+  useEffect(() => {
+    fetchTotals();
+  }, [revenue]);
+
+  const subscriptionRevenue = totals.subscription || 0;
+  const purchaseRevenue = totals.purchase || 0;
+  const donationRevenue = totals.donation || 0;
+  const totalRevenue = Object.values(totals).reduce((sum, amount) => sum + amount, 0);
 
   const getTypeIcon = (type) => {
     switch(type) {
@@ -133,6 +150,19 @@ export default function RevenueTab() {
                 </div>
               </div>
             ))}
+            {hasMore && (
+              <div className="flex justify-center">
+                <Button
+                  variant="outline"
+                  data-testid="load-more-revenue"
+                  onClick={loadMore}
+                  disabled={loadingPage}
+                  className="border-zinc-700 text-zinc-300 hover:bg-zinc-800"
+                >
+                  {loadingPage ? 'Loading...' : 'Load more'}
+                </Button>
+              </div>
+            )}
           </div>
         </CardContent>
       </Card>
@@ -1,31 +1,21 @@
-import { useState, useEffect } from 'react';
-import axios from 'axios';
+import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
-import { toast } from 'sonner';
+import { useChangeFeed } from '@/hooks/use-change-feed';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Bell, Sparkles, Bug, Shield, Calendar } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 export default function UpdatesTab() {
-  const [updates, setUpdates] = useState([]);
-
-  useEffect(() => {
-    fetchUpdates();
-  }, []);
+  const { items: updates, setItems: setUpdates, reload: fetchUpdates, loadMore, hasMore, loading: loadingPage } = usePagedList(
+    `${API}/updates`,
+    {},
+    { loadOnMount: false, errorMessage: 'Failed to fetch updates' }
+  );
 
-  const fetchUpdates = async () => {
-    try {
-      const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/updates`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setUpdates(response.data);
-    } catch (error) {
-      toast.error('Failed to fetch updates');
-    }
-  };
+  useChangeFeed('updates', setUpdates, fetchUpdates);
 
   const getTypeIcon = (type) => {
     switch(type) {
@@ -104,6 +94,20 @@ export default function UpdatesTab() {
           </Card>
         ))}
       </div>
+
+      {hasMore && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            data-testid="load-more-updates"
+            onClick={loadMore}
+            disabled={loadingPage}
+            className="border-zinc-700 text-zinc-300 hover:bg-zinc-800"
+          >
+            {loadingPage ? 'Loading...' : 'Load more'}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
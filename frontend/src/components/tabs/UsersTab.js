@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useEffect, useState } from 'react';
 import axios from 'axios';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
@@ -7,14 +7,25 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { Card } from '@/components/ui/card';
 import { toast } from 'sonner';
-import { Edit2, Trash2, Plus, Crown, Zap, Image as ImageIcon, MessageSquare } from 'lucide-react';
+import { useChangeFeed } from '@/hooks/use-change-feed';
+import { usePagedList } from '@/hooks/use-paged-list';
+import { Edit2, Trash2, Plus, Crown, Zap, Image as ImageIcon, MessageSquare, Search } from 'lucide-react';
 import { Textarea } from '@/components/ui/textarea';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+const PAGE_SIZE = 50;
+
+// Mirrors the server's case-insensitive prefix search over USER_PREFIX_FIELDS
+const matchesSearch = (user, q) => {
+  const needle = q.toLowerCase();
+  return ['username', 'email', 'full_name'].some((field) => (user[field] || '').toLowerCase().startsWith(needle));
+};
+
 export default function UsersTab() {
-  const [users, setUsers] = useState([]);
+  const [filters, setFilters] = useState({ q: '', plan: 'all', status: 'all', school: '' });
+  const [applied, setApplied] = useState(filters);
   const [loading, setLoading] = useState(false);
   const [editDialogOpen, setEditDialogOpen] = useState(false);
   const [addDialogOpen, setAddDialogOpen] = useState(false);
@@ -37,21 +48,34 @@ export default function UsersTab() {
     duration: 5000
   });
 
+  // Typing settles for a moment before it turns into a request
   useEffect(() => {
-    fetchUsers();
-  }, []);
+    const timer = setTimeout(() => setApplied(filters), 300);
+    return () => clearTimeout(timer);
+  }, [filters]);
 
-  const fetchUsers = async () => {
-    try {
-      const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/users`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setUsers(response.data);
-    } catch (error) {
-      toast.error('Failed to fetch users');
-    }
+  // Filters are applied by the server; a search term switches to /users/search
+  const q = applied.q.trim();
+  const school = applied.school.trim();
+  const params = {
+    ...(q && { q }),
+    ...(applied.plan !== 'all' && { plan: applied.plan }),
+    ...(applied.status !== 'all' && { status: applied.status }),
+    ...(school && { school }),
   };
+  const { items: users, setItems: setUsers, reload: fetchUsers, loadMore, hasMore, loading: loadingPage } = usePagedList(
+    q ? `${API}/users/search` : `${API}/users`,
+    params,
+    { limit: PAGE_SIZE, offsetPaging: Boolean(q), loadOnMount: false, errorMessage: 'Failed to fetch users' }
+  );
+
+  const matchesFilters = (user) =>
+    (!params.plan || user.plan === params.plan) &&
+    (!params.status || user.status === params.status) &&
+    (!params.school || user.school === params.school) &&
+    (!q || matchesSearch(user, q));
+
+  useChangeFeed('users', setUsers, fetchUsers, matchesFilters);
 
   const handleEdit = (user) => {
     setSelectedUser(user);
@@ -63,14 +87,20 @@ export default function UsersTab() {
     setLoading(true);
     try {
       const token = localStorage.getItem('admin_token');
-      await axios.put(`${API}/users/${selectedUser.id}`, editForm, {
-        headers: { Authorization: `Bearer ${token}` }
+      // Send only the edited fields, guarded by the revision they were read at,
+      // so an edit never overwrites changes made since the dialog opened
+      const changes = Object.fromEntries(
+        Object.entries(editForm).filter(([key, value]) => value !== selectedUser[key])
+      );
+      await axios.put(`${API}/users/${selectedUser.id}`, changes, {
+        headers: { Authorization: `Bearer ${token}`, 'If-Match': `"${selectedUser.revision || 0}"` }
       });
       toast.success('User updated successfully');
       setEditDialogOpen(false);
-      fetchUsers();
     } catch (error) {
-      toast.error('Failed to update user');
+      toast.error(error.response?.status === 409
+        ? 'This user was changed by someone else; reopen it to edit'
+        : 'Failed to update user');
     } finally {
       setLoading(false);
     }
@@ -98,7 +128,6 @@ export default function UsersTab() {
         grade: '',
         bio: ''
       });
-      fetchUsers();
     } catch (error) {
       toast.error('Failed to create user');
     } finally {
@@ -115,7 +144,6 @@ export default function UsersTab() {
         headers: { Authorization: `Bearer ${token}` }
       });
       toast.success('User deleted successfully');
-      fetchUsers();
     } catch (error) {
       toast.error('Failed to delete user');
     }
@@ -249,6 +277,47 @@ export default function UsersTab() {
         </Dialog>
       </div>
 
+      <div className="flex flex-wrap gap-3" data-testid="user-filters">
+        <div className="relative flex-1 min-w-[220px]">
+          <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-zinc-500" />
+          <Input
+            data-testid="user-search"
+            placeholder="Search username, email or name..."
+            value={filters.q}
+            onChange={(e) => setFilters({...filters, q: e.target.value})}
+            className="pl-9 bg-zinc-900 border-zinc-800"
+          />
+        </div>
+        <Select value={filters.plan} onValueChange={(val) => setFilters({...filters, plan: val})}>
+          <SelectTrigger className="w-40 bg-zinc-900 border-zinc-800" data-testid="user-plan-filter">
+            <SelectValue />
+          </SelectTrigger>
+          <SelectContent className="bg-zinc-800 border-zinc-700">
+            <SelectItem value="all">All plans</SelectItem>
+            <SelectItem value="Standard">Standard</SelectItem>
+            <SelectItem value="Upgraded">Upgraded</SelectItem>
+          </SelectContent>
+        </Select>
+        <Select value={filters.status} onValueChange={(val) => setFilters({...filters, status: val})}>
+          <SelectTrigger className="w-40 bg-zinc-900 border-zinc-800" data-testid="user-status-filter">
+            <SelectValue />
+          </SelectTrigger>
+          <SelectContent className="bg-zinc-800 border-zinc-700">
+            <SelectItem value="all">All statuses</SelectItem>
+            <SelectItem value="active">Active</SelectItem>
+            <SelectItem value="suspended">Suspended</SelectItem>
+            <SelectItem value="inactive">Inactive</SelectItem>
+          </SelectContent>
+        </Select>
+        <Input
+          data-testid="user-school-filter"
+          placeholder="School"
+          value={filters.school}
+          onChange={(e) => setFilters({...filters, school: e.target.value})}
+          className="w-48 bg-zinc-900 border-zinc-800"
+        />
+      </div>
+
       <div className="grid gap-4">
         {users.map((user) => (
           <Card
@@ -333,8 +402,25 @@ export default function UsersTab() {
             </div>
           </Card>
         ))}
+        {!users.length && !loadingPage && (
+          <p className="text-center text-zinc-500 py-8">No users match these filters</p>
+        )}
       </div>
 
+      {hasMore && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            data-testid="load-more-users"
+            onClick={loadMore}
+            disabled={loadingPage}
+            className="border-zinc-700 text-zinc-300 hover:bg-zinc-800"
+          >
+            {loadingPage ? 'Loading...' : 'Load more'}
+          </Button>
+        </div>
+      )}
+
       {/* Edit Dialog */}
       <Dialog open={editDialogOpen} onOpenChange={setEditDialogOpen}>
         <DialogContent className="bg-zinc-900 border-zinc-800 text-white max-w-2xl max-h-[90vh] overflow-y-auto">
@@ -423,26 +509,6 @@ export default function UsersTab() {
                 />
               </div>
             </div>
-            <div className="grid grid-cols-2 gap-4">
-              <div className="space-y-2">
-                <Label>Total Games Played</Label>
-                <Input
-                  type="number"
-                  value={editForm.total_games_played || 0}
-                  onChange={(e) => setEditForm({...editForm, total_games_played: parseInt(e.target.value)})}
-                  className="bg-zinc-800 border-zinc-700"
-                />
-              </div>
-              <div className="space-y-2">
-                <Label>Total Score</Label>
-                <Input
-                  type="number"
-                  value={editForm.total_score || 0}
-                  onChange={(e) => setEditForm({...editForm, total_score: parseInt(e.target.value)})}
-                  className="bg-zinc-800 border-zinc-700"
-                />
-              </div>
-            </div>
             <div className="space-y-2">
               <Label>Bio</Label>
               <Textarea
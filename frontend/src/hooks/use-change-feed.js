@@ -0,0 +1,91 @@
+import { useEffect, useRef } from 'react';
+import axios from 'axios';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const API = `${BACKEND_URL}/api`;
+
+// Keeps a tab's list in sync through /api/changes. The first call returns a
+// token and a reset, which triggers the tab's load; after that every
+// "changes" push on /ws/admin pulls only what changed since the last token.
+// `matches` tells whether a document belongs in the tab's current (filtered)
+// view: changed rows that stop matching drop out and new ones are only added
+// when they match.
+export function useChangeFeed(collection, setItems, reload, matches = () => true) {
+  const reloadRef = useRef(reload);
+  reloadRef.current = reload;
+  const matchesRef = useRef(matches);
+  matchesRef.current = matches;
+
+  useEffect(() => {
+    const token = localStorage.getItem('admin_token');
+    const headers = { Authorization: `Bearer ${token}` };
+    let since = null;
+    let syncing = false;
+    let queued = false;
+    let closed = false;
+
+    const apply = (changes) => {
+      const latest = new Map();
+      changes.filter((c) => c.collection === collection).forEach((c) => latest.set(c.id, c));
+      if (!latest.size) return;
+      const belongs = (c) => c.op === 'upsert' && matchesRef.current(c.doc);
+      setItems((current) => {
+        const known = new Set(current.map((item) => item.id));
+        const kept = current
+          .filter((item) => !latest.has(item.id) || belongs(latest.get(item.id)))
+          .map((item) => (latest.has(item.id) ? latest.get(item.id).doc : item));
+        const added = [...latest.values()]
+          .filter((c) => belongs(c) && !known.has(c.id))
+          .map((c) => c.doc)
+          .reverse();
+        return [...added, ...kept];
+      });
+    };
+
+    const sync = async () => {
+      if (syncing) {
+        queued = true;
+        return;
+      }
+      syncing = true;
+      try {
+        let more = true;
+        while (more && !closed) {
+          const response = await axios.get(`${API}/changes`, { headers, params: { since } });
+          const feed = response.data;
+          const advanced = feed.token !== since;
+          since = feed.token;
+          if (feed.reset) {
+            await reloadRef.current();
+            break;
+          }
+          apply(feed.changes);
+          // Unsettled entries hold the token back; wait for the next push then
+          more = feed.has_more && advanced;
+        }
+      } catch (error) {
+        // The next push retries from the same token
+      } finally {
+        syncing = false;
+        if (queued && !closed) {
+          queued = false;
+          sync();
+        }
+      }
+    };
+
+    const ws = new WebSocket(`${BACKEND_URL.replace(/^http/, 'ws')}/ws/admin?token=${encodeURIComponent(token)}`);
+    ws.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'changes' && message.collections.includes(collection)) {
+        sync();
+      }
+    };
+    sync();
+
+    return () => {
+      closed = true;
+      ws.close();
+    };
+  }, [collection, setItems]);
+}
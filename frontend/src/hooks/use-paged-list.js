@@ -0,0 +1,54 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+import axios from 'axios';
+import { toast } from 'sonner';
+
+// One page of a list endpoint at a time. `reload` fetches the first page for
+// the current params and `loadMore` appends the next one only when asked, so
+// a tab never downloads the whole collection. List endpoints hand out the
+// next cursor in X-Next-Cursor; search endpoints page by offset instead.
+// Tabs kept in sync by useChangeFeed pass loadOnMount: false, since the
+// feed's first reset triggers the initial load.
+export function usePagedList(url, params, { limit = 50, offsetPaging = false, loadOnMount = true, errorMessage } = {}) {
+  const [items, setItems] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const paramsKey = JSON.stringify(params || {});
+  const latestRequest = useRef(0);
+
+  const load = useCallback(async (after) => {
+    const request = ++latestRequest.current;
+    const token = localStorage.getItem('admin_token');
+    const query = { ...JSON.parse(paramsKey), limit };
+    if (after) {
+      Object.assign(query, offsetPaging ? { offset: after } : { after });
+    }
+    setLoading(true);
+    try {
+      const response = await axios.get(url, { headers: { Authorization: `Bearer ${token}` }, params: query });
+      // A newer reload (e.g. the filters changed) supersedes this response
+      if (request !== latestRequest.current) return;
+      const page = response.data;
+      setItems((current) => (after ? [...current, ...page] : page));
+      if (offsetPaging) {
+        setNext(page.length === limit ? (after || 0) + limit : null);
+      } else {
+        setNext(response.headers['x-next-cursor'] || null);
+      }
+    } catch (error) {
+      if (request === latestRequest.current && errorMessage) toast.error(errorMessage);
+    } finally {
+      if (request === latestRequest.current) setLoading(false);
+    }
+  }, [url, paramsKey, limit, offsetPaging, errorMessage]);
+
+  const reload = useCallback(() => load(null), [load]);
+  const loadMore = useCallback(() => (next ? load(next) : undefined), [load, next]);
+
+  const mounted = useRef(false);
+  useEffect(() => {
+    if (mounted.current || loadOnMount) reload();
+    mounted.current = true;
+  }, [reload, loadOnMount]);
+
+  return { items, setItems, reload, loadMore, hasMore: Boolean(next), loading };
+}
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# server.py reads its connection settings at import time; nothing connects
+# until a query runs, and the tests swap in an in-memory database first.
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "eduplay_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+import server  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    database = AsyncMongoMockClient()["eduplay_test"]
+    monkeypatch.setattr(server, "db", database)
+    return database
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+import server
+
+ADMIN_DOC = {"id": "a1", "email": "kim@example.com", "username": "kim", "full_name": "Kim", "role": "admin", "status": "active"}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    cache = server.PrincipalCache(ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(server, "principal_cache", cache)
+    return cache
+
+
+def count_lookups(mock_db, monkeypatch):
+    admins = mock_db.admins
+    lookups = []
+    find_one = admins.find_one
+
+    async def counted(*args, **kwargs):
+        lookups.append(args[0])
+        return await find_one(*args, **kwargs)
+
+    monkeypatch.setattr(admins, "find_one", counted)
+    monkeypatch.setattr(mock_db, "admins", admins, raising=False)
+    return lookups
+
+
+def test_principal_is_cached_until_the_admin_changes(mock_db, monkeypatch, cache):
+    token = server.create_admin_token(ADMIN_DOC)
+    request = Request({"type": "http", "method": "PUT", "path": "/", "headers": []})
+
+    async def run():
+        await mock_db.admins.insert_one(dict(ADMIN_DOC))
+        lookups = count_lookups(mock_db, monkeypatch)
+        first = await server.authenticate_admin(token)
+        second = await server.authenticate_admin(token)
+        cached_lookups = len(lookups)
+        await server.update_admin("a1", server.AdminUpdate(role="super_admin"), request, Response(), first)
+        promoted = await server.authenticate_admin(token)
+        await server.delete_admin("a1", promoted)
+        with pytest.raises(HTTPException) as exc:
+            await server.authenticate_admin(token)
+        return first, second, cached_lookups, promoted, exc.value.status_code
+
+    first, second, cached_lookups, promoted, deleted_status = asyncio.run(run())
+    assert first == second and first.role == "admin"
+    assert cached_lookups == 1
+    assert promoted.role == "super_admin"
+    assert deleted_status == 401
+
+
+def test_disabled_tokens_and_garbage_are_rejected(mock_db, cache):
+    asyncio.run(mock_db.admins.insert_one(dict(ADMIN_DOC)))
+    for token in (server.create_admin_token({**ADMIN_DOC, "status": "disabled"}), "not-a-jwt"):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(server.authenticate_admin(token))
+        assert exc.value.status_code == 401
+
+
+def test_cache_expires_and_evicts_least_recently_used():
+    principal = lambda admin_id: server.AdminPrincipal(id=admin_id, username=admin_id, role="admin", status="active")
+    expired = server.PrincipalCache(ttl_seconds=-1, max_entries=10)
+    expired.put(principal("a1"))
+    assert expired.get("a1") is None
+
+    cache = server.PrincipalCache(ttl_seconds=60, max_entries=2)
+    cache.put(principal("a1"))
+    cache.put(principal("a2"))
+    cache.get("a1")
+    cache.put(principal("a3"))
+    assert list(cache.entries) == ["a1", "a3"]
+
+
+def test_card_fields_follow_the_principal_role(mock_db):
+    user = {**server.User(id="u1", email="ana@school.edu", username="ana", full_name="Ana").model_dump(),
+            "credit_card_last4": "4242", "credit_card_type": "visa"}
+    asyncio.run(mock_db.users.insert_one(user))
+    admin = server.AdminPrincipal(id="a1", username="kim", role="admin", status="active")
+    super_admin = admin.model_copy(update={"role": "super_admin"})
+    # The role comes from the principal, so neither call looks the admin up
+    assert "credit_card_last4" not in asyncio.run(server.get_user("u1", Response(), admin))
+    assert asyncio.run(server.get_user("u1", Response(), super_admin))["credit_card_last4"] == "4242"
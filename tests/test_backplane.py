@@ -0,0 +1,105 @@
+import asyncio
+import types
+
+import server
+
+
+class FakeTailCursor:
+    def __init__(self, docs, fail):
+        self.docs = docs
+        self.fail = fail
+        self.alive = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.docs:
+            return self.docs.pop(0)
+        if self.fail:
+            raise ConnectionError("cursor killed")
+        self.alive = False
+        raise StopAsyncIteration
+
+
+class FakeCappedCollection:
+    # Documents are kept in insertion order. The first cursor sees one new
+    # envelope and then dies, as a tailable cursor does when its connection drops.
+    def __init__(self, docs):
+        self.docs = docs
+        self.cursors = 0
+
+    async def find_one(self, query, projection=None, sort=None):
+        if sort:
+            return self.docs[-1] if self.docs else None
+        return next((doc for doc in self.docs if doc["_id"] == query["_id"]), None)
+
+    def find(self, query, cursor_type=None):
+        self.cursors += 1
+        if self.cursors == 1:
+            self.docs.append({"_id": 5, "kind": "noop"})
+        elif self.cursors > 3:
+            raise asyncio.CancelledError
+        after = query.get("_id", {}).get("$gt")
+        docs = [dict(doc) for doc in self.docs if after is None or doc["_id"] > after]
+        return FakeTailCursor(docs, fail=self.cursors == 1)
+
+
+def test_mongo_tail_resumes_in_insertion_order(monkeypatch):
+    collection = FakeCappedCollection([{"_id": 1, "kind": "noop"}])
+    monkeypatch.setattr(server, "db", types.SimpleNamespace(ws_backplane=collection))
+    delivered = []
+
+    async def deliver(envelope):
+        delivered.append(envelope["_id"])
+        if envelope["_id"] == 5:
+            # A host with a lagging clock inserts a lower id while the cursor is down
+            collection.docs.append({"_id": 3, "kind": "noop"})
+        if len(delivered) == 2:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(server, "deliver_envelope", deliver)
+
+    async def run():
+        try:
+            await server.MongoBackplane()._tail()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert delivered == [5, 3]
+
+
+def test_local_backplane_elects_one_hub(mock_db, tmp_path, monkeypatch):
+    delivered = []
+
+    async def deliver(envelope):
+        delivered.append(envelope["n"])
+
+    monkeypatch.setattr(server, "deliver_envelope", deliver)
+    path = str(tmp_path / "backplane.sock")
+
+    async def run():
+        first, second = server.LocalSocketBackplane(path), server.LocalSocketBackplane(path)
+        await first.start()
+        await second.start()
+        await asyncio.wait_for(asyncio.gather(first.connected.wait(), second.connected.wait()), 5)
+        hubs = [bp for bp in (first, second) if bp.server]
+        peer = first if hubs[0] is second else second
+        await peer.publish({"n": 1})
+        await asyncio.wait_for(until(lambda: len(delivered) == 2), 5)
+
+        # The hub goes away; the peer takes over the lock and the socket
+        await hubs[0].stop()
+        await asyncio.wait_for(until(lambda: peer.server is not None), 5)
+        await peer.publish({"n": 2})
+        await peer.stop()
+        return len(hubs)
+
+    assert asyncio.run(run()) == 1
+    assert delivered == [1, 1, 2]
+
+
+async def until(condition):
+    while not condition():
+        await asyncio.sleep(0.01)
@@ -0,0 +1,34 @@
+import asyncio
+
+import benchmark
+import server
+
+
+def results(**scenarios):
+    return {"results": {"1000": scenarios}}
+
+
+def stats(p99, rps=100.0, errors=0):
+    return {"count": 10, "errors": errors, "p99_ms": p99, "throughput_rps": rps}
+
+
+def test_failed_scenarios_lists_any_errors():
+    output = results(login=stats(5.0), **{"GET /api/stats/dashboard": {"count": 0, "errors": 20}})
+    assert benchmark.failed_scenarios(output) == ["1000 GET /api/stats/dashboard: 20 errors, 0 ok"]
+
+
+def test_compare_flags_regressions_and_missing_scenarios():
+    previous = results(login=stats(10.0), **{"GET /api/users": stats(10.0)})
+    assert benchmark.compare(previous, results(login=stats(10.5), **{"GET /api/users": stats(10.0)}), 0.10) == 0
+    assert benchmark.compare(previous, results(login=stats(20.0), **{"GET /api/users": stats(10.0)}), 0.10) == 1
+    assert benchmark.compare(previous, results(login=stats(10.0)), 0.10) == 1
+
+
+def test_dashboard_stats_run_against_the_memory_stand_in(mock_db):
+    async def run():
+        await mock_db.users.insert_many([{"plan": "Upgraded"}, {"plan": "Standard"}, {"plan": "Upgraded"}])
+        await mock_db.games.insert_many([{"name": "Math Blast"}])
+        await mock_db.revenue.insert_many([{"amount": 5.99}, {"amount": 4.01}])
+        return await server.compute_dashboard_stats()
+
+    assert asyncio.run(run()) == {"total_users": 3, "upgraded_users": 2, "total_games": 1, "total_revenue": 10.0}
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+class FakeWebSocket:
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.stalled = stalled
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(message["n"])
+
+    async def close(self):
+        self.closed = True
+
+
+async def connect(manager, user_id, **profile):
+    websocket = FakeWebSocket(stalled=profile.pop("stalled", False))
+    await manager.connect(user_id, websocket, profile)
+    return websocket
+
+
+def test_segments_are_selected_by_profile_and_ids():
+    async def run():
+        manager = server.ConnectionManager()
+        await connect(manager, "u1", plan="Upgraded", school="North")
+        await connect(manager, "u2", plan="Standard", school="North")
+        await connect(manager, "u3", plan="Upgraded", school="South")
+        ids = lambda connections: sorted(c.user_id for c in connections)
+        selected = (
+            ids(manager.select(plan="Upgraded")),
+            ids(manager.select(plan="Upgraded", school="North", grade=None)),
+            ids(manager.select(user_ids=["u2", "u3", "u9"])),
+            ids(manager.select()),
+        )
+        for user_id in list(manager.active_connections):
+            manager.disconnect(user_id)
+        return selected
+
+    assert asyncio.run(run()) == (["u1", "u3"], ["u1"], ["u2", "u3"], ["u1", "u2", "u3"])
+
+
+def test_a_stalled_socket_does_not_hold_up_the_others(monkeypatch):
+    monkeypatch.setattr(server, "WS_SEND_QUEUE_SIZE", 2)
+    monkeypatch.setattr(server, "WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+    async def run():
+        manager = server.ConnectionManager()
+        fast = await connect(manager, "fast")
+        await connect(manager, "slow", stalled=True)
+        for n in range(5):
+            await manager.broadcast({"n": n}, manager.select())
+            await asyncio.sleep(0.005)
+        slow = manager.active_connections["slow"]
+        queued = [message["n"] for message in list(slow.queue._queue)]
+        for user_id in list(manager.active_connections):
+            manager.disconnect(user_id)
+        return fast.sent, queued, slow.dropped
+
+    fast_sent, slow_queued, slow_dropped = asyncio.run(run())
+    assert fast_sent == [0, 1, 2, 3, 4]
+    # The stalled writer holds message 0; its queue keeps only the newest two
+    assert slow_queued == [3, 4] and slow_dropped == 2
+
+
+def test_disconnect_policy_drops_slow_consumers(monkeypatch):
+    monkeypatch.setattr(server, "WS_SEND_QUEUE_SIZE", 1)
+    monkeypatch.setattr(server, "WS_SLOW_CONSUMER_POLICY", "disconnect")
+
+    async def run():
+        manager = server.ConnectionManager()
+        websocket = await connect(manager, "slow", stalled=True)
+        delivered = [await manager.send_personal_message({"n": n}, "slow") for n in range(3)]
+        await asyncio.sleep(0.01)
+        return delivered, "slow" in manager.active_connections, websocket.closed
+
+    delivered, still_connected, closed = asyncio.run(run())
+    # The second message finds the queue full and the connection is dropped
+    assert delivered == [True, False, False]
+    assert not still_connected and closed
+
+
+def test_broadcast_needs_a_target():
+    admin = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+    effect = server.LiveEffectBroadcast(effect_type="text", content="hi")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.broadcast_live_effect(effect, admin))
+    assert exc.value.status_code == 400
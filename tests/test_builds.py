@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo import ReturnDocument
+
+import server
+
+
+def with_post_images(mock_db, monkeypatch):
+    # mongomock looks the post-image up again with the original filter, so an
+    # update that changes a filtered field (status here) comes back as None.
+    builds = mock_db.builds
+    find_one_and_update = builds.find_one_and_update
+
+    async def patched(query, update, projection=None, return_document=ReturnDocument.BEFORE, **kwargs):
+        if return_document != ReturnDocument.AFTER:
+            return await find_one_and_update(query, update, projection=projection, **kwargs)
+        before = await find_one_and_update(query, update, projection={"_id": 0, "id": 1}, **kwargs)
+        return before and await builds.find_one({"id": before["id"]}, projection)
+
+    monkeypatch.setattr(builds, "find_one_and_update", patched)
+    monkeypatch.setattr(mock_db, "builds", builds, raising=False)
+
+
+@pytest.fixture
+def scheduler(mock_db, monkeypatch):
+    with_post_images(mock_db, monkeypatch)
+    published = []
+
+    async def publish(envelope):
+        published.append(envelope["message"]["build"]["status"])
+
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    monkeypatch.setattr(server, "publish_quietly", publish)
+    scheduler = server.BuildScheduler(workers=1, per_game=1)
+    scheduler.published = published
+    return scheduler
+
+
+def make_build(build_id, game_id="g1", minute=0, **fields):
+    return server.Build(
+        id=build_id, game_id=game_id, game_name="Math Quest", version="1.0.0",
+        build_date=f"2024-03-01T10:0{minute}:00+00:00", **fields,
+    ).model_dump()
+
+
+def test_claims_respect_the_per_game_limit(mock_db, scheduler):
+    async def run():
+        await mock_db.builds.insert_many([make_build("b1"), make_build("b2", minute=1), make_build("b3", "g2", minute=2)])
+        claimed = [await scheduler.claim() for _ in range(3)]
+        return [build and build["id"] for build in claimed], await mock_db.build_slots.find({}).to_list(None)
+
+    claimed, slots = asyncio.run(run())
+    # b2 waits for g1's only slot, so the next claim skips to g2
+    assert claimed == ["b1", "b3", None]
+    assert {slot["_id"]: slot["holders"] for slot in slots} == {"g1": ["b1"], "g2": ["b3"]}
+
+
+def test_builds_move_through_running_to_completed(mock_db, scheduler, monkeypatch):
+    monkeypatch.setattr(server, "BUILD_COMMAND", "sh -c 'echo built $BUILD_VERSION'")
+
+    async def run():
+        await mock_db.builds.insert_one(make_build("b1"))
+        await scheduler.execute(await scheduler.claim())
+        return await mock_db.builds.find_one({"id": "b1"}, {"_id": 0}), await mock_db.build_slots.find_one({"_id": "g1"})
+
+    build, slot = asyncio.run(run())
+    assert (build["status"], build["attempts"], build["notes"]) == ("completed", 1, "built 1.0.0")
+    assert build["started_at"] and build["finished_at"] and build["worker_id"] is None
+    assert slot["holders"] == []
+    assert scheduler.published == ["running", "completed"]
+
+
+def test_failures_retry_with_backoff_then_fail(mock_db, scheduler, monkeypatch):
+    monkeypatch.setattr(server, "BUILD_COMMAND", "false")
+    monkeypatch.setattr(server, "BUILD_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(server, "BUILD_RETRY_BACKOFF_SECONDS", 0)
+
+    async def run():
+        await mock_db.builds.insert_one(make_build("b1"))
+        await scheduler.execute(await scheduler.claim())
+        retry = await mock_db.builds.find_one({"id": "b1"}, {"_id": 0})
+        await scheduler.execute(await scheduler.claim())
+        return retry, await mock_db.builds.find_one({"id": "b1"}, {"_id": 0})
+
+    retry, final = asyncio.run(run())
+    assert (retry["status"], retry["attempts"]) == ("pending", 1)
+    assert retry["error"].startswith("Build exited with 1")
+    assert (final["status"], final["attempts"]) == ("failed", 2)
+    assert scheduler.published == ["running", "pending", "running", "failed"]
+
+
+def test_without_a_build_command_nothing_is_built():
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.run_build_job(make_build("b1")))
+
+
+def test_reaper_requeues_builds_whose_lease_ran_out(mock_db, scheduler):
+    expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    async def run():
+        await mock_db.builds.insert_one(make_build("b1", status="running", attempts=1) | {
+            "worker_id": "gone", "lease_expires_at": expired,
+        })
+        await mock_db.build_slots.insert_one({"_id": "g1", "holders": ["b1", "b-dead"]})
+        await scheduler.reap_expired()
+        return await mock_db.builds.find_one({"id": "b1"}, {"_id": 0}), await mock_db.build_slots.find_one({"_id": "g1"})
+
+    build, slot = asyncio.run(run())
+    assert (build["status"], build["error"], build["worker_id"]) == ("pending", "Build worker stopped responding", None)
+    assert slot["holders"] == []
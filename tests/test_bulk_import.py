@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from starlette.requests import Request
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+def make_request(body):
+    async def receive():
+        return {"type": "http.request", "body": body.encode(), "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": []}, receive)
+
+
+def test_bad_rows_are_reported_without_stopping_the_import(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    lines = [
+        json.dumps({"email": "ana@school.edu", "username": "ana", "full_name": "Ana Lima", "plan": "Upgraded"}),
+        "{not json",
+        json.dumps({"email": "not-an-email", "username": "ben", "full_name": "Ben"}),
+        json.dumps(["a", "list"]),
+        "",
+        json.dumps({"email": "cleo@school.edu", "username": "cleo"}),
+        json.dumps({"email": "dan@school.edu", "username": "dan", "full_name": "Dan Reyes"}),
+    ]
+
+    async def run():
+        result = await server.bulk_create_users(make_request("\n".join(lines)), ADMIN)
+        return result, await mock_db.users.find({}, {"_id": 0}).to_list(None)
+
+    result, stored = asyncio.run(run())
+    assert (result["received"], result["inserted"]) == (6, 2)
+    failed = {row["row"]: row["errors"] for row in result["failed"]}
+    assert sorted(failed) == [1, 2, 3, 4]
+    assert failed[1][0]["message"].startswith("Invalid JSON")
+    assert failed[2][0]["field"] == "email"
+    assert failed[3][0]["message"] == "Row must be a JSON object"
+    assert failed[4][0]["field"] == "full_name"
+    assert sorted(doc["username"] for doc in stored) == ["ana", "dan"]
+    assert all(doc["username_lc"] == doc["username"] and "change_seq" in doc for doc in stored)
+
+
+def test_write_errors_are_reported_against_their_rows(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    monkeypatch.setattr(server, "BULK_CHUNK_SIZE", 2)
+    row = {"amount": 5.0, "source": "ana", "description": "plan", "type": "subscription"}
+    rows = [
+        {**row, "id": "r1", "date": "2024-03-01"},
+        {**row, "id": "r2", "date": "someday"},
+        {**row, "id": "r1", "date": "2024-03-02"},
+        {**row, "id": "r3", "date": "2024-03-03"},
+    ]
+
+    async def run():
+        await mock_db.revenue.create_index("id", unique=True)
+        result = await server.bulk_create_revenue(make_request(json.dumps(rows)), ADMIN)
+        march = await mock_db.revenue_rollups.find_one({"granularity": "month", "dimension": "total", "bucket": "2024-03"})
+        return result, march
+
+    result, march = asyncio.run(run())
+    assert (result["received"], result["inserted"]) == (4, 2)
+    assert [row["row"] for row in result["failed"]] == [1, 2]
+    assert result["failed"][0]["errors"][0]["message"] == "Invalid revenue date"
+    # Only the rows that were written count towards the rollups
+    assert (march["amount"], march["count"]) == (10.0, 2)
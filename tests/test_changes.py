@@ -0,0 +1,201 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+SETTLED = datetime.now(timezone.utc) - timedelta(hours=1)
+
+
+def changes(since, limit=50):
+    return server.get_changes(since=since, limit=limit, principal=ADMIN)
+
+
+async def stamp(collection, doc, at=SETTLED):
+    seq = await server.reserve_changes()
+    await collection.insert_one({**doc, "change_seq": seq, "change_at": at})
+    return seq
+
+
+def test_parse_change_token():
+    assert server.parse_change_token("abc:12") == ("abc", 12)
+    with pytest.raises(HTTPException) as exc:
+        server.parse_change_token("abc")
+    assert exc.value.status_code == 400
+
+
+def test_missing_or_stale_token_resets(mock_db):
+    async def run():
+        first = await changes(None)
+        epoch, seq = server.parse_change_token(first["token"])
+        other_epoch = await changes(f"other:{seq}")
+        await mock_db.stats.update_one({"_id": server.CHANGE_FEED_ID}, {"$set": {"pruned_through": 5}})
+        pruned = await changes(f"{epoch}:4")
+        current = await changes(f"{epoch}:5")
+        return first, other_epoch, pruned, current
+
+    first, other_epoch, pruned, current = asyncio.run(run())
+    assert first["reset"] and first["changes"] == []
+    assert first["token"].endswith(":0")
+    assert other_epoch["reset"]
+    assert pruned["reset"]
+    assert not current.get("reset") and current["changes"] == []
+
+
+def test_changes_are_merged_in_sequence_order(mock_db):
+    async def run():
+        epoch = (await server.change_feed_state())["epoch"]
+        await stamp(mock_db.users, {"id": "u1", "username": "ana", "credit_card_last4": "4242"})
+        await stamp(mock_db.games, {"id": "g1", "title": "Math Quest"})
+        seq = await server.reserve_changes()
+        await mock_db.change_tombstones.insert_one(
+            {"collection": "users", "id": "u0", "change_seq": seq, "change_at": SETTLED}
+        )
+        await stamp(mock_db.builds, {"id": "b1", "game_id": "g1"})
+        return epoch, await changes(f"{epoch}:0")
+
+    epoch, feed = asyncio.run(run())
+    assert [(c["seq"], c["collection"], c["op"], c["id"]) for c in feed["changes"]] == [
+        (1, "users", "upsert", "u1"),
+        (2, "games", "upsert", "g1"),
+        (3, "users", "delete", "u0"),
+        (4, "builds", "upsert", "b1"),
+    ]
+    assert feed["token"] == f"{epoch}:4"
+    assert not feed["has_more"]
+    # Upserts carry list rows, which never include billing fields
+    assert "credit_card_last4" not in feed["changes"][0]["doc"]
+    assert all("change_seq" not in c.get("doc", {}) for c in feed["changes"])
+
+
+def test_limit_pages_with_has_more(mock_db):
+    async def run():
+        epoch = (await server.change_feed_state())["epoch"]
+        for i in range(5):
+            await stamp(mock_db.games, {"id": f"g{i}", "title": f"Game {i}"})
+        first = await changes(f"{epoch}:0", limit=3)
+        second = await changes(first["token"], limit=3)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [c["id"] for c in first["changes"]] == ["g0", "g1", "g2"]
+    assert first["has_more"]
+    assert [c["id"] for c in second["changes"]] == ["g3", "g4"]
+    assert not second["has_more"]
+
+
+def test_unsettled_entries_hold_the_token_back(mock_db):
+    async def run():
+        epoch = (await server.change_feed_state())["epoch"]
+        await stamp(mock_db.games, {"id": "g1", "title": "Old"})
+        await stamp(mock_db.games, {"id": "g2", "title": "Fresh"}, at=datetime.now(timezone.utc))
+        await stamp(mock_db.games, {"id": "g3", "title": "Also old"})
+        return epoch, await changes(f"{epoch}:0")
+
+    epoch, feed = asyncio.run(run())
+    # Everything is sent, but the token stops before the first unsettled
+    # entry so a write still landing below it is picked up next time.
+    assert [c["id"] for c in feed["changes"]] == ["g1", "g2", "g3"]
+    assert feed["token"] == f"{epoch}:1"
+
+
+def test_settled_entries_advance_the_token(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "CHANGE_SETTLE_SECONDS", 0)
+
+    async def run():
+        epoch = (await server.change_feed_state())["epoch"]
+        await stamp(mock_db.games, {"id": "g1", "title": "Game"}, at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        return epoch, await changes(f"{epoch}:0")
+
+    epoch, feed = asyncio.run(run())
+    assert feed["token"] == f"{epoch}:1"
+
+
+def test_write_notices_share_one_envelope(monkeypatch):
+    published = []
+
+    async def publish(envelope):
+        published.append(envelope)
+
+    monkeypatch.setattr(server.backplane, "publish", publish)
+
+    async def run():
+        server.invalidate_responses("games")
+        server.announce_changes("games", "users")
+        await server.notification_task
+
+    asyncio.run(run())
+    assert published == [{"kind": "changes", "invalidate": ["games"], "announce": ["games", "users"]}]
+
+
+def test_failed_publish_does_not_fail_the_write(monkeypatch):
+    async def publish(envelope):
+        raise ConnectionError("backplane down")
+
+    monkeypatch.setattr(server.backplane, "publish", publish)
+
+    async def run():
+        before = server.response_cache.version(("games",))
+        server.invalidate_responses("games")
+        await server.notification_task
+        return before, server.response_cache.version(("games",))
+
+    before, after = asyncio.run(run())
+    assert after == (before[0] + 1,)
+
+
+def test_bulk_import_stamps_each_chunk_before_writing_it(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "BULK_CHUNK_SIZE", 2)
+    events = []
+    games = mock_db.games
+    reserve_changes, insert_many = server.reserve_changes, games.insert_many
+
+    async def reserve(count=1):
+        events.append(("reserve", count))
+        return await reserve_changes(count)
+
+    async def insert(docs, **kwargs):
+        events.append(("insert", [doc["change_seq"] for doc in docs]))
+        return await insert_many(docs, **kwargs)
+
+    monkeypatch.setattr(server, "reserve_changes", reserve)
+    monkeypatch.setattr(games, "insert_many", insert)
+    docs = [{"id": f"g{i}", "title": f"Game {i}"} for i in range(5)]
+    inserted = asyncio.run(server.insert_bulk_docs(games, docs, [1, 2, 3, 4, 5], []))
+    assert len(inserted) == 5
+    assert events == [
+        ("reserve", 2), ("insert", [1, 2]),
+        ("reserve", 2), ("insert", [3, 4]),
+        ("reserve", 1), ("insert", [5]),
+    ]
+
+
+def test_admin_writes_reach_the_feed(mock_db, monkeypatch):
+    async def fake_hash(password):
+        return "hashed"
+
+    monkeypatch.setattr(server, "hash_password", fake_hash)
+    monkeypatch.setattr(server, "CHANGE_SETTLE_SECONDS", 0)
+    request = Request({"type": "http", "method": "PUT", "path": "/", "headers": []})
+
+    async def run():
+        epoch = (await server.change_feed_state())["epoch"]
+        admin = await server.register_admin(server.AdminCreate(
+            email="kim@example.com", username="kim", full_name="Kim Park", password="secret",
+        ))
+        await server.update_admin(admin.id, server.AdminUpdate(role="super_admin"), request, Response(), ADMIN)
+        created = await changes(f"{epoch}:0")
+        await server.delete_admin(admin.id, ADMIN)
+        deleted = await changes(created["token"])
+        return admin, created, deleted
+
+    admin, created, deleted = asyncio.run(run())
+    [entry] = created["changes"]
+    assert (entry["collection"], entry["op"], entry["id"]) == ("admins", "upsert", admin.id)
+    assert entry["doc"]["role"] == "super_admin" and entry["doc"]["revision"] == 1
+    assert "hashed_password" not in entry["doc"]
+    assert [(c["collection"], c["op"], c["id"]) for c in deleted["changes"]] == [("admins", "delete", admin.id)]
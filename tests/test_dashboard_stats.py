@@ -0,0 +1,49 @@
+import asyncio
+
+from fastapi import Response
+from starlette.requests import Request
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+def make_request(method="GET"):
+    return Request({"type": "http", "method": method, "path": "/api/stats/dashboard", "headers": [], "query_string": b""})
+
+
+def test_revenue_total_covers_every_row(mock_db):
+    async def run():
+        await mock_db.revenue.insert_many([{"id": f"r{i}", "amount": 1.5} for i in range(1500)])
+        await mock_db.users.insert_many([{"id": "u1", "plan": "Upgraded"}, {"id": "u2", "plan": "Standard"}])
+        return await server.compute_dashboard_stats()
+
+    assert asyncio.run(run()) == {"total_users": 2, "upgraded_users": 1, "total_games": 0, "total_revenue": 2250.0}
+
+
+def test_write_paths_keep_the_counters_equal_to_a_recount(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    monkeypatch.setattr(server, "response_cache", server.ResponseCache(max_entries=10, ttl_seconds=60))
+
+    async def run():
+        # The first read computes the cache document; writes bump it from then on
+        await server.get_dashboard_stats(make_request(), ADMIN)
+        ana = await server.create_user(server.UserCreate(email="ana@school.edu", username="ana", full_name="Ana", plan="Upgraded"), ADMIN)
+        ben = await server.create_user(server.UserCreate(email="ben@school.edu", username="ben", full_name="Ben"), ADMIN)
+        await server.update_user(ben.id, server.UserUpdate(plan="Upgraded"), make_request("PUT"), Response(), ADMIN)
+        await server.delete_user(ana.id, ADMIN)
+        await server.create_game(server.Game(name="Math Quest", description="numbers", category="Math", difficulty="Easy"), ADMIN)
+        for amount in (9.99, 20.01):
+            await server.create_revenue(server.Revenue(
+                date="2024-03-05", amount=amount, source="ben", description="plan", type="subscription",
+            ), ADMIN)
+        cached = await mock_db.stats.find_one({"_id": server.STATS_DOC_ID}, {"_id": 0})
+        response = await server.get_dashboard_stats(make_request(), ADMIN)
+        return cached, await server.compute_dashboard_stats(), response
+
+    cached, recount, response = asyncio.run(run())
+    assert cached["total_revenue"] == recount["total_revenue"] == 30.0
+    assert {k: cached[k] for k in ("total_users", "upgraded_users", "total_games")} == {
+        "total_users": 1, "upgraded_users": 1, "total_games": 1,
+    } == {k: recount[k] for k in ("total_users", "upgraded_users", "total_games")}
+    assert b'"standard_users":0' in response.body.replace(b" ", b"")
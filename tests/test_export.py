@@ -0,0 +1,59 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+def seed_users(mock_db, count):
+    docs = [
+        {**server.User(id=f"u{i}", email=f"user{i}@school.edu", username=f"user{i}", full_name=f"User {i}").model_dump(),
+         "credit_card_last4": "4242", "username_lc": f"user{i}"}
+        for i in range(count)
+    ]
+    asyncio.run(mock_db.users.insert_many(docs))
+
+
+def export(**params):
+    async def run():
+        params.setdefault("format", "ndjson")
+        params.setdefault("gzip", False)
+        params.setdefault("fields", None)
+        response = await server.export_collection("users", _=ADMIN, **params)
+        chunks = [chunk async for chunk in response.body_iterator]
+        return response, chunks
+
+    return asyncio.run(run())
+
+
+def test_ndjson_streams_in_bounded_chunks(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_CHUNK_BYTES", 256)
+    seed_users(mock_db, 20)
+    response, chunks = export(fields="id,username")
+    assert response.headers["content-disposition"] == 'attachment; filename="users.ndjson"'
+    # Chunks are flushed as soon as the buffer passes the threshold
+    assert len(chunks) > 1 and all(len(chunk) < 256 + 100 for chunk in chunks)
+    rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert rows == [{"id": f"u{i}", "username": f"user{i}"} for i in range(20)]
+
+
+def test_csv_gzip_export_keeps_internal_fields_out(mock_db):
+    seed_users(mock_db, 3)
+    response, chunks = export(format="csv", gzip=True)
+    assert response.headers["content-encoding"] == "gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(b"".join(chunks)).decode())))
+    assert [row["username"] for row in rows] == ["user0", "user1", "user2"]
+    assert list(rows[0]) == list(server.User.model_fields)
+
+
+def test_unknown_fields_are_rejected(mock_db):
+    with pytest.raises(HTTPException) as exc:
+        export(fields="id,credit_card_last4")
+    assert exc.value.status_code == 400
@@ -0,0 +1,132 @@
+import asyncio
+
+from fastapi import Response
+from starlette.requests import Request
+
+import server
+
+
+def test_ranked_entries_share_ranks_on_ties():
+    docs = [
+        {"id": "a", "total_score": 90},
+        {"id": "b", "total_score": 80},
+        {"id": "c", "total_score": 80},
+        {"id": "d", "total_score": 70},
+        {"id": "e"},
+    ]
+    entries = server.ranked_entries(docs, "total_score")
+    assert [entry["rank"] for entry in entries] == [1, 2, 2, 4, 5]
+    assert [entry["score"] for entry in entries] == [90, 80, 80, 70, 0]
+    assert [entry["user_id"] for entry in entries] == ["a", "b", "c", "d", "e"]
+
+
+def test_ranked_entries_keep_explicit_user_id():
+    entries = server.ranked_entries([{"id": "gs-1", "user_id": "u-1", "best_score": 5}], "best_score")
+    assert entries[0]["user_id"] == "u-1"
+
+
+def test_leaderboard_rank_counts_higher_buckets_and_bucket_peers(mock_db):
+    # Bucket width 100: scores 350 and 320 share bucket 3 with the subject
+    users = [
+        {"id": "u1", "school": "North", "total_score": 520, "lb_bucket": 5},
+        {"id": "u2", "school": "North", "total_score": 410, "lb_bucket": 4},
+        {"id": "u3", "school": "North", "total_score": 350, "lb_bucket": 3},
+        {"id": "u4", "school": "North", "total_score": 320, "lb_bucket": 3},
+        {"id": "u5", "school": "North", "total_score": 300, "lb_bucket": 3},
+        {"id": "u6", "school": "South", "total_score": 999, "lb_bucket": 9},
+    ]
+    buckets = [
+        {"scope": "school:North", "bucket": 5, "count": 1},
+        {"scope": "school:North", "bucket": 4, "count": 1},
+        {"scope": "school:North", "bucket": 3, "count": 3},
+        {"scope": "school:South", "bucket": 9, "count": 1},
+    ]
+
+    async def run():
+        await mock_db.users.insert_many(users)
+        await mock_db.leaderboard_buckets.insert_many(buckets)
+        rank = lambda score: server.leaderboard_rank(
+            mock_db.users, "school:North", {"school": "North"}, "total_score", score, score // 100
+        )
+        return [await rank(520), await rank(350), await rank(320), await rank(300)]
+
+    assert asyncio.run(run()) == [1, 3, 4, 5]
+
+
+class ConcurrentWrites:
+    # Database proxy that runs `during` the first time game_scores is
+    # aggregated, i.e. after the users groupings have been counted.
+    def __init__(self, database, during):
+        self.database = database
+        self.during = during
+
+    def __getitem__(self, name):
+        return self.database[name]
+
+    def __getattr__(self, name):
+        collection = getattr(self.database, name)
+        if name != "game_scores":
+            return collection
+        proxy = self
+
+        class GameScores:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            async def aggregate(self, pipeline):
+                if proxy.during:
+                    during, proxy.during = proxy.during, None
+                    await during()
+                async for doc in collection.aggregate(pipeline):
+                    yield doc
+
+        return GameScores()
+
+
+def test_rebuild_keeps_moves_made_while_it_runs(mock_db, monkeypatch):
+    async def create_user():
+        doc = {"id": "u2", "school": "North", "total_score": 320, "lb_bucket": 3}
+        await mock_db.users.insert_one(doc)
+        await server.apply_bucket_moves([(server.user_scopes(doc), doc["lb_bucket"], 1)])
+
+    monkeypatch.setattr(server, "db", ConcurrentWrites(mock_db, create_user))
+
+    async def run():
+        await mock_db.users.insert_one({"id": "u1", "school": "North", "total_score": 150, "lb_bucket": 1})
+        await mock_db.game_scores.insert_one({"game_id": "g1", "user_id": "u1", "score": 40, "lb_bucket": 0})
+        await server.rebuild_leaderboards()
+        return await server.bucket_counts()
+
+    counts = asyncio.run(run())
+    assert counts == {
+        ("global", 1): 1, ("global", 3): 1,
+        ("school:North", 1): 1, ("school:North", 3): 1,
+        ("game:g1", 0): 1,
+    }
+
+
+def test_user_writes_keep_the_histogram_in_step_with_a_rebuild(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    admin = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+    async def run():
+        created = [
+            await server.create_user(server.UserCreate(
+                email=f"{name}@school.edu", username=name, full_name=name.title(), school=school, grade="5th",
+            ), admin)
+            for name, school in (("ana", "North"), ("ben", "North"), ("cleo", "South"))
+        ]
+        await mock_db.users.update_many({}, {"$set": {"total_score": 250, "lb_bucket": 2}})
+        await mock_db.leaderboard_buckets.delete_many({})
+        await server.rebuild_leaderboards()
+
+        request = Request({"type": "http", "method": "PUT", "path": "/", "headers": []})
+        await server.update_user(created[0].id, server.UserUpdate(school="South"), request, Response(), admin)
+        await server.delete_user(created[1].id, admin)
+        incremental = await server.bucket_counts()
+        await server.rebuild_leaderboards()
+        return incremental, await server.bucket_counts()
+
+    incremental, rebuilt = asyncio.run(run())
+    live = {key: count for key, count in incremental.items() if count}
+    assert live == rebuilt == {("global", 2): 2, ("school:South", 2): 2, ("grade:5th", 2): 2}
@@ -0,0 +1,80 @@
+import asyncio
+import types
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = server.Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, "/api/users")
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/api/users",le="0.1"} 1',
+        'latency_seconds_bucket{route="/api/users",le="1.0"} 3',
+        'latency_seconds_bucket{route="/api/users",le="+Inf"} 4',
+        'latency_seconds_sum{route="/api/users"} 4.25',
+        'latency_seconds_count{route="/api/users"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    assert server.format_labels(("a", "b"), ('say "hi"', "x\\y\nz")) == '{a="say \\"hi\\"",b="x\\\\y\\nz"}'
+
+
+def test_mongo_commands_are_timed_per_collection(monkeypatch):
+    duration = server.Histogram("mongo_seconds", "Mongo", ("collection", "command"))
+    failures = server.Counter("mongo_failures", "Mongo", ("collection", "command"))
+    monkeypatch.setattr(server, "mongo_command_duration", duration)
+    monkeypatch.setattr(server, "mongo_command_failures", failures)
+    listener = server.MongoCommandMetrics()
+
+    def event(request_id, name, command=None, micros=2000):
+        return types.SimpleNamespace(
+            connection_id=("db", 27017), request_id=request_id, command_name=name,
+            command=command or {}, duration_micros=micros,
+        )
+
+    listener.started(event(1, "find", {"find": "users"}))
+    listener.started(event(2, "update", {"update": "games"}))
+    listener.started(event(3, "ping", {"ping": 1}))
+    listener.succeeded(event(1, "find"))
+    listener.failed(event(2, "update"))
+    listener.succeeded(event(3, "ping"))
+    assert set(duration.series) == {("users", "find"), ("games", "update"), ("-", "ping")}
+    assert failures.values == {("games", "update"): 1}
+    assert listener.inflight == {}
+
+
+def test_requests_are_labelled_by_route_template(monkeypatch):
+    requests_total = server.Counter("requests", "Requests", ("method", "route", "status"))
+    duration = server.Histogram("duration", "Duration", ("method", "route"))
+    monkeypatch.setattr(server, "http_requests_total", requests_total)
+    monkeypatch.setattr(server, "http_request_duration", duration)
+    app = FastAPI()
+
+    @app.get("/api/users/{user_id}")
+    async def get_user(user_id: str):
+        return {"id": user_id}
+
+    app.add_middleware(server.MetricsMiddleware)
+    client = TestClient(app)
+    for user_id in ("u1", "u2"):
+        client.get(f"/api/users/{user_id}")
+    client.get("/nowhere")
+    assert requests_total.values == {
+        ("GET", "/api/users/{user_id}", "200"): 2,
+        ("GET", "unmatched", "404"): 1,
+    }
+    assert duration.series[("GET", "/api/users/{user_id}")][2] == 2
+
+
+def test_metrics_endpoint_includes_websocket_gauges(monkeypatch):
+    monkeypatch.setattr(server, "METRICS_ENABLED", True)
+    response = asyncio.run(server.get_metrics())
+    body = response.body.decode()
+    assert "# TYPE websocket_connections gauge" in body
+    assert "websocket_send_queue_depth 0" in body
+    assert "# TYPE password_hash_wait_seconds histogram" in body
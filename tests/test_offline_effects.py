@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message["content"])
+
+    async def close(self):
+        pass
+
+
+def test_offline_effects_are_replayed_in_order_on_reconnect(mock_db, monkeypatch):
+    manager = server.ConnectionManager()
+    monkeypatch.setattr(server, "manager", manager)
+    monkeypatch.setattr(server, "backplane", server.InProcessBackplane())
+    monkeypatch.setattr(server, "OFFLINE_QUEUE_SIZE", 3)
+    history = server.WriteBehindBuffer(mock_db.live_effects, batch_size=100, flush_interval=60)
+    monkeypatch.setattr(server, "live_effect_history", history)
+
+    async def run():
+        results = [
+            await server.send_live_effect(server.LiveEffect(user_id="u1", effect_type="text", content=f"m{n}"), ADMIN)
+            for n in range(4)
+        ]
+        # An already expired message is skipped on replay
+        past = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await server.queue_pending_effect("u1", {"content": "stale"}, past)
+        websocket = FakeWebSocket()
+        await manager.connect("u1", websocket)
+        replayed = await server.replay_pending_effects("u1")
+        await asyncio.sleep(0.01)
+        again = await server.replay_pending_effects("u1")
+        await history.flush()
+        manager.disconnect("u1")
+        stored = await mock_db.live_effects.find({}, {"_id": 0}).to_list(None)
+        return results, replayed, again, websocket.sent, stored
+
+    results, replayed, again, delivered, stored = asyncio.run(run())
+    assert {result["message"] for result in results} == {"Effect queued"}
+    # The queue keeps the newest OFFLINE_QUEUE_SIZE entries
+    assert (replayed, again) == (2, 0)
+    assert delivered == ["m2", "m3"]
+    assert [doc["delivery"] for doc in stored] == ["queued"] * 4
+
+
+def test_write_behind_buffer_batches_inserts(mock_db, monkeypatch):
+    collection = mock_db.live_effects
+    batches = []
+    insert_many = collection.insert_many
+
+    async def record(docs, ordered=True):
+        batches.append(len(docs))
+        return await insert_many(docs, ordered=ordered)
+
+    monkeypatch.setattr(collection, "insert_many", record)
+    buffer = server.WriteBehindBuffer(collection, batch_size=3, flush_interval=60)
+
+    async def run():
+        for n in range(7):
+            await buffer.add({"n": n})
+        await buffer.flush()
+        await buffer.flush()
+        return await collection.count_documents({})
+
+    assert asyncio.run(run()) == 7
+    assert batches == [3, 3, 1]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+def make_user(i, **fields):
+    # Duplicate join dates make the id tiebreak matter
+    return server.User(
+        id=f"u-{i:02d}", email=f"user{i}@school.edu", username=f"user{i}", full_name=f"User {i}",
+        joined_date=f"2024-01-0{i % 3 + 1}T08:00:00+00:00", **fields,
+    ).model_dump()
+
+
+def test_cursor_round_trip():
+    cursor = server.encode_cursor({"id": "u-7", "joined_date": "2024-05-01T10:00:00"}, "joined_date")
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor) == ("2024-05-01T10:00:00", "u-7")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", "WzFd"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as exc:
+        server.decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_user_pages_walk_every_row_once(mock_db):
+    docs = [make_user(i) for i in range(10)]
+
+    async def walk():
+        await mock_db.users.insert_many([dict(doc) for doc in docs])
+        pages, after = [], None
+        while True:
+            response = Response()
+            page = await server.get_users(response, limit=4, after=after, _=ADMIN)
+            pages.append(page)
+            after = response.headers.get("x-next-cursor")
+            if after is None:
+                return pages
+
+    pages = asyncio.run(walk())
+    assert [len(page) for page in pages] == [4, 4, 2]
+    seen = [doc["id"] for page in pages for doc in page]
+    expected = sorted(docs, key=lambda doc: (doc["joined_date"], doc["id"]), reverse=True)
+    assert seen == [doc["id"] for doc in expected]
+
+
+def test_user_filters_apply_on_the_server(mock_db):
+    async def run():
+        await mock_db.users.insert_many([
+            make_user(
+                i,
+                plan="Upgraded" if i % 2 else "Standard",
+                status="suspended" if i == 3 else "active",
+                school="Lincoln Elementary" if i < 6 else "Roosevelt Middle",
+            )
+            for i in range(9)
+        ])
+        response = Response()
+        first = await server.get_users(response, plan="Upgraded", status="active", limit=2, after=None, _=ADMIN)
+        rest = await server.get_users(
+            Response(), plan="Upgraded", status="active", limit=2, after=response.headers["x-next-cursor"], _=ADMIN
+        )
+        school = await server.get_users(Response(), school="Roosevelt Middle", limit=10, after=None, _=ADMIN)
+        return first, rest, school
+
+    first, rest, school = asyncio.run(run())
+    assert [doc["id"] for doc in first + rest] == ["u-05", "u-07", "u-01"]
+    assert sorted(doc["id"] for doc in school) == ["u-06", "u-07", "u-08"]
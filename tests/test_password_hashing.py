@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+import server
+
+
+def test_hashing_runs_off_the_event_loop():
+    hasher = server.PasswordHasher(max_workers=1, max_pending=4)
+    released = threading.Event()
+
+    async def run():
+        # The worker waits for the loop to release it, which only works if the
+        # loop stays free while the work runs.
+        work = asyncio.ensure_future(hasher.run(released.wait, 2))
+        await asyncio.sleep(0.01)
+        released.set()
+        return await work
+
+    try:
+        assert asyncio.run(run()) is True
+        assert hasher.stats()["completed"] == 1
+    finally:
+        hasher.shutdown()
+
+
+def test_callers_past_max_pending_are_shed():
+    hasher = server.PasswordHasher(max_workers=1, max_pending=1)
+    released = threading.Event()
+
+    async def run():
+        work = asyncio.ensure_future(hasher.run(released.wait, 2))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            await hasher.run(released.wait, 2)
+        released.set()
+        await work
+        return exc.value.status_code
+
+    try:
+        assert asyncio.run(run()) == 503
+        assert (hasher.stats()["rejected"], hasher.stats()["pending"]) == (1, 0)
+    finally:
+        hasher.shutdown()
+
+
+def test_login_rehashes_to_the_current_cost_when_enabled(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    current = CryptContext(
+        schemes=["bcrypt"], bcrypt__default_rounds=4, bcrypt__min_rounds=4, bcrypt__max_rounds=4,
+    )
+    monkeypatch.setattr(server, "pwd_context", current)
+    monkeypatch.setattr(server, "PASSWORD_REHASH_ON_LOGIN", True)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=5).hash("secret")
+
+    async def run():
+        await mock_db.admins.insert_one({
+            "id": "a1", "email": "kim@example.com", "username": "kim", "full_name": "Kim",
+            "role": "admin", "status": "active", "hashed_password": old_hash,
+        })
+        token = await server.login_admin(server.LoginRequest(username="kim", password="secret"))
+        with pytest.raises(HTTPException) as exc:
+            await server.login_admin(server.LoginRequest(username="kim", password="wrong"))
+        return token, exc.value.status_code, await mock_db.admins.find_one({"id": "a1"})
+
+    token, wrong_status, stored = asyncio.run(run())
+    assert token["token_type"] == "bearer" and wrong_status == 401
+    assert stored["hashed_password"].startswith("$2b$04$")
+    assert current.verify("secret", stored["hashed_password"])
+    assert stored["last_login"]
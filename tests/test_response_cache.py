@@ -0,0 +1,81 @@
+import asyncio
+
+from starlette.requests import Request
+
+import server
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_bump_makes_entries_stale():
+    cache = server.ResponseCache(max_entries=10, ttl_seconds=60)
+    key = ("/api/games", ())
+    cache.put(key, cache.version(("games",)), '"a"', b"[]", {})
+    assert cache.get(key, cache.version(("games",))) == ('"a"', b"[]", {})
+    cache.bump("games")
+    assert cache.get(key, cache.version(("games",))) is None
+    assert key not in cache.entries
+
+
+def test_unrelated_bump_keeps_entry():
+    cache = server.ResponseCache(max_entries=10, ttl_seconds=60)
+    key = ("/api/games", ())
+    cache.put(key, cache.version(("games",)), '"a"', b"[]", {})
+    cache.bump("users")
+    assert cache.get(key, cache.version(("games",))) is not None
+
+
+def test_expired_entry_is_dropped():
+    cache = server.ResponseCache(max_entries=10, ttl_seconds=-1)
+    key = ("/api/stats", ())
+    cache.put(key, cache.version(("stats",)), '"a"', b"{}", {})
+    assert cache.get(key, cache.version(("stats",))) is None
+
+
+def test_lru_evicts_least_recently_used():
+    cache = server.ResponseCache(max_entries=2, ttl_seconds=60)
+    version = cache.version(())
+    cache.put(("a",), version, '"a"', b"", {})
+    cache.put(("b",), version, '"b"', b"", {})
+    cache.get(("a",), version)
+    cache.put(("c",), version, '"c"', b"", {})
+    assert list(cache.entries) == [("a",), ("c",)]
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert not server.etag_matches(make_request(), etag)
+    assert server.etag_matches(make_request('"abc"'), etag)
+    assert server.etag_matches(make_request('W/"abc"'), etag)
+    assert server.etag_matches(make_request('"x", "abc"'), etag)
+    assert server.etag_matches(make_request("*"), etag)
+    assert not server.etag_matches(make_request('"abcd"'), etag)
+
+
+def test_cached_response_serves_304_until_a_write(monkeypatch):
+    monkeypatch.setattr(server, "response_cache", server.ResponseCache(max_entries=10, ttl_seconds=60))
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    loads = []
+
+    async def loader(response):
+        loads.append(len(loads))
+        response.headers["X-Next-Cursor"] = "next"
+        return [{"id": "g1", "version": len(loads)}]
+
+    def get(etag=None):
+        request = make_request(etag)
+        request.scope.update(path="/api/games", query_string=b"limit=2")
+        return asyncio.run(server.cached_response(request, ("games",), server.dumps_json, loader))
+
+    first = get()
+    repeat = get(first.headers["etag"])
+    server.invalidate_responses("games")
+    after_write = get(first.headers["etag"])
+
+    assert loads == [0, 1]
+    assert first.status_code == 200 and first.headers["x-next-cursor"] == "next"
+    assert repeat.status_code == 304 and repeat.headers["x-next-cursor"] == "next"
+    assert after_write.status_code == 200 and after_write.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+ROWS = [
+    ("2024-02-28", 10.0, "ana", "subscription"),
+    ("2024-03-04", 5.0, "ben", "purchase"),
+    ("2024-03-05", 2.5, "ana", "purchase"),
+    ("2024-03-31", 4.0, "cleo", "donation"),
+]
+
+
+def make_revenue(date, amount, source, type_):
+    return server.Revenue(date=date, amount=amount, source=source, description="row", type=type_)
+
+
+def summary(**params):
+    params = {"granularity": "month", "group_by": "total", "start": None, "end": None, **params}
+    return server.get_revenue_summary(_=ADMIN, **params)
+
+
+def test_revenue_buckets():
+    # 2024-03-06 is a Wednesday; weeks start on Monday
+    assert server.revenue_buckets("2024-03-06T12:00:00") == {"day": "2024-03-06", "week": "2024-03-04", "month": "2024-03"}
+
+
+def test_summary_is_served_from_incremental_rollups(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+
+    async def run():
+        for row in ROWS:
+            await server.create_revenue(make_revenue(*row), ADMIN)
+        incremental = await mock_db.revenue_rollups.find({}, {"_id": 0}).to_list(None)
+        by_month = await summary()
+        by_type = await summary(group_by="type", start="2024-03-01", end="2024-03-31")
+        by_week = await summary(granularity="week", start="2024-03-04", end="2024-03-10")
+        await server.rebuild_revenue_rollups()
+        rebuilt = await mock_db.revenue_rollups.find({}, {"_id": 0}).to_list(None)
+        return incremental, rebuilt, by_month, by_type, by_week
+
+    incremental, rebuilt, by_month, by_type, by_week = asyncio.run(run())
+    assert [(r["period"], r["amount"], r["count"]) for r in by_month["rows"]] == [("2024-02", 10.0, 1), ("2024-03", 11.5, 3)]
+    assert [(r["group"], r["amount"]) for r in by_type["rows"]] == [("donation", 4.0), ("purchase", 7.5)]
+    assert [(r["period"], r["amount"], r["count"]) for r in by_week["rows"]] == [("2024-03-04", 7.5, 2)]
+
+    def key(doc):
+        return (doc["granularity"], doc["dimension"], doc["key"] or "", doc["bucket"])
+
+    assert sorted(map(key, incremental)) == sorted(map(key, rebuilt))
+    totals = {key(doc): (doc["amount"], doc["count"]) for doc in rebuilt}
+    assert all(totals[key(doc)] == (doc["amount"], doc["count"]) for doc in incremental)
+
+
+def test_invalid_dates_are_rejected(mock_db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.create_revenue(make_revenue("yesterday", 1.0, "ana", "purchase"), ADMIN))
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(summary(start="not-a-date"))
+    assert exc.value.status_code == 400
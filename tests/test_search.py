@@ -0,0 +1,121 @@
+import asyncio
+import re
+
+import server
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            if isinstance(direction, dict):
+                # {"$meta": "textScore"} sorts best match first
+                self.docs.sort(key=lambda doc: -doc["score"])
+            else:
+                self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length):
+        return [dict(doc) for doc in self.docs[:length]]
+
+
+class FakeCollection:
+    # Just enough of find() for ranked_search: equality filters plus either one
+    # anchored-regex prefix filter or a $text search that scores by word
+    # occurrences in the description.
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection):
+        query = dict(query)
+        text = query.pop("$text", None)
+        prefix = {field: query.pop(field) for field in list(query) if isinstance(query[field], dict)}
+        docs = [doc for doc in self.docs if all(doc.get(field) == value for field, value in query.items())]
+        if text:
+            words = text["$search"].lower().split()
+            hits = []
+            for doc in docs:
+                score = sum(doc.get("description", "").lower().split().count(word) for word in words)
+                if score:
+                    hits.append({**doc, "score": score})
+            return FakeCursor(hits)
+        (field, condition), = prefix.items()
+        pattern = re.compile(condition["$regex"])
+        return FakeCursor([doc for doc in docs if pattern.match(doc.get(field, ""))])
+
+
+def make_game(game_id, name, category, description):
+    game = server.Game(id=game_id, name=name, category=category, difficulty="Easy", description=description)
+    return server.with_search_fields(game.model_dump(), server.GAME_PREFIX_FIELDS)
+
+
+def make_user(user_id, username, full_name, plan="Standard", status="active"):
+    user = server.User(
+        id=user_id, email=f"{username}@school.edu", username=username, full_name=full_name, plan=plan, status=status,
+    )
+    return server.with_search_fields(user.model_dump(), server.USER_PREFIX_FIELDS)
+
+
+GAMES = [
+    make_game("g1", "Math Quest", "Math", "numbers and puzzles"),
+    make_game("g2", "Math", "Puzzle", "math drills"),
+    make_game("g3", "Mathemagic", "Logic", "magic math"),
+    make_game("g4", "Word Hunt", "Math", "spelling"),
+    make_game("g5", "Space Race", "Science", "math in orbit"),
+    make_game("g6", "Math Quest", "Arcade", "a second math quest"),
+    make_game("g7", "Reading Room", "Language", "stories"),
+]
+
+
+def search(q, limit, offset):
+    return asyncio.run(server.ranked_search(FakeCollection(GAMES), q, server.GAME_PREFIX_FIELDS, {}, limit, offset))
+
+
+def test_exact_name_ranks_first_then_prefix_then_text():
+    ids = [doc["id"] for doc in search("math", 10, 0)]
+    assert ids[0] == "g2"
+    # Name prefix hits come before description-only hits, which rank by score
+    assert ids == ["g2", "g1", "g6", "g3", "g5"]
+    assert all("score" not in doc for doc in search("math", 10, 0))
+
+
+def test_offset_pages_neither_overlap_nor_skip():
+    full = [doc["id"] for doc in search("math", 10, 0)]
+    paged = []
+    for offset in range(0, len(full) + 2, 2):
+        paged.extend(doc["id"] for doc in search("math", 2, offset))
+    assert paged == full
+
+
+def test_ties_break_on_id():
+    ids = [doc["id"] for doc in search("math quest", 10, 0)]
+    assert ids[:2] == ["g1", "g6"]
+
+
+def test_matches_are_case_insensitive():
+    assert [doc["id"] for doc in search("READING", 10, 0)] == ["g7"]
+
+
+def test_user_search_applies_filters_before_ranking():
+    users = FakeCollection([
+        make_user("u1", "ana", "Ana Lima", plan="Upgraded"),
+        make_user("u2", "anabel", "Anabel Cruz"),
+        make_user("u3", "bruno", "Ana Bruno", plan="Upgraded", status="suspended"),
+        make_user("u4", "carla", "Carla Ana", plan="Upgraded"),
+    ])
+
+    def ids(base_query):
+        return [doc["id"] for doc in asyncio.run(
+            server.ranked_search(users, "ana", server.USER_PREFIX_FIELDS, base_query, 10, 0)
+        )]
+
+    # Prefix matches on username, email or full name; "Carla Ana" is not one
+    assert ids({}) == ["u1", "u3", "u2"]
+    assert ids({"plan": "Upgraded"}) == ["u1", "u3"]
+    assert ids({"plan": "Upgraded", "status": "active"}) == ["u1"]
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import server
+
+GAMES = [
+    # Stored as written by older code: int rating, float play_count
+    {"id": "g1", "name": "Math Quest", "description": "Numbers", "category": "Math", "difficulty": "Easy",
+     "status": "live", "version": "1.2.0", "play_count": 40.0, "rating": 4, "created_at": "2024-01-01T00:00:00",
+     "updated_at": "2024-01-02T00:00:00", "revision": 2},
+    # Optional and defaulted fields missing
+    {"id": "g2", "name": "Word Hunt", "description": "Letters", "category": "Language", "difficulty": "Medium",
+     "created_at": "2024-01-03T00:00:00", "updated_at": "2024-01-03T00:00:00"},
+    # Generated field missing: filled in by validation
+    {"name": "Space Race", "description": "Orbits", "category": "Science", "difficulty": "Hard",
+     "rating": 3.5, "play_count": 7, "updated_at": "2024-01-04T00:00:00"},
+]
+
+USERS = [
+    {"id": "u1", "email": "ana@example.com", "username": "ana", "full_name": "Ana Lima", "plan": "Upgraded",
+     "age": 12.0, "school": "North", "total_games_played": 3, "total_score": 120,
+     "joined_date": "2024-01-01T00:00:00", "revision": 1},
+    {"id": "u2", "email": "ben@example.com", "username": "ben", "full_name": "Ben Ode",
+     "joined_date": "2024-01-02T00:00:00"},
+]
+
+REVENUE = [
+    {"id": "r1", "date": "2024-01-01", "amount": 10, "source": "web", "description": "Monthly", "type": "subscription"},
+    {"id": "r2", "date": "2024-01-02", "amount": 4.99, "source": "app", "description": "Skin", "type": "purchase"},
+]
+
+
+def encode(serializer, docs, monkeypatch, fast):
+    monkeypatch.setattr(server, "FAST_SERIALIZATION_ROUTES", {"*"} if fast else set())
+    return serializer.encode([dict(doc) for doc in docs])
+
+
+@pytest.mark.parametrize("serializer, docs", [
+    (server.game_serializer, GAMES),
+    (server.user_serializer, USERS),
+    (server.revenue_serializer, REVENUE),
+])
+def test_fast_path_matches_validated_path(serializer, docs, monkeypatch):
+    fast = json.loads(encode(serializer, docs, monkeypatch, fast=True))
+    validated = json.loads(encode(serializer, docs, monkeypatch, fast=False))
+    # Generated ids and timestamps differ per call; compare everything else
+    for doc in fast + validated:
+        if doc["id"] not in {d.get("id") for d in docs}:
+            doc.pop("id")
+            doc.pop("created_at", None)
+    assert fast == validated
+    assert encode(serializer, docs[:2], monkeypatch, fast=True) == encode(serializer, docs[:2], monkeypatch, fast=False)
+
+
+def test_int_rating_encodes_as_float(monkeypatch):
+    body = encode(server.game_serializer, GAMES[:1], monkeypatch, fast=True)
+    assert b'"rating":4.0' in body
+    assert b'"play_count":40,' in body
+
+
+def test_unparseable_value_is_rejected_on_both_paths(monkeypatch):
+    docs = [{**REVENUE[0], "amount": "ten"}]
+    for fast in (True, False):
+        with pytest.raises(ValueError):
+            encode(server.revenue_serializer, docs, monkeypatch, fast=fast)
+
+
+def test_scalar_type():
+    assert server.scalar_type(float) is float
+    assert server.scalar_type(server.Optional[int]) is int
+    assert server.scalar_type(server.Optional[server.List[str]]) is None
+    assert server.scalar_type(server.EmailStr) is None
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timezone
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+def session(user_id, game_id, score, rating=None, played_at=None):
+    return server.GameSession(user_id=user_id, game_id=game_id, score=score, rating=rating, played_at=played_at)
+
+
+def ingest(*sessions):
+    return server.ingest_game_sessions(server.GameSessionBatch(sessions=list(sessions)), ADMIN)
+
+
+def without_round(pipeline):
+    # mongomock has no $round; the means below are exact to two places anyway
+    if isinstance(pipeline, dict):
+        if "$round" in pipeline:
+            return without_round(pipeline["$round"][0])
+        return {key: without_round(value) for key, value in pipeline.items()}
+    if isinstance(pipeline, list):
+        return [without_round(value) for value in pipeline]
+    return pipeline
+
+
+def test_rating_mean_is_rounded_in_the_pipeline():
+    rating = server.game_rating_update(3, 10.0, 3)[1]["$set"]["rating"]
+    assert rating["$cond"][1] == {"$round": [{"$divide": ["$rating_sum", "$rating_count"]}, 2]}
+
+
+def test_sessions_fold_into_counters_and_a_running_mean_rating(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    rating_update = server.game_rating_update
+    monkeypatch.setattr(server, "game_rating_update", lambda *totals: without_round(rating_update(*totals)))
+    user = server.User(id="u1", email="ana@school.edu", username="ana", full_name="Ana", total_games_played=2, total_score=30)
+    # A legacy game with a rating but no stored sum counts it as one sample
+    legacy = server.Game(id="g1", name="Math Quest", description="numbers", category="Math", difficulty="Easy", play_count=1, rating=4.0)
+    fresh = server.Game(id="g2", name="Word Hunt", description="words", category="Language", difficulty="Easy")
+
+    async def run():
+        await mock_db.users.insert_one(server.with_leaderboard_bucket(user.model_dump(), "total_score"))
+        await mock_db.games.insert_many([legacy.model_dump(), fresh.model_dump()])
+        first = await ingest(
+            session("u1", "g1", 50, rating=5),
+            session("u1", "g1", 20, rating=3),
+            session("u1", "g2", 10),
+            session("u9", "g1", 99, rating=1),
+        )
+        await ingest(session("u1", "g2", 5, rating=2))
+        users = await mock_db.users.find_one({"id": "u1"}, {"_id": 0})
+        games = {doc["id"]: doc async for doc in mock_db.games.find({}, {"_id": 0})}
+        return first, users, games
+
+    first, stored_user, games = asyncio.run(run())
+    assert first == {"accepted": 4, "users_updated": 1, "games_updated": 2, "unknown_users": 1, "unknown_games": 0}
+    # The unknown user's session still counts towards the game it played
+    assert (stored_user["total_games_played"], stored_user["total_score"]) == (6, 115)
+    assert stored_user["lb_bucket"] == 1
+    assert (games["g1"]["play_count"], games["g1"]["rating_count"], games["g1"]["rating"]) == (4, 4, 3.25)
+    assert (games["g2"]["play_count"], games["g2"]["rating_count"], games["g2"]["rating"]) == (2, 1, 2.0)
+
+
+def test_per_player_scores_keep_the_latest_play(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    early = datetime(2024, 3, 1, 9, tzinfo=timezone.utc)
+    late = datetime(2024, 3, 2, 9)  # naive timestamps are taken as UTC
+
+    async def run():
+        await mock_db.users.insert_one(server.User(id="u1", email="ana@school.edu", username="ana", full_name="Ana").model_dump())
+        await mock_db.games.insert_one(server.Game(id="g1", name="Math Quest", description="n", category="Math", difficulty="Easy").model_dump())
+        await ingest(session("u1", "g1", 40, played_at=late), session("u1", "g1", 10, played_at=early))
+        await ingest(session("u1", "g1", 5, played_at=early))
+        return await mock_db.game_scores.find_one({"game_id": "g1", "user_id": "u1"}, {"_id": 0})
+
+    score = asyncio.run(run())
+    assert (score["plays"], score["score"]) == (3, 55)
+    assert score["last_played_at"].replace(tzinfo=timezone.utc) == late.replace(tzinfo=timezone.utc)
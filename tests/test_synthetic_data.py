@@ -0,0 +1,67 @@
+import asyncio
+import random
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def generate(seed):
+    rng = random.Random(seed)
+    users = list(server.synthetic_users(rng, 50, server.SYNTHETIC_ANCHOR))
+    games = list(server.synthetic_games(rng, 5, server.SYNTHETIC_ANCHOR))
+    builds = list(server.synthetic_builds(rng, 10, games, server.SYNTHETIC_ANCHOR))
+    revenue = list(server.synthetic_revenue(rng, 20, [u["username"] for u in users], server.SYNTHETIC_ANCHOR))
+    return users, games, builds, revenue
+
+
+def test_same_seed_same_documents():
+    assert generate(7) == generate(7)
+    assert generate(7)[0] != generate(8)[0]
+
+
+def test_generated_documents_fit_the_models():
+    users, games, builds, revenue = generate(7)
+    for model, docs in ((server.User, users), (server.Game, games), (server.Build, builds), (server.Revenue, revenue)):
+        for doc in docs:
+            dumped = model(**doc).model_dump()
+            assert all(dumped[field] == doc[field] for field in dumped if field in doc)
+    assert all(user["lb_bucket"] == server.score_bucket(user["total_score"]) for user in users)
+    assert all(user["username_lc"] == user["username"] for user in users)
+
+
+def test_seeding_writes_in_chunks_and_rebuilds_derived_data(mock_db, monkeypatch):
+    async def fake_hash(password):
+        return "hashed"
+
+    monkeypatch.setattr(server, "hash_password", fake_hash)
+    monkeypatch.setattr(server, "queue_notification", lambda **kwargs: None)
+    monkeypatch.setattr(server, "SYNTHETIC_CHUNK_SIZE", 7)
+    users = mock_db.users
+    chunks = []
+    insert_many = users.insert_many
+
+    async def record(docs, ordered=True):
+        chunks.append(len(docs))
+        return await insert_many(docs, ordered=ordered)
+
+    monkeypatch.setattr(users, "insert_many", record)
+    monkeypatch.setattr(mock_db, "users", users, raising=False)
+
+    async def run():
+        result = await server.seed_sample_data(users=30, games=4, builds=6, revenue=12, seed=3)
+        stats = await mock_db.stats.find_one({"_id": server.STATS_DOC_ID}, {"_id": 0})
+        ranked = sum(count for (scope, _), count in (await server.bucket_counts()).items() if scope == "global")
+        return result, stats, ranked, await mock_db.users.count_documents({})
+
+    result, stats, ranked, total_users = asyncio.run(run())
+    assert result["generated"] == {"games": 4, "builds": 6, "users": 30, "revenue": 12}
+    assert chunks == [7, 7, 7, 7, 2]
+    assert stats["total_users"] == ranked == total_users
+
+
+def test_synthetic_volume_over_http_needs_a_token(mock_db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.init_sample_data(users=10, games=0, builds=0, revenue=0, seed=1, credentials=None))
+    assert exc.value.status_code == 401
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+import server
+
+ADMIN = server.AdminPrincipal(id="a1", username="admin", role="admin", status="active")
+
+
+def make_request(if_match=None):
+    headers = [(b"if-match", if_match.encode())] if if_match else []
+    return Request({"type": "http", "method": "PUT", "path": "/", "headers": headers})
+
+
+def make_user(**fields):
+    return server.User(
+        id="u1", email="ana@example.com", username="ana", full_name="Ana Lima", plan="Standard",
+        total_games_played=12, total_score=340, revision=3, **fields,
+    ).model_dump()
+
+
+async def update(user_id, body, if_match=None):
+    response = Response()
+    user = await server.update_user(user_id, server.UserUpdate(**body), make_request(if_match), response, ADMIN)
+    return user, response
+
+
+def test_profile_edit_leaves_session_counters_alone(mock_db):
+    async def run():
+        await mock_db.users.insert_one(make_user())
+        # A tab holding stale counters sends them back with the edit
+        user, response = await update("u1", {"full_name": "Ana L.", "total_games_played": 0, "total_score": 0})
+        return user, response, await mock_db.users.find_one({"id": "u1"}, {"_id": 0})
+
+    user, response, stored = asyncio.run(run())
+    assert stored["full_name"] == "Ana L."
+    assert (stored["total_games_played"], stored["total_score"]) == (12, 340)
+    assert user["revision"] == stored["revision"] == 4
+    assert response.headers["etag"] == '"4"'
+
+
+def test_stale_if_match_is_rejected(mock_db):
+    async def run():
+        await mock_db.users.insert_one(make_user())
+        await update("u1", {"bio": "first"}, if_match='"3"')
+        await update("u1", {"bio": "second"}, if_match='"3"')
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 409
+
+
+def test_missing_user_is_404_even_with_if_match(mock_db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(update("nobody", {"bio": "x"}, if_match='"1"'))
+    assert exc.value.status_code == 404
+
+
+def test_if_match_must_be_a_revision():
+    with pytest.raises(HTTPException) as exc:
+        server.parse_if_match(make_request('"abc"'))
+    assert exc.value.status_code == 400
+    assert server.parse_if_match(make_request('W/"7"')) == 7
+    assert server.parse_if_match(make_request("*")) is None